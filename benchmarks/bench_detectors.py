@@ -0,0 +1,62 @@
+"""Бенчмарк стоимости и качества детекторов на синтетическом ролике
+
+Запуск: python -m benchmarks.bench_detectors --methods ADAPTIVE_BACKGROUND RUNNING_AVERAGE
+"""
+
+import argparse
+from models.config import GlobalConfig
+from core.factory import DetectorFactory
+from benchmarks.common import synthetic_clip, time_call, match_counts
+from utils.metrics import f1_score
+
+
+def run(width: int, height: int, frames: int, warmup: int, methods) -> None:
+    clip = list(synthetic_clip(width, height, frames))
+
+    print(f'{width}x{height}, {frames} frames ({warmup} warm-up frames not scored)')
+    print(f'{"method":>20} {"ms/frame":>10} {"fps":>7} {"precision":>10} '
+          f'{"recall":>7} {"f1":>6}')
+
+    for method in methods:
+        config = GlobalConfig()
+        config.adaptive.warm_start = False  # Без снимков фона с прошлых запусков
+        config.flow.enabled = False  # Сравнивается только детектор
+        detector = DetectorFactory.create(method, config)
+
+        total_ms = 0.0
+        tp = fp = fn = 0
+        for index, (frame, truth) in enumerate(clip):
+            elapsed, batch = time_call(detector.process, frame)
+            if index < warmup:
+                continue
+
+            total_ms += elapsed
+            predicted = [tuple(int(v) for v in box) for box in batch.bboxes]
+            t, p, f = match_counts(predicted, truth)
+            tp += t
+            fp += p
+            fn += f
+        detector.close()
+
+        scored = max(1, len(clip) - warmup)
+        ms = total_ms / scored
+        precision, recall, f1 = f1_score(tp, fp, fn)
+        print(f'{method:>20} {ms:>10.2f} {1000 / ms if ms else 0:>7.1f} '
+              f'{precision:>10.2f} {recall:>7.2f} {f1:>6.2f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--warmup', type=int, default=30)
+    parser.add_argument('--methods', nargs='+',
+                        default=['ADAPTIVE_BACKGROUND', 'RUNNING_AVERAGE'])
+    args = parser.parse_args()
+
+    run(args.width, args.height, args.frames, args.warmup, args.methods)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Бенчмарк тайловой обработки против обработки одним тайлом
+
+Запуск: python -m benchmarks.bench_tiling
+"""
+
+import argparse
+from models.config import GlobalConfig
+from core.detectors.contour import ContourDetector
+from benchmarks.common import synthetic_clip, time_call, match_counts
+
+
+def run(width: int, height: int, frames: int, tile_sizes, overlap: int,
+        workers: int) -> None:
+    clip = list(synthetic_clip(width, height, frames))
+
+    print(f'{width}x{height}, {frames} frames')
+    print(f'{"mode":>16} {"ms/frame":>10} {"objects":>8} {"recall":>7}')
+
+    for tile_size in [None] + list(tile_sizes):
+        config = GlobalConfig()
+        config.contour.threshold = 100
+        if tile_size is not None:
+            config.tiling.enabled = True
+            config.tiling.tile_size = tile_size
+            config.tiling.overlap = overlap
+            config.tiling.workers = workers
+        detector = ContourDetector(config)
+
+        total_ms = 0.0
+        found = 0
+        tp = fn = 0
+        for frame, truth in clip:
+            elapsed, batch = time_call(detector.detect, frame)
+            total_ms += elapsed
+            found += len(batch)
+            predicted = [tuple(int(v) for v in box) for box in batch.bboxes]
+            t, _, f = match_counts(predicted, truth)
+            tp += t
+            fn += f
+        detector.close()
+
+        mode = 'single' if tile_size is None else f'tile {tile_size}'
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        print(f'{mode:>16} {total_ms / len(clip):>10.2f} '
+              f'{found / len(clip):>8.1f} {recall:>7.2f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=int, default=3840)
+    parser.add_argument('--height', type=int, default=2160)
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--tiles', type=int, nargs='+', default=[512, 1024])
+    parser.add_argument('--overlap', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    run(args.width, args.height, args.frames, args.tiles, args.overlap,
+        args.workers)
+
+
+if __name__ == '__main__':
+    main()
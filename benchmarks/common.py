@@ -0,0 +1,53 @@
+"""Общие средства бенчмарков"""
+
+import time
+import cv2
+import numpy as np
+from typing import Callable, Iterator, List, Tuple
+from utils.metrics import Box, box_iou, match_counts
+
+
+def synthetic_clip(width: int = 1920, height: int = 1080, frames: int = 60,
+                   objects: int = 20, noise: int = 6,
+                   seed: int = 0) -> Iterator[Tuple[np.ndarray, List[Box]]]:
+    """Синтетический ролик: движущиеся объекты на шумном фоне
+
+    Возвращает пары (кадр BGR, истинные прямоугольники объектов).
+    """
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(
+        rng.integers(0, 60, (height, width, 3), dtype=np.uint8), (0, 0), 8
+    )
+
+    sizes = rng.integers(8, 40, objects)
+    positions = rng.uniform([0, 0], [width - 40, height - 40], (objects, 2))
+    velocities = rng.uniform(-6, 6, (objects, 2))
+    colors = rng.integers(120, 256, (objects, 3))
+
+    for _ in range(frames):
+        frame = background.copy()
+        if noise:
+            frame = cv2.add(frame, rng.integers(0, noise, frame.shape, dtype=np.uint8))
+
+        boxes = []
+        for size, (x, y), color in zip(sizes, positions, colors):
+            x, y, size = int(x), int(y), int(size)
+            cv2.rectangle(frame, (x, y), (x + size, y + size),
+                          tuple(int(c) for c in color), -1)
+            boxes.append((x, y, size + 1, size + 1))
+
+        yield frame, boxes
+
+        positions += velocities
+        bounce = (positions < 0) | (positions > [width - 40, height - 40])
+        velocities[bounce] *= -1
+        positions = np.clip(positions, 0, [width - 40, height - 40])
+
+
+def time_call(func: Callable, *args, repeat: int = 1) -> Tuple[float, object]:
+    """Среднее время вызова в миллисекундах и результат последнего вызова"""
+    result = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - start) * 1000 / repeat, result
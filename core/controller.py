@@ -3,21 +3,25 @@
 import threading
 import time
 import queue
-from typing import Any
+from typing import Any, Optional, Tuple
 from .capture import WindowCapture
 from .factory import DetectorFactory
+from .gating import MotionGate
+from .occupancy import OccupancyMap
 from .renderer import OverlayRenderer
 from .statistics import TrackingStatistics
 from models.config import GlobalConfig
+from models.detection import DetectionBatch
 from models.enums import TrackingMethod
 from utils.logger import logger
+from utils.mailbox import Mailbox
 
 
 class TrackingController:
     """Основной контроллер приложения"""
 
-    def __init__(self):
-        self.config = GlobalConfig()
+    def __init__(self, config: Optional[GlobalConfig] = None):
+        self.config = config or GlobalConfig()
         self._is_running = False
         self._thread = None
 
@@ -27,9 +31,19 @@ class TrackingController:
             self.config.method, self.config
         )
         self.renderer = OverlayRenderer(self.config)
+        self._display_size = (0, 0)
+        self.gate = MotionGate(
+            self.config.gate,
+            stateful=DetectorFactory.info(self.config.method).stateful
+        )
+        self.occupancy = OccupancyMap(self.config.occupancy)
+        self._history_time = 0.0
+
+        # Замененные объекты закрываются циклом отслеживания между кадрами
+        self._retired: queue.SimpleQueue = queue.SimpleQueue()
 
-        # Очереди для межпоточного обмена
-        self._overlay_queue = queue.Queue(maxsize=2)
+        # Межпоточный обмен: в UI уходит только последний оверлей
+        self._overlay_mailbox: Mailbox = Mailbox()
         self._stats_queue = queue.Queue(maxsize=10)
 
         # Статистика
@@ -59,53 +73,134 @@ class TrackingController:
 
         if self._thread:
             self._thread.join(timeout=2)
+        self._close_retired()
+        self.occupancy.flush()
 
         logger.info("Tracking stopped")
 
     def switch_method(self, method: TrackingMethod) -> None:
         """Переключение метода детекции"""
         self.config.method = method
-        self.detector = DetectorFactory.create(method, self.config)
+        detector, self.detector = self.detector, DetectorFactory.create(method, self.config)
+        self._retire(detector)
+        self.gate.reset(DetectorFactory.info(method).stateful)
 
         logger.info(f"Switched to method: {method.value}")
 
     def update_config(self, config: GlobalConfig) -> None:
         """Обновление конфигурации"""
         self.config = config
-        self.detector = DetectorFactory.create(config.method, config)
+        detector, self.detector = self.detector, DetectorFactory.create(config.method, config)
+        self._retire(detector)
         self.renderer = OverlayRenderer(config)
+        self.renderer.set_display_size(*self._display_size)
+        self.gate = MotionGate(
+            config.gate, stateful=DetectorFactory.info(config.method).stateful
+        )
+        # Старое кольцо может быть в записи в цикле отслеживания
+        occupancy, self.occupancy = self.occupancy, OccupancyMap(config.occupancy)
+        self._retire(occupancy)
+        self._history_time = 0.0
 
         logger.info("Configuration updated")
 
+    def _retire(self, resource) -> None:
+        """Закрытие замененного объекта, когда цикл отслеживания перестанет
+        его использовать (сразу, если цикл не запущен)"""
+        if self._thread is not None and self._thread.is_alive():
+            self._retired.put(resource)
+        else:
+            resource.close()
+
+    def _close_retired(self) -> None:
+        """Закрытие замененных объектов (цикл вызывает между кадрами)"""
+        while True:
+            try:
+                resource = self._retired.get_nowait()
+            except queue.Empty:
+                return
+            resource.close()
+
+    def set_display_size(self, width: int, height: int) -> None:
+        """Размер области отображения: оверлей рендерится сразу в нем"""
+        self._display_size = (width, height)
+        self.renderer.set_display_size(width, height)
+
+    @property
+    def frame_size(self) -> Optional[Tuple[int, int]]:
+        """Размер (ширина, высота) кадра, по которому построен оверлей"""
+        return self.renderer.source_size
+
+    def add_exclusion_zone(self, zone) -> None:
+        """Добавление зоны исключения (x1, y1, x2, y2) в координатах кадра"""
+        # Новый список целиком: поток детекции видит согласованные зоны
+        exclusion = self.config.exclusion
+        exclusion.zones = exclusion.zones + [tuple(int(v) for v in zone)]
+
+        logger.info(f"Exclusion zone added: {exclusion.zones[-1]}")
+
+    def clear_exclusion_zones(self) -> None:
+        """Удаление всех зон исключения"""
+        self.config.exclusion.zones = []
+
+        logger.info("Exclusion zones cleared")
+
+    def _update_occupancy(self, frame, detections) -> None:
+        """Запись карты занятости и обновление окна истории тепловой карты"""
+        cfg = self.config.occupancy
+        now = time.time()
+        if cfg.enabled:
+            self.occupancy.add(DetectionBatch.from_results(detections).centers,
+                               frame.shape, now)
+
+        if now - self._history_time < cfg.refresh_interval:
+            return
+        self._history_time = now
+
+        history = None
+        if cfg.history_hours > 0 and self.config.display.show_heatmap:
+            if self.occupancy.open(frame.shape, create=cfg.enabled):
+                history = self.occupancy.window(now - cfg.history_hours * 3600, now)
+        self.renderer.heatmap.set_history(history)
+
     def _tracking_loop(self) -> None:
         """Основной цикл обработки"""
         last_stat_time = time.time()
+        last_frame = None
 
         while self._is_running:
             try:
-                # Получение кадра
+                self._close_retired()
+
+                # Получение кадра (уже обработанный кадр не повторяется:
+                # оверлей накладывается на него на месте)
                 frame = self.capture.get_frame()
-                if frame is None:
+                if frame is None or frame is last_frame:
                     time.sleep(0.01)
                     continue
+                last_frame = frame
 
-                # Детекция
-                detections = self.detector.process(frame)
+                # Детекция (статичные кадры пропускаются)
+                detections = self.gate.process(self.detector, frame)
+                self._update_occupancy(frame, detections)
 
                 # Рендеринг
-                overlay = self.renderer.render(frame, detections)
+                overlay = self.renderer.render(
+                    self.detector.display_frame(frame), detections
+                )
 
-                # Отправка в UI
-                if not self._overlay_queue.full():
-                    try:
-                        self._overlay_queue.put_nowait(overlay)
-                    except queue.Full:
-                        pass
+                # Отправка в UI (непоказанный оверлей заменяется)
+                self._overlay_mailbox.put(overlay)
 
                 # Обновление статистики
                 current_time = time.time()
                 if current_time - last_stat_time >= 1.0:
                     stats = self._stats.update(detections, self.capture.fps)
+                    stats['detector'] = self.detector.get_stats()
+                    stats['detector'].update(self.gate.get_stats())
+                    stats['detector'].update(self.renderer.get_stats())
+                    stats['detector'].update(self.occupancy.get_stats())
+                    stats['detector']['overlays_superseded'] = self._overlay_mailbox.superseded
                     if not self._stats_queue.full():
                         try:
                             self._stats_queue.put_nowait(stats)
@@ -121,9 +216,9 @@ class TrackingController:
                 time.sleep(0.1)
 
     @property
-    def overlay_queue(self) -> queue.Queue:
-        """Очередь оверлеев для UI"""
-        return self._overlay_queue
+    def overlay_mailbox(self) -> Mailbox:
+        """Последний оверлей для UI"""
+        return self._overlay_mailbox
 
     @property
     def stats_queue(self) -> queue.Queue:
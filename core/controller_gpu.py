@@ -1,49 +1,43 @@
-"""Контроллер с поддержкой GPU"""
+"""Контроллер с асинхронным рендерингом и выбором бэкенда"""
 
 import threading
 import time
 import queue
 from typing import Optional
-from .capture import WindowCapture
+from .controller import TrackingController
 from .factory import DetectorFactory
+from .gating import MotionGate
+from .occupancy import OccupancyMap
 from .renderer_gpu import AsyncRenderer, RendererFactory
-from .statistics import TrackingStatistics
 from models.config import GlobalConfig
-from models.enums import TrackingMethod
+from models.enums import RenderBackend
 from utils.logger import logger
 from utils.gpu_check import gpu_manager
 
 
-class GPUTrackingController:
-    """Контроллер с поддержкой GPU"""
+class GPUTrackingController(TrackingController):
+    """Контроллер с пулом потоков рендеринга и бэкендом OpenCL/CPU
 
-    def __init__(self):
-        self.config = GlobalConfig()
-        self._is_running = False
-        self._thread = None
+    Детекция идет в основном цикле, рендеринг - в ``AsyncRenderer``:
+    кадр ставится в очередь и цикл сразу переходит к следующему, а в UI
+    отправляется самый свежий готовый оверлей. Без GPU используется CPU.
+    """
+
+    def __init__(self, config: Optional[GlobalConfig] = None):
+        super().__init__(config)
 
         # Определение оптимального бэкенда
         self._detect_optimal_backend()
+        self._start_renderer(self.config)
 
-        # Инициализация компонентов
-        self.capture = WindowCapture(self.config)
-        self.detector = DetectorFactory.create(self.config.method, self.config)
-        self.renderer = AsyncRenderer(self.config)
-
-        # Очереди для межпоточного обмена
-        self._overlay_queue = queue.Queue(maxsize=3)
-        self._stats_queue = queue.Queue(maxsize=10)
-
-        # Статистика
-        self._stats = TrackingStatistics()
-        self._render_stats = {
-            'render_time': 0,
-            'fps': 0,
-            'frame_count': 0,
-            'start_time': time.time()
-        }
+    def _start_renderer(self, config: GlobalConfig) -> None:
+        """Создание пула рендеринга"""
+        self.renderer = AsyncRenderer(config)
+        self.renderer.set_display_size(*self._display_size)
+        # Размеры пула копируются: окно настроек меняет конфигурацию на месте
+        self._render_pool = (config.render.workers, config.render.queue_size)
 
-    def _detect_optimal_backend(self):
+    def _detect_optimal_backend(self) -> None:
         """Определение оптимального бэкенда"""
         if not self.config.render.backend:
             optimal = gpu_manager.get_optimal_backend()
@@ -72,107 +66,99 @@ class GPUTrackingController:
         """Остановка отслеживания"""
         self._is_running = False
         self.capture.stop()
-        self.renderer.stop()
 
         if self._thread:
             self._thread.join(timeout=2)
+        self._close_retired()
+        self.renderer.stop()
+        self.occupancy.flush()
 
         logger.info("GPU tracking stopped")
 
-    def switch_method(self, method: TrackingMethod) -> None:
-        """Переключение метода детекции"""
-        self.config.method = method
-        self.detector = DetectorFactory.create(method, self.config)
-
-        logger.info(f"Switched to method: {method.value}")
-
-    def switch_backend(self, backend) -> None:
+    def switch_backend(self, backend: RenderBackend) -> None:
         """Переключение бэкенда рендеринга"""
         self.config.render.backend = backend
-        self.renderer.stop()
-        self.renderer = AsyncRenderer(self.config)
-        self.renderer.start()
+        self.renderer.renderer = RendererFactory.create(self.config)
 
         logger.info(f"Switched to render backend: {backend.value}")
 
     def update_config(self, config: GlobalConfig) -> None:
         """Обновление конфигурации"""
-        old_backend = self.config.render.backend
         self.config = config
+        self._detect_optimal_backend()
 
-        # Пересоздаем детектор
-        self.detector = DetectorFactory.create(config.method, config)
-
-        # Пересоздаем рендерер если изменился бэкенд
-        if old_backend != config.render.backend:
+        detector, self.detector = self.detector, DetectorFactory.create(config.method, config)
+        self._retire(detector)
+        self.gate = MotionGate(
+            config.gate, stateful=DetectorFactory.info(config.method).stateful
+        )
+        # Старое кольцо может быть в записи в цикле отслеживания
+        occupancy, self.occupancy = self.occupancy, OccupancyMap(config.occupancy)
+        self._retire(occupancy)
+        self._history_time = 0.0
+
+        if self._render_pool != (config.render.workers, config.render.queue_size):
+            # Пересоздание пула с новым числом потоков или размером очереди
+            running = self._is_running
             self.renderer.stop()
-            self.renderer = AsyncRenderer(config)
-            self.renderer.start()
+            self._start_renderer(config)
+            if running:
+                self.renderer.start()
         else:
-            # Обновляем конфигурацию существующего рендерера
+            # Потоки пересоздадут свои рендереры по новой конфигурации
             self.renderer.renderer = RendererFactory.create(config)
+            self.renderer.config = config
 
         logger.info("Configuration updated")
 
     def _tracking_loop(self) -> None:
         """Основной цикл обработки"""
         last_stat_time = time.time()
-        last_render_stat_time = time.time()
+        last_frame = None
 
         while self._is_running:
             try:
-                # Получение кадра
+                self._close_retired()
+
+                # Получение кадра (уже обработанный кадр не повторяется)
                 frame = self.capture.get_frame()
-                if frame is None:
+                if frame is None or frame is last_frame:
                     time.sleep(0.01)
                     continue
+                last_frame = frame
 
-                # Детекция
-                detections = self.detector.process(frame)
-
-                # Асинхронный рендеринг
-                task_id = self.renderer.submit(frame, detections)
+                # Детекция (статичные кадры пропускаются)
+                detections = self.gate.process(self.detector, frame)
+                self._update_occupancy(frame, detections)
 
-                if task_id >= 0:
-                    # Получение результата рендеринга
-                    result = self.renderer.get_result(timeout=0.01)
-                    if result:
-                        # Отправка в UI
-                        if not self._overlay_queue.full():
-                            try:
-                                self._overlay_queue.put_nowait(result.overlay)
-                            except queue.Full:
-                                pass
+                # Асинхронный рендеринг: при полной очереди кадр пропускается
+                self.renderer.submit(self.detector.display_frame(frame), detections)
 
-                        # Статистика рендеринга
-                        self._update_render_stats(result.render_time)
+                # Отправка в UI самого свежего готового оверлея
+                result = self.renderer.get_result(timeout=0)
+                if result is not None:
+                    self._overlay_mailbox.put(result.overlay)
 
                 # Обновление статистики
                 current_time = time.time()
                 if current_time - last_stat_time >= 1.0:
                     stats = self._stats.update(detections, self.capture.fps)
-                    stats['render_fps'] = self._render_stats['fps']
-                    stats['render_time_ms'] = self._render_stats['render_time'] * 1000
-
-                    # Информация о GPU
+                    stats['detector'] = self.detector.get_stats()
+                    stats['detector'].update(self.gate.get_stats())
+                    stats['detector'].update(self.renderer.get_stats())
+                    stats['detector'].update(self.occupancy.get_stats())
+                    stats['detector']['overlays_superseded'] = self._overlay_mailbox.superseded
+                    stats['detector']['render_backend'] = self.config.render.backend.value
                     if gpu_manager.has_gpu:
-                        stats['gpu_backend'] = self.config.render.backend.value
-                        stats['gpu_device'] = gpu_manager.capabilities.gpu_name
+                        stats['detector']['gpu_device'] = gpu_manager.capabilities.gpu_name
 
                     if not self._stats_queue.full():
                         try:
                             self._stats_queue.put_nowait(stats)
                         except queue.Full:
                             pass
-
                     last_stat_time = current_time
 
-                # Обновление статистики рендеринга
-                if current_time - last_render_stat_time >= 2.0:
-                    self._render_stats['fps'] = self._render_stats['frame_count'] / 2.0
-                    self._render_stats['frame_count'] = 0
-                    last_render_stat_time = current_time
-
                 # Задержка для контроля FPS
                 time.sleep(self.config.update_interval)
 
@@ -180,28 +166,6 @@ class GPUTrackingController:
                 logger.error(f"Tracking loop error: {e}")
                 time.sleep(0.1)
 
-    def _update_render_stats(self, render_time: float):
-        """Обновление статистики рендеринга"""
-        self._render_stats['render_time'] = (
-                self._render_stats['render_time'] * 0.9 + render_time * 0.1
-        )
-        self._render_stats['frame_count'] += 1
-
-    @property
-    def overlay_queue(self) -> queue.Queue:
-        """Очередь оверлеев для UI"""
-        return self._overlay_queue
-
-    @property
-    def stats_queue(self) -> queue.Queue:
-        """Очередь статистики для UI"""
-        return self._stats_queue
-
-    @property
-    def is_running(self) -> bool:
-        """Статус работы"""
-        return self._is_running
-
     def get_gpu_info(self) -> dict:
         """Получение информации о GPU"""
         caps = gpu_manager.get_capabilities()
@@ -213,4 +177,4 @@ class GPUTrackingController:
             'opencl_available': caps.opencl_available,
             'available_backends': [b.value for b in caps.backends],
             'current_backend': self.config.render.backend.value
-        }
\ No newline at end of file
+        }
@@ -1,19 +1,35 @@
 """Детектор с адаптивным фоном"""
 
 import cv2
+import json
 import numpy as np
-from typing import List
+import os
+import tempfile
+import threading
+import time
+from typing import List, Dict, Any
 from .base import ObjectDetector
-from models.detection import DetectionResult
+from .components import ComponentSet
+from models.detection import DetectionResult, DetectionBatch
 from models.config import GlobalConfig, AdaptiveConfig
 from models.enums import ObjectCategory
 from utils.logger import logger
+from utils.rects import merge_overlapping
 
 
 class AdaptiveDetector(ObjectDetector):
-    """Детектор с адаптивным фоном"""
+    """Детектор с адаптивным фоном
 
-    def __init__(self, config: GlobalConfig):
+    Долгоживущий экземпляр (``persistent``) периодически сохраняет фон
+    модели на диск и при запуске начинает с сохраненного снимка, а первые
+    ``bootstrap_frames`` кадров обучается со скоростью 1/2k вместо
+    ``learning_rate``, чтобы не ждать ``history_length`` кадров.
+    """
+
+    # Рамка области, не входящая в плотность границ (контур объекта)
+    TEXTURE_INSET = 2
+
+    def __init__(self, config: GlobalConfig, persistent: bool = True):
         super().__init__(config)
         cfg = config.adaptive
         self.config_obj: AdaptiveConfig = cfg
@@ -23,14 +39,46 @@ class AdaptiveDetector(ObjectDetector):
             detectShadows=cfg.detect_shadows
         )
 
-    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+        # Быстрый старт модели фона
+        self._persistent = persistent
+        self._model_shape = None
+        self._frames_learned = 0
+        self._warm_started = False
+        self._last_snapshot = time.time()
+        self._fg_ratio = 0.0
+        self._snapshot_thread = None
+
+        # Статистика режима пониженного разрешения
+        self._bg_time = 0.0
+        self._candidates = 0
+        self._confirmed = 0
+
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
         cfg = self.config_obj
 
+        scale = cfg.processing_scale
+        if scale < 1.0:
+            model_frame = cv2.resize(frame, None, fx=scale, fy=scale,
+                                     interpolation=cv2.INTER_AREA)
+        else:
+            model_frame = frame
+
+        if model_frame.shape != self._model_shape:
+            self._start_model(model_frame.shape)
+
         # Вычитание фона
+        start = time.perf_counter()
         fg_mask = self._background_subtractor.apply(
-            frame,
-            learningRate=cfg.learning_rate
+            model_frame,
+            learningRate=self._learning_rate()
         )
+        self._bg_time = self._bg_time * 0.9 + (time.perf_counter() - start) * 0.1
+        self._frames_learned += 1
+
+        if self._persistent:
+            self._fg_ratio = (self._fg_ratio * 0.9 +
+                              cv2.countNonZero(fg_mask) / fg_mask.size * 0.1)
+            self._maybe_save_snapshot()
 
         # Обработка маски
         kernel = np.ones((3, 3), np.uint8)
@@ -41,65 +89,292 @@ class AdaptiveDetector(ObjectDetector):
         if cfg.detect_shadows:
             fg_mask[fg_mask == 127] = 0
 
-        # Детекция объектов
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL,
-                                       cv2.CHAIN_APPROX_SIMPLE)
+        # Зоны исключения и мерцание (в масштабе модели фона)
+        fg_mask = self._prepare_mask(fg_mask)
 
-        results = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
+        # Детекция объектов через связные компоненты
+        components = self._find_components(fg_mask)
 
-            if area < 100 or area > 10000:
-                continue
+        if scale < 1.0:
+            # Грубый отбор кандидатов на уменьшенной маске
+            area_scale = scale * scale
+            components = components.filter_pixel_area(max(1.0, 100 * area_scale),
+                                                      10000 * area_scale)
+            self._candidates = len(components)
 
-            x, y, w, h = cv2.boundingRect(contour)
+            # Уточнение кандидатов на полном разрешении
+            components = self._refine_components(frame, components, scale)
+            self._confirmed = len(components)
 
-            # Фильтрация по форме
-            if min(w, h) == 0:
-                continue
-            if max(w, h) / min(w, h) > 4:
-                continue
+        components = components.filter_area(100, 10000)
 
-            center_x = x + w // 2
-            center_y = y + h // 2
+        # Фильтрация по форме
+        components = components.filter_elongation(4)
 
-            # Проверка границ для безопасного извлечения ROI
-            if y < 0 or y + h > frame.shape[0] or x < 0 or x + w > frame.shape[1]:
-                continue
+        # Анализ текстуры только для выживших компонент
+        texture_scores = self._analyze_texture(frame, components.boxes)
+        confidences = np.where(texture_scores > 0, texture_scores, 0.5)
+
+        return self._batch_from_components(components, confidences)
+
+    def _learning_rate(self) -> float:
+        """Скорость обучения с ускоренным стартом 1/2k (как авто-режим MOG2)"""
+        cfg = self.config_obj
+        if self._persistent and self._frames_learned < cfg.bootstrap_frames:
+            return max(cfg.learning_rate, 1.0 / max(1, 2 * self._frames_learned))
+        return cfg.learning_rate
+
+    def _start_model(self, shape) -> None:
+        """Начало обучения модели для нового размера кадра"""
+        self._model_shape = shape
+        self._frames_learned = 0
+        self._warm_started = False
+
+        if not (self._persistent and self.config_obj.warm_start):
+            return
+
+        snapshot = self._load_snapshot(shape)
+        if snapshot is not None:
+            # learningRate=1 заменяет модель снимком; ускоренное обучение
+            # не нужно и только втянуло бы в фон объекты первых кадров
+            self._background_subtractor.apply(snapshot, learningRate=1.0)
+            self._frames_learned = self.config_obj.bootstrap_frames
+            self._warm_started = True
+
+    def _snapshot_paths(self):
+        """Пути изображения фона и метаданных снимка"""
+        image_path = self.config_obj.snapshot_path
+        return image_path, os.path.splitext(image_path)[0] + '.json'
+
+    def _load_snapshot(self, shape):
+        """Загрузка снимка фона, подходящего по размеру и возрасту"""
+        cfg = self.config_obj
+        image_path, meta_path = self._snapshot_paths()
+        if not (os.path.exists(image_path) and os.path.exists(meta_path)):
+            return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            age = time.time() - meta.get('saved_at', 0)
+            if tuple(meta.get('shape', ())) != tuple(shape) or age > cfg.snapshot_max_age:
+                logger.info("Background snapshot skipped: size or age mismatch")
+                return None
+
+            image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+            if image is None or image.shape != tuple(shape):
+                return None
+
+            logger.info(f"Background model warm-started from snapshot "
+                        f"({age / 60:.0f} min old, {meta.get('frames_learned', 0)} frames)")
+            return image
+
+        except Exception as e:
+            logger.error(f"Failed to load background snapshot: {e}")
+            return None
 
-            roi = frame[y:y + h, x:x + w]
-            if roi.size == 0:
+    def _maybe_save_snapshot(self) -> None:
+        """Периодическое сохранение фона модели и статистики
+
+        Снимок сохраняет только долгоживущий детектор с включенным быстрым
+        стартом, поэтому подбор параметров и бенчмарки (``warm_start=False``)
+        не перезаписывают снимок живого запуска. Фон копируется в потоке
+        детекции, а кодирование PNG и запись идут в отдельном потоке.
+        """
+        cfg = self.config_obj
+        now = time.time()
+        if (not cfg.warm_start or
+                now - self._last_snapshot < cfg.snapshot_interval or
+                self._frames_learned < cfg.bootstrap_frames):
+            return
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+        self._last_snapshot = now
+
+        meta = {
+            'shape': list(self._model_shape),
+            'saved_at': now,
+            'frames_learned': self._frames_learned,
+            'foreground_ratio': self._fg_ratio,
+            'history_length': cfg.history_length,
+            'var_threshold': cfg.var_threshold,
+            'processing_scale': cfg.processing_scale
+        }
+        background = self._background_subtractor.getBackgroundImage()
+
+        # Не фоновый поток: выход программы дожидается записи снимка
+        self._snapshot_thread = threading.Thread(
+            target=self._save_snapshot, args=(background, meta),
+            name="BackgroundSnapshot"
+        )
+        self._snapshot_thread.start()
+
+    def _save_snapshot(self, background: np.ndarray, meta: Dict[str, Any]) -> None:
+        """Запись снимка во временные файлы с уникальными именами и атомарная замена"""
+        image_path, meta_path = self._snapshot_paths()
+        try:
+            directory = os.path.dirname(image_path) or '.'
+            os.makedirs(directory, exist_ok=True)
+
+            ok, encoded = cv2.imencode(os.path.splitext(image_path)[1] or '.png', background)
+            if not ok:
+                raise RuntimeError('background image encoding failed')
+            self._write_atomic(image_path, encoded.tobytes())
+            self._write_atomic(meta_path, json.dumps(meta, indent=2).encode('utf-8'))
+
+        except Exception as e:
+            logger.error(f"Failed to save background snapshot: {e}")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        """Запись через временный файл в том же каталоге"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                        suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _refine_components(self, frame: np.ndarray, components: ComponentSet,
+                           scale: float) -> ComponentSet:
+        """Уточнение кандидатов с уменьшенной маски на полном разрешении
+
+        Прямоугольники кандидатов переводятся в координаты кадра с запасом;
+        соприкасающиеся и перекрывающиеся области объединяются. Внутри
+        каждой области маска строится заново по разности с фоном модели
+        и делится на связные компоненты со своими масками. Кандидат, в
+        области которого разность не превысила порог, отбрасывается.
+        """
+        if len(components) == 0:
+            return components
+
+        cfg = self.config_obj
+        frame_h, frame_w = frame.shape[:2]
+        background = cv2.cvtColor(
+            self._background_subtractor.getBackgroundImage(),
+            cv2.COLOR_BGR2GRAY
+        )
+
+        # Масштабы модели по осям (размер модели округлен при уменьшении)
+        scale_x = background.shape[1] / frame_w
+        scale_y = background.shape[0] / frame_h
+
+        # Области кандидатов на полном разрешении с запасом (на 1 пиксель
+        # шире, чтобы соприкасающиеся области тоже объединились)
+        pad = int(np.ceil(1.0 / scale)) + 1
+        regions = []
+        for x, y, w, h in components.boxes:
+            x1 = max(0, int(x / scale) - pad)
+            y1 = max(0, int(y / scale) - pad)
+            x2 = min(frame_w, int((x + w) / scale) + pad)
+            y2 = min(frame_h, int((y + h) / scale) + pad)
+            if x2 > x1 and y2 > y1:
+                regions.append((x1, y1, x2, y2))
+
+        boxes = []
+        areas = []
+        centroids = []
+        patches = []
+        for x1, y1, x2, y2 in merge_overlapping(regions):
+            # Фон модели только для этой области: пиксель (x1 + u, y1 + v)
+            # кадра берется из той же точки модели, что и при cv2.resize
+            transform = np.float32([
+                [scale_x, 0, (x1 + 0.5) * scale_x - 0.5],
+                [0, scale_y, (y1 + 0.5) * scale_y - 0.5]
+            ])
+            bg_roi = cv2.warpAffine(
+                background, transform, (x2 - x1, y2 - y1),
+                flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                borderMode=cv2.BORDER_REPLICATE
+            )
+            gray_roi = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+            diff = cv2.absdiff(gray_roi, bg_roi)
+            _, roi_mask = cv2.threshold(diff, cfg.refine_threshold, 255,
+                                        cv2.THRESH_BINARY)
+
+            # Компоненты области с масками в пределах своих прямоугольников
+            found = ComponentSet.from_mask(roi_mask).detach()
+            if len(found) == 0:
                 continue
+            boxes.append(found.boxes + np.array([x1, y1, 0, 0], dtype=np.int32))
+            areas.append(found.areas)
+            centroids.append(found.centroids + (x1, y1))
+            patches.extend(found.patches)
+
+        if not boxes:
+            return ComponentSet.empty()
+
+        boxes = np.concatenate(boxes).astype(np.int32)
+        refined = ComponentSet(
+            labels=None,
+            ids=np.arange(1, len(boxes) + 1, dtype=np.int32),
+            boxes=boxes,
+            areas=np.concatenate(areas).astype(np.int32),
+            centroids=np.concatenate(centroids)
+        )
+        refined.patches = patches
+        return refined
 
-            category = self._classify_object(w, h, area)
-            texture_score = self._analyze_texture(roi)
-            confidence = texture_score if texture_score > 0 else 0.5
-
-            result = DetectionResult(
-                bbox=(x, y, w, h),
-                center=(center_x, center_y),
-                area=area,
-                contour=contour,
-                category=category,
-                confidence=confidence
+    def get_stats(self) -> Dict[str, Any]:
+        scale = self.config_obj.processing_scale
+        stats = super().get_stats()
+        stats.update({
+            'bg_scale': scale,
+            'bg_time_ms': self._bg_time * 1000
+        })
+        if self._persistent:
+            stats['warm_started'] = self._warm_started
+            stats['bootstrap_left'] = max(
+                0, self.config_obj.bootstrap_frames - self._frames_learned
             )
-            results.append(result)
+        if scale < 1.0:
+            # Выигрыш по пикселям и потеря мелких объектов
+            stats['bg_speedup'] = 1.0 / (scale * scale)
+            stats['min_object_px'] = 3.0 / scale
+            stats['candidates'] = self._candidates
+            stats['confirmed'] = self._confirmed
+        return stats
 
-        return results
+    def _analyze_texture(self, frame: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """Анализ текстуры областей по плотности границ
 
-    def _analyze_texture(self, roi: np.ndarray) -> float:
-        """Анализ текстуры области"""
-        if roi.size == 0:
-            return 0.0
+        Карта границ строится один раз на кадр и только при наличии
+        кандидатов; плотность каждой области берется из интегрального
+        изображения за O(1). Рамка в ``TEXTURE_INSET`` пикселей не
+        учитывается: на полном кадре там лежит контур самого объекта,
+        которого не было при поиске границ внутри вырезанной области.
+        """
+        if len(boxes) == 0:
+            return np.empty(0, dtype=np.float32)
 
         try:
-            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             edges = cv2.Canny(gray, 50, 150)
 
-            edge_density = np.sum(edges > 0) / edges.size
-            return min(edge_density * 3, 1.0)
-        except:
-            return 0.5
+            # Интеграл по бинарной карте границ (0/1)
+            integral = cv2.integral(edges // 255, sdepth=cv2.CV_32S)
+
+            inset = self.TEXTURE_INSET
+            x_end = boxes[:, 0] + boxes[:, 2]
+            y_end = boxes[:, 1] + boxes[:, 3]
+            x1 = np.minimum(boxes[:, 0] + inset, x_end)
+            y1 = np.minimum(boxes[:, 1] + inset, y_end)
+            x2 = np.maximum(x1, x_end - inset)
+            y2 = np.maximum(y1, y_end - inset)
+            edge_count = (integral[y2, x2] - integral[y1, x2]
+                          - integral[y2, x1] + integral[y1, x1])
+
+            box_area = ((x2 - x1) * (y2 - y1)).astype(np.float32)
+            edge_density = np.divide(edge_count, box_area,
+                                     out=np.zeros_like(box_area), where=box_area > 0)
+            return np.minimum(edge_density * 3, 1.0)
+        except Exception:
+            return np.full(len(boxes), 0.5, dtype=np.float32)
 
     def _get_config(self):
         return self.config_obj
\ No newline at end of file
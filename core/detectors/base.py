@@ -6,7 +6,11 @@ import time
 from abc import ABC, abstractmethod
 from typing import List, Dict, Tuple, Optional, Callable, Any
 from collections import deque, defaultdict
-from models.detection import DetectionResult
+from .components import ComponentSet
+from ..flow import SparseFlowEstimator
+from ..masking import ExclusionMask
+from ..roi import RoiPlanner
+from models.detection import DetectionResult, DetectionBatch, CATEGORY_CODES
 from models.config import GlobalConfig
 from models.enums import ObjectCategory
 from utils.logger import logger
@@ -15,11 +19,23 @@ from utils.logger import logger
 class ObjectDetector(ABC):
     """Абстрактный детектор объектов"""
 
+    # Категории по площади и скорости (_classify_objects); детекторы со
+    # своей классификацией не пересчитывают их по скорости потока
+    _classify_by_velocity = True
+
     def __init__(self, config: GlobalConfig):
         self.config = config
-        self._tracked_objects: Dict[int, DetectionResult] = {}
+        self._tracked = DetectionBatch.empty()
         self._next_id = 0
         self._observers = []
+        self._exclusion = ExclusionMask(config.exclusion)
+        self._flow = (SparseFlowEstimator(config.flow)
+                      if config.flow.enabled else None)
+        self._roi: Optional[RoiPlanner] = None
+
+    def use_roi(self, planner: Optional[RoiPlanner]) -> None:
+        """Детекция в окнах вокруг треков между полными кадрами"""
+        self._roi = planner
 
     def attach(self, observer: Callable) -> None:
         """Добавление наблюдателя"""
@@ -39,45 +55,214 @@ class ObjectDetector(ABC):
                 logger.error(f"Observer error: {e}")
 
     @abstractmethod
-    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
         """Обнаружение объектов в кадре"""
         pass
 
-    def process(self, frame: np.ndarray) -> List[DetectionResult]:
+    def process(self, frame: np.ndarray) -> DetectionBatch:
         """Обработка кадра и детекция объектов"""
         if frame is None:
-            return []
+            return DetectionBatch.empty()
 
         try:
-            results = self.detect(frame)
+            # Обрезка по зонам исключения, отсекающим края кадра
+            x1, y1, x2, y2 = self._exclusion.begin_frame(frame.shape)
+            if x2 <= x1 or y2 <= y1:
+                return DetectionBatch.empty()
+            windows = (self._roi.plan((x1, y1, x2, y2))
+                       if self._roi is not None else None)
+            if windows is not None:
+                results = self._detect_windows(frame, windows, (x1, y1, x2, y2))
+            else:
+                region = frame
+                if (x2 - x1, y2 - y1) != (frame.shape[1], frame.shape[0]):
+                    region = frame[y1:y2, x1:x2]
+
+                results = DetectionBatch.from_results(self.detect(region))
+                if x1 or y1:
+                    results.translate(x1, y1)
             self._update_tracking(results)
+            if self._roi is not None:
+                self._roi.observe(results)
+
+            # Скорость и направление по оптическому потоку треков; поток
+            # нужен ID треков, поэтому категории уточняются после него
+            if self._flow is not None:
+                self._flow.update(frame, results, time.time())
+                if self._classify_by_velocity:
+                    results.category_codes = self._classify_objects(
+                        results.areas, results.velocities
+                    )
             self.notify('objects_detected', results)
             return results
 
         except Exception as e:
             logger.error(f"Detection error: {e}")
-            return []
+            return DetectionBatch.empty()
+
+    def _detect_windows(self, frame: np.ndarray, windows: List[Tuple[int, int, int, int]],
+                        region: Tuple[int, int, int, int]) -> DetectionBatch:
+        """Детекция в окнах поиска (координаты кадра)
+
+        Объекты, касающиеся внутренней границы окна, отбрасываются: это
+        части объектов за пределами окна, их найдет полный кадр.
+        """
+        x1, y1, x2, y2 = region
+        batches = []
+        try:
+            for wx1, wy1, wx2, wy2 in windows:
+                self._exclusion.set_window((wx1 - x1, wy1 - y1, wx2 - x1, wy2 - y1))
+                batch = DetectionBatch.from_results(
+                    self.detect(frame[wy1:wy2, wx1:wx2])
+                )
+                if not len(batch):
+                    continue
 
-    def _update_tracking(self, new_results: List[DetectionResult]) -> None:
+                bx, by, bw, bh = batch.bboxes.T
+                inside = (((bx > 0) | (wx1 == x1)) &
+                          ((by > 0) | (wy1 == y1)) &
+                          ((bx + bw < wx2 - wx1) | (wx2 == x2)) &
+                          ((by + bh < wy2 - wy1) | (wy2 == y2)))
+                if not np.all(inside):
+                    batch = batch.select(inside)
+                batches.append(batch.translate(wx1, wy1))
+        finally:
+            self._exclusion.set_window(None)
+
+        return DetectionBatch.concat(batches)
+
+    def _update_tracking(self, batch: DetectionBatch) -> None:
         """Обновление трекинга объектов"""
-        current_ids = {r.id for r in new_results}
+        ids = batch.track_ids
+        candidates = self._track_candidates()
+        unknown = ~np.isin(ids, candidates[0]) | (ids == 0)
+        if np.any(unknown) and len(candidates[0]):
+            self._associate(batch, unknown, *candidates)
+            unknown = ids == 0
+
+        # Объекты без известного ID получают новые идентификаторы
+        count = int(np.count_nonzero(unknown))
+        if count:
+            ids[unknown] = self._generate_ids(count)
+
+        # Потерянные объекты просто не переходят в новый пакет
+        self._tracked = batch
+
+    def _track_candidates(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Треки для сопоставления: ID, ожидаемые центры и размеры (w, h)
+
+        Кроме объектов прошлого кадра, это треки, которые планировщик окон
+        продолжает по прогнозу (до ``max_missed`` кадров без подтверждения):
+        найденный снова объект сохраняет свой ID.
+        """
+        tracked = self._tracked
+        ids = tracked.track_ids
+        centers = tracked.centers.astype(np.float32)
+        sizes = tracked.bboxes[:, 2:4]
+        if self._roi is not None:
+            coasted_ids, coasted_centers, coasted_sizes = self._roi.coasted()
+            ids = np.concatenate([ids, coasted_ids])
+            centers = np.concatenate([centers, coasted_centers])
+            sizes = np.concatenate([sizes, coasted_sizes])
+        return ids, centers, sizes
 
-        # Удаление потерянных объектов
-        lost_ids = set(self._tracked_objects.keys()) - current_ids
-        for obj_id in lost_ids:
-            del self._tracked_objects[obj_id]
+    def _associate(self, batch: DetectionBatch, unknown: np.ndarray,
+                   track_ids: np.ndarray, centers: np.ndarray,
+                   sizes: np.ndarray) -> None:
+        """Жадное сопоставление с известными треками по центрам
 
-        # Обновление существующих и добавление новых
-        for result in new_results:
-            if result.id not in self._tracked_objects:
-                result.id = self._generate_id()
-            self._tracked_objects[result.id] = result
+        Пары перебираются по возрастанию расстояния; трек может
+        продолжиться, если центр сместился от ожидаемого не больше
+        размера трека.
+        """
+        free = ~np.isin(track_ids, batch.track_ids[~unknown])
+        candidates = np.flatnonzero(unknown)
+        previous_index = np.flatnonzero(free)
+        if len(candidates) == 0 or len(previous_index) == 0:
+            batch.track_ids[unknown] = 0
+            return
+
+        delta = (batch.centers[candidates, None, :].astype(np.float32) -
+                 centers[None, previous_index, :])
+        distances = np.hypot(delta[..., 0], delta[..., 1])
+        radius = np.maximum(sizes[previous_index].max(axis=1), 20)
+
+        rows, cols = np.nonzero(distances <= radius[None, :])
+        order = np.argsort(distances[rows, cols], kind='stable')
+        assigned = np.zeros(len(candidates), dtype=bool)
+        taken = np.zeros(len(previous_index), dtype=bool)
+        ids = np.zeros(len(candidates), dtype=np.int64)
+        for row, col in zip(rows[order], cols[order]):
+            if assigned[row] or taken[col]:
+                continue
+            assigned[row] = taken[col] = True
+            ids[row] = track_ids[previous_index[col]]
+
+        batch.track_ids[candidates] = ids
 
     def _generate_id(self) -> int:
         """Генерация уникального ID"""
         self._next_id += 1
         return self._next_id
 
+    def _generate_ids(self, count: int) -> np.ndarray:
+        """Генерация блока уникальных ID"""
+        ids = np.arange(self._next_id + 1, self._next_id + 1 + count, dtype=np.int64)
+        self._next_id += count
+        return ids
+
+    def _find_components(self, mask: np.ndarray) -> ComponentSet:
+        """Выделение связных компонент маски одним вызовом"""
+        return ComponentSet.from_mask(mask)
+
+    def _prepare_mask(self, mask: np.ndarray, learn: bool = True) -> np.ndarray:
+        """Исключение игнорируемых зон из маски до выделения компонент"""
+        return self._exclusion.apply(mask, learn)
+
+    def _batch_from_components(self, components: ComponentSet,
+                               confidences: np.ndarray,
+                               category_codes: Optional[np.ndarray] = None,
+                               velocities: Optional[np.ndarray] = None,
+                               directions: Optional[np.ndarray] = None
+                               ) -> DetectionBatch:
+        """Создание пакета результатов для выживших компонент"""
+        if category_codes is None:
+            category_codes = self._classify_objects(components.contour_areas,
+                                                    velocities)
+
+        return DetectionBatch(
+            bboxes=components.boxes,
+            centers=components.centers,
+            areas=components.contour_areas,
+            confidences=confidences,
+            category_codes=category_codes,
+            velocities=velocities,
+            directions=directions,
+            contour_loaders=[components.contour_loader(i)
+                             for i in range(len(components))]
+        )
+
+    def _classify_objects(self, areas: np.ndarray,
+                          velocities: Optional[np.ndarray] = None) -> np.ndarray:
+        """Векторная классификация объектов (см. _classify_object)"""
+        if velocities is None:
+            velocities = np.zeros(len(areas), dtype=np.float32)
+
+        codes = np.select(
+            [
+                areas < 100,
+                (areas < 500) & (velocities > 10.0),
+                areas < 2000
+            ],
+            [
+                CATEGORY_CODES[ObjectCategory.SMALL],
+                CATEGORY_CODES[ObjectCategory.BIRD],
+                CATEGORY_CODES[ObjectCategory.MEDIUM]
+            ],
+            default=CATEGORY_CODES[ObjectCategory.LARGE]
+        )
+        return codes.astype(np.int8)
+
     def _classify_object(self, width: int, height: int, area: int,
                          velocity: float = 0.0) -> ObjectCategory:
         """Классификация объекта"""
@@ -103,6 +288,22 @@ class ObjectDetector(ABC):
         adjusted = value * coeff
         return max(min_val, min(max_val, adjusted))
 
+    def display_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Кадр для отображения (детектор может подменить визуализацию)"""
+        return frame
+
+    def close(self) -> None:
+        """Освобождение ресурсов детектора (пулов потоков)"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Внутренняя статистика детектора для панели статистики"""
+        stats = self._exclusion.get_stats()
+        if self._flow is not None:
+            stats.update(self._flow.get_stats())
+        if self._roi is not None:
+            stats.update(self._roi.get_stats())
+        return stats
+
     def _get_config(self):
         """Получение конфигурации для текущего детектора"""
         raise NotImplementedError
\ No newline at end of file
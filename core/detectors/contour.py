@@ -4,7 +4,8 @@ import cv2
 import numpy as np
 from typing import List
 from .base import ObjectDetector
-from models.detection import DetectionResult
+from ..tiling import TileExecutor
+from models.detection import DetectionResult, DetectionBatch
 from models.config import GlobalConfig, ContourConfig
 from models.enums import TrackingMethod, ObjectCategory
 from utils.logger import logger
@@ -16,8 +17,43 @@ class ContourDetector(ObjectDetector):
     def __init__(self, config: GlobalConfig):
         super().__init__(config)
         self.config_obj: ContourConfig = config.contour
+        self._tile_executor = (TileExecutor(config.tiling)
+                               if config.tiling.enabled else None)
 
-    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
+        cfg = self.config_obj
+
+        # Связные компоненты вместо контуров
+        # Для порога яркости применяются только зоны, без маски мерцания
+        if self._tile_executor is not None:
+            components = self._tile_executor.run(
+                frame, self._binarize,
+                self._exclusion.allowed(frame.shape[:2], learned=False)
+            )
+        else:
+            components = self._find_components(
+                self._prepare_mask(self._binarize(frame), learn=False)
+            )
+
+        # Применение чувствительности к минимальной площади
+        min_area = self._apply_sensitivity(cfg.min_area, 1, 1000)
+
+        # Векторная фильтрация по площади, соотношению сторон и сплошности
+        components = components.filter_area(min_area, cfg.max_area, strict=True)
+        components = components.filter_aspect(cfg.aspect_ratio_min,
+                                              cfg.aspect_ratio_max)
+        components = components.filter_solidity(cfg.solidity_threshold)
+
+        confidences = np.minimum(1.0, components.contour_areas / 1000.0)
+        return self._batch_from_components(components, confidences)
+
+    def close(self) -> None:
+        """Остановка пула потоков тайлов"""
+        if self._tile_executor is not None:
+            self._tile_executor.shutdown()
+
+    def _binarize(self, frame: np.ndarray) -> np.ndarray:
+        """Stateless-стадии: препроцессинг, порог и морфология"""
         cfg = self.config_obj
 
         # Препроцессинг
@@ -37,59 +73,7 @@ class ContourDetector(ObjectDetector):
         kernel = np.ones((3, 3), np.uint8)
         binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
         binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
-
-        # Детекция контуров
-        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL,
-                                       cv2.CHAIN_APPROX_SIMPLE)
-
-        results = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-
-            # Применение чувствительности к минимальной площади
-            min_area = self._apply_sensitivity(cfg.min_area, 1, 1000)
-
-            # Фильтрация по площади
-            if not (min_area < area < cfg.max_area):
-                continue
-
-            # Ограничивающий прямоугольник
-            x, y, w, h = cv2.boundingRect(contour)
-
-            # Фильтрация по соотношению сторон
-            if h == 0:
-                continue
-            aspect_ratio = w / h
-            if not (cfg.aspect_ratio_min < aspect_ratio < cfg.aspect_ratio_max):
-                continue
-
-            # Фильтрация по сплошности
-            hull = cv2.convexHull(contour)
-            hull_area = cv2.contourArea(hull)
-            if hull_area == 0:
-                continue
-            solidity = area / hull_area
-            if solidity < cfg.solidity_threshold:
-                continue
-
-            # Создание результата
-            center_x = x + w // 2
-            center_y = y + h // 2
-
-            category = self._classify_object(w, h, area)
-            confidence = min(1.0, area / 1000.0)
-
-            result = DetectionResult(
-                bbox=(x, y, w, h),
-                center=(center_x, center_y),
-                area=area,
-                contour=contour,
-                category=category,
-                confidence=confidence
-            )
-            results.append(result)
-
-        return results
+        return binary
 
     def _get_config(self):
         return self.config_obj
\ No newline at end of file
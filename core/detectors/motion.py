@@ -6,7 +6,7 @@ import time
 from typing import List, Tuple
 from collections import deque
 from .base import ObjectDetector
-from models.detection import DetectionResult
+from models.detection import DetectionResult, DetectionBatch
 from models.config import GlobalConfig, MotionConfig
 from models.enums import ObjectCategory
 from utils.logger import logger
@@ -20,19 +20,21 @@ class MotionDetector(ObjectDetector):
         cfg = config.motion
         self.config_obj: MotionConfig = cfg
         self._frame_buffer = deque(maxlen=cfg.temporal_buffer_size)
-        self._last_positions: Dict[int, Tuple[float, float]] = {}
-        self._last_times: Dict[int, float] = {}
 
-    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
         cfg = self.config_obj
 
         # Подготовка кадра
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+        # Размер обрабатываемой области изменился (зоны исключения)
+        if self._frame_buffer and self._frame_buffer[-1].shape != gray.shape:
+            self._frame_buffer.clear()
         self._frame_buffer.append(gray)
 
         if len(self._frame_buffer) < 2:
-            return []
+            return DetectionBatch.empty()
 
         # Вычисление разности кадров
         diff = cv2.absdiff(self._frame_buffer[-2], self._frame_buffer[-1])
@@ -40,57 +42,33 @@ class MotionDetector(ObjectDetector):
         # Применение чувствительности к минимальному изменению пикселя
         min_pixel_change = self._apply_sensitivity(cfg.min_pixel_change, 1, 50)
         _, motion_mask = cv2.threshold(diff, int(min_pixel_change), 255, cv2.THRESH_BINARY)
+        motion_mask = self._prepare_mask(motion_mask)
 
         # Улучшение маски
         kernel = np.ones((5, 5), np.uint8)
         motion_mask = cv2.morphologyEx(motion_mask, cv2.MORPH_CLOSE, kernel)
 
-        # Детекция контуров движения
-        contours, _ = cv2.findContours(motion_mask, cv2.RETR_EXTERNAL,
-                                       cv2.CHAIN_APPROX_SIMPLE)
-
-        results = []
-        current_time = time.time()
-
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area < 50:  # Минимальная площадь
-                continue
-
-            x, y, w, h = cv2.boundingRect(contour)
-            center_x = x + w // 2
-            center_y = y + h // 2
-
-            # Расчет скорости
-            velocity, direction = self._calculate_motion(
-                center_x, center_y, current_time
-            )
-
-            category = self._classify_object(w, h, area, velocity)
-            confidence = 0.7 if velocity > cfg.velocity_threshold else 0.3
-
-            result = DetectionResult(
-                bbox=(x, y, w, h),
-                center=(center_x, center_y),
-                area=area,
-                contour=contour,
-                category=category,
-                confidence=confidence,
-                velocity=velocity,
-                direction=direction
-            )
-            results.append(result)
-
-            # Обновление истории
-            self._last_positions[result.id] = (center_x, center_y)
-            self._last_times[result.id] = current_time
-
-        return results
-
-    def _calculate_motion(self, x: int, y: int, timestamp: float) -> Tuple[float, float]:
+        # Связные компоненты движения
+        components = self._find_components(motion_mask)
+        components = components.filter_area(50, np.inf)  # Минимальная площадь
+
+        # Расчет скорости
+        velocities, directions = self._calculate_motion(
+            components.centers, time.time()
+        )
+
+        confidences = np.where(velocities > cfg.velocity_threshold, 0.7, 0.3)
+        return self._batch_from_components(
+            components, confidences,
+            velocities=velocities, directions=directions
+        )
+
+    def _calculate_motion(self, centers: np.ndarray,
+                          timestamp: float) -> Tuple[np.ndarray, np.ndarray]:
         """Расчет скорости и направления"""
         # Простая реализация
-        return 0.0, 0.0
+        zeros = np.zeros(len(centers), dtype=np.float32)
+        return zeros, zeros.copy()
 
     def _get_config(self):
         return self.config_obj
\ No newline at end of file
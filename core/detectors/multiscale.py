@@ -4,7 +4,7 @@ import cv2
 import numpy as np
 from typing import List, Tuple
 from .base import ObjectDetector
-from models.detection import DetectionResult
+from models.detection import DetectionResult, DetectionBatch
 from models.config import GlobalConfig, MultiScaleConfig
 from models.enums import ObjectCategory
 from utils.logger import logger
@@ -17,7 +17,7 @@ class MultiScaleDetector(ObjectDetector):
         super().__init__(config)
         self.config_obj: MultiScaleConfig = config.multiscale
 
-    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
         cfg = self.config_obj
 
         objects_all_scales = []
@@ -38,31 +38,46 @@ class MultiScaleDetector(ObjectDetector):
 
             # Детекция на текущем масштабе (используем адаптивный фон)
             from .adaptive import AdaptiveDetector
-            detector = AdaptiveDetector(self.config)
+            detector = AdaptiveDetector(self.config, persistent=False)
             objects = detector.detect(scaled)
 
-            # Масштабирование координат обратно
-            for obj in objects:
-                if scale != 1.0:
-                    x, y, w, h = obj.bbox
-                    obj.bbox = (int(x / scale), int(y / scale), int(w / scale), int(h / scale))
-                    cx, cy = obj.center
-                    obj.center = (int(cx / scale), int(cy / scale))
-                    if obj.contour is not None:
-                        obj.contour = (obj.contour / scale).astype(np.int32)
-
-                # Применение веса масштаба
-                obj.confidence *= weight
+            # Масштабирование координат обратно (новые массивы, без записи
+            # в столбцы, по которым загрузчики извлекают контуры)
+            if scale != 1.0:
+                objects.bboxes = (objects.bboxes / scale).astype(np.int32)
+                objects.centers = (objects.centers / scale).astype(np.int32)
+                for i, loader in enumerate(objects.contour_loaders):
+                    if objects.contours[i] is not None:
+                        objects.contours[i] = (objects.contours[i] / scale).astype(np.int32)
+                    elif loader is not None:
+                        objects.contour_loaders[i] = self._scaled_contour_loader(
+                            loader, scale
+                        )
+
+            # Применение веса масштаба
+            objects.confidences *= weight
 
             objects_all_scales.extend(objects)
 
         # Объединение дубликатов
-        return self._merge_objects(objects_all_scales, cfg.merge_threshold)
+        merged = self._merge_objects(objects_all_scales, cfg.merge_threshold)
+        return DetectionBatch.from_results(merged)
+
+    @staticmethod
+    def _scaled_contour_loader(loader, scale: float):
+        """Отложенное масштабирование лениво извлекаемого контура"""
+        def load():
+            contour = loader()
+            if contour is None:
+                return None
+            return (contour / scale).astype(np.int32)
+
+        return load
 
     def _merge_objects(self, objects: List[DetectionResult], threshold: float) -> List[DetectionResult]:
         """Объединение перекрывающихся объектов"""
         if not objects:
-            return []
+            return DetectionBatch.empty()
 
         # Сортировка по уверенности
         objects.sort(key=lambda x: x.confidence, reverse=True)
@@ -137,7 +152,7 @@ class MultiScaleDetector(ObjectDetector):
         center_y = y_new + h_new // 2
 
         # Объединение контуров (пока просто берем первый)
-        contour_new = obj1.contour
+        contour_new = obj1.get_contour()
 
         # Выбор большего типа
         area1 = w1 * h1
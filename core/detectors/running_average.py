@@ -0,0 +1,109 @@
+"""Детектор с бегущим средним фона в фиксированной точке"""
+
+import cv2
+import numpy as np
+from typing import Any, Dict, Tuple
+from .base import ObjectDetector
+from .components import ComponentSet
+from models.detection import DetectionBatch
+from models.config import GlobalConfig, RunningAverageConfig
+
+
+class RunningAverageDetector(ObjectDetector):
+    """Детектор с бегущим средним фона для слабых машин
+
+    Фон хранится в int16 с 7 дробными битами (Q8.7): 255 << 7 помещается
+    в int16. Обновление bg += (cur - bg) >> shift дает скорость обучения
+    2^-shift без умножений и чисел с плавающей точкой. Все буферы
+    выделяются один раз под размер кадра.
+    """
+
+    _FRACTION_BITS = 7
+    _FOREGROUND_SLOWDOWN = 1
+
+    def __init__(self, config: GlobalConfig):
+        super().__init__(config)
+        self.config_obj: RunningAverageConfig = config.running_average
+        self._frame_shape: Tuple[int, int] = (0, 0)
+        self._initialized = False
+
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
+        cfg = self.config_obj
+
+        self._ensure_buffers(frame.shape[:2])
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        # Текущий кадр в фиксированной точке
+        np.left_shift(self._gray, self._FRACTION_BITS, out=self._current,
+                      dtype=np.int16)
+
+        if not self._initialized:
+            self._background[...] = self._current
+            self._initialized = True
+            return DetectionBatch.empty()
+
+        # Разность с фоном и порог
+        np.subtract(self._current, self._background, out=self._diff)
+        np.abs(self._diff, out=self._abs_diff)
+        threshold = self._apply_sensitivity(cfg.threshold, 1, 254)
+        cv2.compare(self._abs_diff, int(threshold) << self._FRACTION_BITS,
+                    cv2.CMP_GT, dst=self._mask)
+
+        # Выборочное обновление фона с первого кадра: bg += diff >> shift
+        # вне объектов и вдвое медленнее под ними, чтобы движущиеся объекты
+        # не оставляли следов, а остановившиеся (и призраки объектов
+        # первого кадра) постепенно уходили в фон
+        cv2.bitwise_not(self._mask, dst=self._background_mask)
+        np.right_shift(self._diff, cfg.learning_shift, out=self._update)
+        cv2.add(self._background, self._update, dst=self._background,
+                mask=self._background_mask)
+        np.right_shift(self._diff, cfg.learning_shift + self._FOREGROUND_SLOWDOWN,
+                       out=self._update)
+        cv2.add(self._background, self._update, dst=self._background,
+                mask=self._mask)
+
+        mask = self._mask
+        if cfg.morphology:
+            cv2.morphologyEx(self._mask, cv2.MORPH_OPEN, self._kernel,
+                             dst=self._mask_filtered)
+            cv2.morphologyEx(self._mask_filtered, cv2.MORPH_CLOSE, self._kernel,
+                             dst=self._mask_filtered)
+            mask = self._mask_filtered
+
+        mask = self._prepare_mask(mask)
+
+        # Связные компоненты в переиспользуемый буфер меток
+        components = ComponentSet.from_mask(mask, labels=self._labels)
+        components = components.filter_area(cfg.min_area, cfg.max_area, strict=True)
+        components.detach()
+
+        confidences = np.minimum(1.0, components.contour_areas / 1000.0)
+        return self._batch_from_components(components, confidences)
+
+    def _ensure_buffers(self, shape: Tuple[int, int]) -> None:
+        """Выделение рабочих буферов под размер кадра"""
+        if shape == self._frame_shape:
+            return
+
+        self._gray = np.empty(shape, dtype=np.uint8)
+        self._current = np.empty(shape, dtype=np.int16)
+        self._background = np.empty(shape, dtype=np.int16)
+        self._diff = np.empty(shape, dtype=np.int16)
+        self._abs_diff = np.empty(shape, dtype=np.int16)
+        self._update = np.empty(shape, dtype=np.int16)
+        self._background_mask = np.empty(shape, dtype=np.uint8)
+        self._mask = np.empty(shape, dtype=np.uint8)
+        self._mask_filtered = np.empty(shape, dtype=np.uint8)
+        self._labels = np.empty(shape, dtype=np.int32)
+        self._kernel = np.ones((3, 3), np.uint8)
+
+        self._frame_shape = shape
+        self._initialized = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats['learning_rate'] = 1.0 / (1 << self.config_obj.learning_shift)
+        return stats
+
+    def _get_config(self):
+        return self.config_obj
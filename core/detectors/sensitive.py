@@ -2,108 +2,148 @@
 
 import cv2
 import numpy as np
-from typing import List
-from collections import deque
+from typing import List, Dict, Any, Tuple
 from .base import ObjectDetector
-from models.detection import DetectionResult
+from .components import ComponentSet
+from models.detection import DetectionResult, DetectionBatch, CATEGORY_CODES
 from models.config import GlobalConfig, SensitiveConfig
 from models.enums import ObjectCategory
+from utils.alloc_meter import AllocationMeter
 from utils.logger import logger
 
 
 class SensitiveDetector(ObjectDetector):
-    """Чувствительный детектор движения"""
+    """Чувствительный детектор движения
+
+    Все промежуточные изображения живут в буферах, выделенных один раз
+    под размер кадра; в горячем пути OpenCV пишет результаты через dst.
+    """
+
+    # Для тройной разности нужны только три последних кадра
+    _RING_SIZE = 3
+    # Категории только по площади
+    _classify_by_velocity = False
 
     def __init__(self, config: GlobalConfig):
         super().__init__(config)
         cfg = config.sensitive
         self.config_obj: SensitiveConfig = cfg
-        self._frame_buffer = deque(maxlen=cfg.frame_buffer_size)
         self._motion_accumulator = None
+        self._clahe = None
+        self._clahe_clip = None
+        self._frame_shape: Tuple[int, int] = (0, 0)
+        self._frames_seen = 0
+        self._alloc_meter = AllocationMeter()
 
-    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
+        with self._alloc_meter.measure():
+            return self._detect(frame)
+
+    def _detect(self, frame: np.ndarray) -> DetectionBatch:
         cfg = self.config_obj
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self._ensure_buffers(frame.shape[:2])
+        slot = self._frames_seen % self._RING_SIZE
+        gray = self._gray_ring[slot]
 
         # Усиление контраста
         if cfg.enhancement_factor > 1.0:
-            clahe = cv2.createCLAHE(clipLimit=cfg.enhancement_factor, tileGridSize=(8, 8))
-            gray = clahe.apply(gray)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray_raw)
+            self._get_clahe(cfg.enhancement_factor).apply(self._gray_raw, dst=gray)
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
 
-        # Добавление в буфер
-        self._frame_buffer.append(gray)
+        self._frames_seen += 1
+        if self._frames_seen < 3:
+            return DetectionBatch.empty()
 
-        if len(self._frame_buffer) < 3:
-            return []
+        previous = self._gray_ring[(slot - 1) % self._RING_SIZE]
+        before_previous = self._gray_ring[(slot - 2) % self._RING_SIZE]
 
         # Вычисление разности между кадрами
-        diff1 = cv2.absdiff(self._frame_buffer[-1], self._frame_buffer[-2])
-        diff2 = cv2.absdiff(self._frame_buffer[-2], self._frame_buffer[-3])
+        cv2.absdiff(gray, previous, dst=self._diff)
+        cv2.absdiff(previous, before_previous, dst=self._diff_previous)
 
         # Комбинирование разностей
-        combined = cv2.bitwise_and(diff1, diff2)
+        cv2.bitwise_and(self._diff, self._diff_previous, dst=self._diff)
 
         # Пороговая обработка с низким порогом
         min_pixel_change = self._apply_sensitivity(cfg.min_pixel_change, 1, 20)
-        _, thresh = cv2.threshold(combined, int(min_pixel_change), 255, cv2.THRESH_BINARY)
-
-        # Накопление во времени
-        if self._motion_accumulator is None:
-            self._motion_accumulator = np.zeros_like(thresh, dtype=np.float32)
+        cv2.threshold(self._diff, int(min_pixel_change), 255,
+                      cv2.THRESH_BINARY, dst=self._thresh)
+        self._prepare_mask(self._thresh)
 
-        self._motion_accumulator = cv2.addWeighted(
-            self._motion_accumulator, cfg.noise_reduction,
-            thresh.astype(np.float32), 1 - cfg.noise_reduction, 0
-        )
+        # Накопление во времени на месте:
+        # acc = acc * noise_reduction + thresh * (1 - noise_reduction)
+        cv2.accumulateWeighted(self._thresh, self._motion_accumulator,
+                               1 - cfg.noise_reduction)
 
         # Применение порога к накопленному движению
-        _, accumulated_thresh = cv2.threshold(
-            self._motion_accumulator.astype(np.uint8),
-            cfg.accumulation_threshold * 50, 255, cv2.THRESH_BINARY
-        )
+        # (uint8(acc) > T эквивалентно acc >= T + 1)
+        cv2.compare(self._motion_accumulator,
+                    float(cfg.accumulation_threshold * 50 + 1),
+                    cv2.CMP_GE, dst=self._mask)
 
         # Пространственная фильтрация
+        mask = self._mask
         if cfg.spatial_filter:
-            kernel = np.ones((2, 2), np.uint8)
-            accumulated_thresh = cv2.morphologyEx(accumulated_thresh, cv2.MORPH_CLOSE, kernel)
-
-        # Поиск контуров
-        contours, _ = cv2.findContours(accumulated_thresh, cv2.RETR_EXTERNAL,
-                                       cv2.CHAIN_APPROX_SIMPLE)
-
-        results = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-
-            if area < 10:  # Очень маленькие объекты
-                continue
-
-            x, y, w, h = cv2.boundingRect(contour)
-
-            # Дополнительная проверка: движение должно быть устойчивым
-            if self._motion_accumulator is not None:
-                roi_accumulator = self._motion_accumulator[y:y + h, x:x + w]
-                if roi_accumulator.size > 0 and roi_accumulator.max() < 100:
-                    continue
-
-            center_x = x + w // 2
-            center_y = y + h // 2
-
-            category = ObjectCategory.SMALL if area < 50 else ObjectCategory.MEDIUM
-            confidence = 0.5
-
-            result = DetectionResult(
-                bbox=(x, y, w, h),
-                center=(center_x, center_y),
-                area=area,
-                contour=contour,
-                category=category,
-                confidence=confidence
-            )
-            results.append(result)
-
-        return results
+            cv2.morphologyEx(self._mask, cv2.MORPH_CLOSE, self._kernel,
+                             dst=self._mask_filtered)
+            mask = self._mask_filtered
+
+        # Связные компоненты в переиспользуемый буфер меток
+        components = ComponentSet.from_mask(mask, labels=self._labels)
+        components = components.filter_area(10, np.inf)  # Очень маленькие объекты
+
+        # Дополнительная проверка: движение должно быть устойчивым
+        if len(components):
+            maxima = components.max_per_component(self._motion_accumulator,
+                                                  self._foreground)
+            components = components.select(maxima >= 100)
+
+        # Буфер меток перезапишется следующим кадром
+        components.detach()
+
+        category_codes = np.where(
+            components.contour_areas < 50,
+            CATEGORY_CODES[ObjectCategory.SMALL],
+            CATEGORY_CODES[ObjectCategory.MEDIUM]
+        )
+        confidences = np.full(len(components), 0.5, dtype=np.float32)
+        return self._batch_from_components(components, confidences, category_codes)
+
+    def _ensure_buffers(self, shape: Tuple[int, int]) -> None:
+        """Выделение рабочих буферов под размер кадра"""
+        if shape == self._frame_shape:
+            return
+
+        height, width = shape
+        self._gray_ring = np.empty((self._RING_SIZE, height, width), dtype=np.uint8)
+        self._gray_raw = np.empty(shape, dtype=np.uint8)
+        self._diff = np.empty(shape, dtype=np.uint8)
+        self._diff_previous = np.empty(shape, dtype=np.uint8)
+        self._thresh = np.empty(shape, dtype=np.uint8)
+        self._mask = np.empty(shape, dtype=np.uint8)
+        self._mask_filtered = np.empty(shape, dtype=np.uint8)
+        self._labels = np.empty(shape, dtype=np.int32)
+        self._foreground = np.empty(shape, dtype=bool)
+        self._motion_accumulator = np.zeros(shape, dtype=np.float32)
+        self._kernel = np.ones((2, 2), np.uint8)
+
+        self._frame_shape = shape
+        self._frames_seen = 0
+
+    def _get_clahe(self, clip_limit: float):
+        """Кэшированный объект CLAHE"""
+        if self._clahe is None or self._clahe_clip != clip_limit:
+            self._clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+            self._clahe_clip = clip_limit
+        return self._clahe
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update(self._alloc_meter.get_stats())
+        return stats
 
     def _get_config(self):
-        return self.config_obj
\ No newline at end of file
+        return self.config_obj
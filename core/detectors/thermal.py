@@ -2,110 +2,128 @@
 
 import cv2
 import numpy as np
-from typing import List
+from typing import List, Optional, Tuple
 from .base import ObjectDetector
-from models.detection import DetectionResult
+from models.detection import DetectionResult, DetectionBatch, CATEGORY_CODES
 from models.config import GlobalConfig, ThermalConfig
 from models.enums import ObjectCategory
 from utils.logger import logger
 
 
 class ThermalDetector(ObjectDetector):
-    """Детектор с тепловизионной симуляцией"""
+    """Детектор с тепловизионной симуляцией
+
+    Яркость тепловизионного изображения - монотонная функция исходной
+    яркости, поэтому детекция использует 256-элементную таблицу вместо
+    цепочки colormap -> HSV -> gray. Цветное изображение строится только
+    для отображения.
+    """
+
+    # Категории по "температуре" объекта
+    _classify_by_velocity = False
+
+    COLOR_MAPS = {
+        'jet': cv2.COLORMAP_JET,
+        'hot': cv2.COLORMAP_HOT,
+        'cool': cv2.COLORMAP_COOL,
+        'autumn': cv2.COLORMAP_AUTUMN,
+    }
 
     def __init__(self, config: GlobalConfig):
         super().__init__(config)
         self.config_obj: ThermalConfig = config.thermal
+        self._lut_key: Optional[Tuple[str, float]] = None
+        self._color_lut: Optional[np.ndarray] = None
+        self._gray_lut: Optional[np.ndarray] = None
+        self._norm_lut: Optional[np.ndarray] = None
 
-    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
         cfg = self.config_obj
 
-        # Конвертация в тепловизионную карту
-        thermal_frame = self._convert_to_thermal(frame, cfg)
-
-        # Детекция горячих областей
-        gray = cv2.cvtColor(thermal_frame, cv2.COLOR_BGR2GRAY)
-
-        # Адаптивный порог для выделения "горячих" зон
-        _, hot_mask = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
-
-        # Выделение холодных зон (если нужно)
-        if cfg.highlight_cold:
-            _, cold_mask = cv2.threshold(gray, 50, 255, cv2.THRESH_BINARY_INV)
-            cold_mask = cv2.bitwise_and(cold_mask, cv2.bitwise_not(hot_mask))
-
-        # Поиск контуров горячих зон
-        contours, _ = cv2.findContours(hot_mask, cv2.RETR_EXTERNAL,
-                                       cv2.CHAIN_APPROX_SIMPLE)
-
-        results = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-
-            if area < 100:  # Слишком маленькие горячие точки
-                continue
-
-            x, y, w, h = cv2.boundingRect(contour)
-
-            # Анализ температуры в области
-            roi = gray[y:y + h, x:x + w]
-            if roi.size > 0:
-                avg_temp = np.mean(roi)
-
-                # Классификация по "температуре"
-                if avg_temp < 100:
-                    category = ObjectCategory.SMALL  # "Холодные" объекты
-                elif avg_temp < 180:
-                    category = ObjectCategory.MEDIUM
-                else:
-                    category = ObjectCategory.LARGE  # "Горячие" объекты
-            else:
-                category = ObjectCategory.UNKNOWN
-
-            center_x = x + w // 2
-            center_y = y + h // 2
-
-            confidence = min(1.0, area / 1000.0)
-
-            result = DetectionResult(
-                bbox=(x, y, w, h),
-                center=(center_x, center_y),
-                area=area,
-                contour=contour,
-                category=category,
-                confidence=confidence
-            )
-            results.append(result)
-
-        return results
-
-    def _convert_to_thermal(self, frame: np.ndarray, cfg: ThermalConfig) -> np.ndarray:
-        """Конвертация в тепловизионное изображение"""
+        # Тепловизионная яркость через таблицу
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self._update_luts(gray, cfg)
+        thermal_gray = cv2.LUT(gray, self._gray_lut[self._norm_lut])
 
-        # Нормализация
-        normalized = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
-
-        # Применение цветовой карты
-        if cfg.color_map == "jet":
-            thermal = cv2.applyColorMap(normalized, cv2.COLORMAP_JET)
-        elif cfg.color_map == "hot":
-            thermal = cv2.applyColorMap(normalized, cv2.COLORMAP_HOT)
-        elif cfg.color_map == "cool":
-            thermal = cv2.applyColorMap(normalized, cv2.COLORMAP_COOL)
-        elif cfg.color_map == "autumn":
-            thermal = cv2.applyColorMap(normalized, cv2.COLORMAP_AUTUMN)
-        else:
-            thermal = cv2.applyColorMap(normalized, cv2.COLORMAP_JET)
+        # Адаптивный порог для выделения "горячих" зон
+        _, hot_mask = cv2.threshold(thermal_gray, 150, 255, cv2.THRESH_BINARY)
+        hot_mask = self._prepare_mask(hot_mask, learn=False)
+
+        # Связные компоненты горячих зон
+        components = self._find_components(hot_mask)
+        components = components.filter_area(100, np.inf)  # Слишком маленькие горячие точки
+
+        # Средняя "температура" по прямоугольнику области вместе с фоном:
+        # пиксели самой области все выше порога 150
+        avg_temp = components.mean_per_box(thermal_gray)
+        components.detach()
+
+        # Классификация по "температуре"
+        category_codes = np.select(
+            [avg_temp < 100, avg_temp < 180],
+            [
+                CATEGORY_CODES[ObjectCategory.SMALL],   # "Холодные" объекты
+                CATEGORY_CODES[ObjectCategory.MEDIUM]
+            ],
+            default=CATEGORY_CODES[ObjectCategory.LARGE]  # "Горячие" объекты
+        )
+
+        confidences = np.minimum(1.0, components.contour_areas / 1000.0)
+        return self._batch_from_components(components, confidences, category_codes)
+
+    def display_frame(self, frame: np.ndarray) -> np.ndarray:
+        if not self.config.display.show_thermal:
+            return frame
+        return self._convert_to_thermal(frame, self.config_obj)
+
+    def _update_luts(self, gray: np.ndarray, cfg: ThermalConfig) -> None:
+        """Обновление таблиц цветовой карты и нормализации кадра"""
+        sensitivity = self._apply_sensitivity(1.0, 0.5, 2.0)
+        key = (cfg.color_map, sensitivity)
+        if key != self._lut_key:
+            self._color_lut = self._build_color_lut(cfg.color_map, sensitivity)
+            self._gray_lut = cv2.cvtColor(
+                self._color_lut, cv2.COLOR_BGR2GRAY
+            ).reshape(256)
+            self._lut_key = key
+
+        # В окнах поиска остается нормализация последнего полного кадра,
+        # иначе контраст растягивается по окну и порог смещается
+        if (self._roi is not None and not self._roi.full_frame and
+                self._norm_lut is not None):
+            return
+
+        # Нормализация как cv2.normalize(NORM_MINMAX), свернутая в таблицу
+        min_val, max_val, _, _ = cv2.minMaxLoc(gray)
+        scale = 255.0 / (max_val - min_val) if max_val > min_val else 0.0
+        values = np.arange(256, dtype=np.float32)
+        self._norm_lut = np.clip(
+            np.rint((values - min_val) * scale), 0, 255
+        ).astype(np.uint8)
+
+    def _build_color_lut(self, color_map: str, sensitivity: float) -> np.ndarray:
+        """Цветовая таблица 256x1 с учетом чувствительности"""
+        ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+        lut = cv2.applyColorMap(
+            ramp, self.COLOR_MAPS.get(color_map, cv2.COLORMAP_JET)
+        )
 
         # Регулировка чувствительности
-        sensitivity = self._apply_sensitivity(1.0, 0.5, 2.0)
         if sensitivity != 1.0:
-            hsv = cv2.cvtColor(thermal, cv2.COLOR_BGR2HSV)
+            hsv = cv2.cvtColor(lut, cv2.COLOR_BGR2HSV)
             hsv[:, :, 1] = np.clip(hsv[:, :, 1] * sensitivity, 0, 255)
-            thermal = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+            lut = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+
+        return lut
+
+    def _convert_to_thermal(self, frame: np.ndarray, cfg: ThermalConfig) -> np.ndarray:
+        """Конвертация в тепловизионное изображение (только для отображения)"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self._norm_lut is None:
+            self._update_luts(gray, cfg)
 
-        return thermal
+        # Таблица нормализации последнего кадра детекции
+        return cv2.applyColorMap(gray, self._color_lut[self._norm_lut])
 
     def _get_config(self):
-        return self.config_obj
\ No newline at end of file
+        return self.config_obj
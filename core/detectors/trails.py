@@ -7,7 +7,7 @@ from typing import List, Tuple, Dict
 from collections import deque
 from .base import ObjectDetector
 from .motion import MotionDetector
-from models.detection import DetectionResult
+from models.detection import DetectionResult, DetectionBatch
 from models.config import GlobalConfig, TrailsConfig
 from models.enums import ObjectCategory
 from utils.logger import logger
@@ -29,7 +29,7 @@ class TrailsDetector(ObjectDetector):
             (255, 128, 0), (128, 255, 0), (0, 128, 255)
         ]
 
-    def detect(self, frame: np.ndarray) -> List[DetectionResult]:
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
         # Используем детектор движения как базовый
         detector = MotionDetector(self.config)
         results = detector.detect(frame)
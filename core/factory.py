@@ -1,12 +1,8 @@
 """Фабрика детекторов"""
 
-from .detectors.contour import ContourDetector
-from .detectors.motion import MotionDetector
-from .detectors.adaptive import AdaptiveDetector
-from .detectors.sensitive import SensitiveDetector
-from .detectors.multiscale import MultiScaleDetector
-from .detectors.thermal import ThermalDetector
-from .detectors.trails import TrailsDetector
+from typing import Union
+from .registry import detector_registry, DetectorInfo
+from .roi import RoiPlanner
 from models.config import GlobalConfig
 from models.enums import TrackingMethod
 from utils.logger import logger
@@ -16,21 +12,22 @@ class DetectorFactory:
     """Фабрика детекторов"""
 
     @staticmethod
-    def create(method: TrackingMethod, config: GlobalConfig):
-        """Создание детектора по методу"""
-        detectors = {
-            TrackingMethod.CONTOUR_DETECTION: ContourDetector,
-            TrackingMethod.MOTION_DETECTION: MotionDetector,
-            TrackingMethod.ADAPTIVE_BACKGROUND: AdaptiveDetector,
-            TrackingMethod.SENSITIVE_MOTION: SensitiveDetector,
-            TrackingMethod.MULTI_SCALE: MultiScaleDetector,
-            TrackingMethod.THERMAL_SIMULATION: ThermalDetector,
-            TrackingMethod.MOVEMENT_TRAILS: TrailsDetector,
-        }
-
-        detector_class = detectors.get(method)
-        if detector_class is None:
+    def info(method: Union[TrackingMethod, str]) -> DetectorInfo:
+        """Метаданные детектора (неизвестный метод - адаптивный фон)"""
+        info = detector_registry.get(method)
+        if info is None:
             logger.warning(f"Unknown method: {method}, using AdaptiveDetector")
-            detector_class = AdaptiveDetector
+            info = detector_registry.get(TrackingMethod.ADAPTIVE_BACKGROUND)
+        return info
+
+    @staticmethod
+    def create(method: Union[TrackingMethod, str], config: GlobalConfig):
+        """Создание детектора по методу или имени зарегистрированного детектора"""
+        info = DetectorFactory.info(method)
+        detector_class = detector_registry.load_class(info)
+        detector = detector_class(config)
 
-        return detector_class(config)
\ No newline at end of file
+        # Окна поиска только для детекторов, корректных на частях кадра
+        if config.roi.enabled and info.supports_roi:
+            detector.use_roi(RoiPlanner(config.roi))
+        return detector
@@ -0,0 +1,151 @@
+"""Скорость объектов по разреженному оптическому потоку"""
+
+import cv2
+import numpy as np
+import time
+from typing import Any, Dict, Optional, Tuple
+from models.config import FlowConfig
+from models.detection import DetectionBatch
+
+# (x1, y1, x2, y2)
+Rect = Tuple[int, int, int, int]
+
+
+class SparseFlowEstimator:
+    """Пирамидальный Lucas-Kanade по нескольким точкам каждого трека
+
+    Точки хранятся по ID трека и выбираются заново (goodFeaturesToTrack)
+    только когда их осталось меньше ``min_points``. Оттенки серого и
+    пирамиды строятся лишь для окна вокруг объекта, поэтому стоимость
+    пропорциональна числу и размеру объектов, а не размеру кадра. От
+    прошлого кадра хранятся только окна треков в оттенках серого: сам
+    кадр после детекции передается рендереру и может быть изменен.
+    """
+
+    def __init__(self, config: FlowConfig):
+        self.config = config
+        self._points: Dict[int, np.ndarray] = {}
+        # ID трека -> (x1, y1, x2, y2) и окно прошлого кадра в оттенках серого
+        self._patches: Dict[int, Tuple[Rect, np.ndarray]] = {}
+        self._frame_shape: Optional[Tuple[int, ...]] = None
+        self._prev_time = 0.0
+        self._lk_params = dict(
+            winSize=(config.win_size, config.win_size),
+            maxLevel=config.pyramid_levels,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        )
+
+        # Максимальное смещение, которое находит пирамида
+        self._margin = config.win_size * (2 ** config.pyramid_levels)
+
+        # Статистика
+        self._flow_time = 0.0
+        self._tracked_points = 0
+        self._seeded_tracks = 0
+
+    def update(self, frame: np.ndarray, batch: DetectionBatch,
+               timestamp: float) -> None:
+        """Оценка скорости и направления объектов пакета на месте"""
+        start = time.perf_counter()
+        if frame.shape != self._frame_shape:
+            self._frame_shape = frame.shape
+            self._points = {}
+            self._patches = {}
+
+        dt = timestamp - self._prev_time
+        points_by_track: Dict[int, np.ndarray] = {}
+        patches: Dict[int, Tuple[Rect, np.ndarray]] = {}
+        tracked_points = 0
+        seeded_tracks = 0
+
+        for i, track_id in enumerate(batch.track_ids.tolist()):
+            bbox = tuple(int(v) for v in batch.bboxes[i])
+            points = self._points.get(track_id)
+            patch = self._patches.get(track_id)
+
+            if points is not None and len(points) and patch is not None:
+                moved, good = self._track(patch, frame, points)
+                if np.any(good) and dt > 0:
+                    shift = np.median((moved - points)[good].reshape(-1, 2), axis=0)
+                    batch.velocities[i] = np.hypot(shift[0], shift[1]) / dt
+                    batch.directions[i] = np.degrees(np.arctan2(shift[1], shift[0]))
+
+                # Остаются только точки, попавшие в новый прямоугольник
+                x, y, w, h = bbox
+                xy = moved.reshape(-1, 2)
+                inside = (good &
+                          (xy[:, 0] >= x) & (xy[:, 0] < x + w) &
+                          (xy[:, 1] >= y) & (xy[:, 1] < y + h))
+                points = moved[inside]
+                tracked_points += int(np.count_nonzero(good))
+
+            if points is None or len(points) < self.config.min_points:
+                points = self._seed(frame, bbox)
+                seeded_tracks += 1
+
+            points_by_track[track_id] = points
+            patches[track_id] = self._patch(frame, bbox)
+
+        # Точки потерянных треков отбрасываются
+        self._points = points_by_track
+        self._patches = patches
+        self._prev_time = timestamp
+
+        self._tracked_points = tracked_points
+        self._seeded_tracks = seeded_tracks
+        self._flow_time = self._flow_time * 0.9 + (time.perf_counter() - start) * 0.1
+
+    def _track(self, patch: Tuple[Rect, np.ndarray], frame: np.ndarray,
+               points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Lucas-Kanade между окном прошлого кадра и тем же окном текущего"""
+        (x1, y1, x2, y2), prev_gray = patch
+        offset = np.array([x1, y1], dtype=np.float32)
+        gray = self._to_gray(frame[y1:y2, x1:x2])
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(
+            prev_gray, gray, points - offset, None, **self._lk_params
+        )
+        return moved + offset, status.ravel() == 1
+
+    def _patch(self, frame: np.ndarray,
+               bbox: Tuple[int, int, int, int]) -> Tuple[Rect, np.ndarray]:
+        """Окно вокруг объекта с запасом на максимальное смещение"""
+        height, width = frame.shape[:2]
+        x, y, w, h = bbox
+        rect = (max(0, x - self._margin), max(0, y - self._margin),
+                min(width, x + w + self._margin), min(height, y + h + self._margin))
+        x1, y1, x2, y2 = rect
+        window = frame[y1:y2, x1:x2]
+        # Копия даже для серого кадра: сам кадр может быть изменен рендерером
+        gray = self._to_gray(window) if window.ndim == 3 else window.copy()
+        return rect, gray
+
+    def _seed(self, frame: np.ndarray, bbox: Tuple[int, int, int, int]) -> np.ndarray:
+        """Выбор точек для отслеживания внутри прямоугольника объекта"""
+        x, y, w, h = bbox
+        empty = np.empty((0, 1, 2), dtype=np.float32)
+        if w < 2 or h < 2:
+            return empty
+
+        corners = cv2.goodFeaturesToTrack(
+            self._to_gray(frame[y:y + h, x:x + w]),
+            maxCorners=self.config.max_points, qualityLevel=0.01, minDistance=3
+        )
+        if corners is None:
+            return empty
+        return corners + np.array([x, y], dtype=np.float32)
+
+    @staticmethod
+    def _to_gray(image: np.ndarray) -> np.ndarray:
+        """Оттенки серого для окна кадра"""
+        if image.ndim == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Стоимость оценки потока за кадр"""
+        return {
+            'flow_ms': self._flow_time * 1000,
+            'flow_points': self._tracked_points,
+            'flow_seeded': self._seeded_tracks
+        }
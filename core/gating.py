@@ -0,0 +1,122 @@
+"""Пропуск детекции на статичных кадрах"""
+
+import cv2
+import numpy as np
+import time
+from typing import Any, Dict, Optional
+from models.config import GateConfig
+from models.detection import DetectionBatch
+
+
+class MotionGate:
+    """Дешевая проверка изменений перед полной детекцией
+
+    Кадр усредняется (INTER_AREA) по ячейкам со стороной в половину
+    стороны наименьшего объекта (``min_object_area``): объект в любом
+    положении целиком покрывает хотя бы одну ячейку, поэтому его
+    появление или смещение меняет ячейку на полный контраст и открывает
+    детекцию. Миниатюра сравнивается с миниатюрой последнего
+    обработанного кадра по максимуму разности, поэтому медленный дрейф
+    тоже накапливается. Если изменений нет, повторно возвращаются
+    последние результаты, но непустые - не дольше ``max_repeat`` кадров.
+    Через каждые ``refresh_interval`` пропусков кадр обрабатывается
+    принудительно, чтобы модели фона продолжали обучаться; для
+    детекторов без состояния повторная обработка неизменного кадра
+    ничего не дает и не выполняется.
+    """
+
+    def __init__(self, config: GateConfig, stateful: bool = True):
+        self.config = config
+        self.stateful = stateful
+        self._reference: Optional[np.ndarray] = None
+        self._diff: Optional[np.ndarray] = None
+        self._last_detections = DetectionBatch.empty()
+        self._skipped_in_row = 0
+
+        # Статистика
+        self._frames = 0
+        self._hits = 0
+        self._detect_time = 0.0
+        self._gate_time = 0.0
+        self._saved_time = 0.0
+        self._spent_time = 0.0
+
+    def process(self, detector, frame: np.ndarray) -> DetectionBatch:
+        """Детекция кадра или повтор последних результатов"""
+        if not self.config.enabled:
+            return detector.process(frame)
+
+        self._frames += 1
+        if not self._should_process(frame):
+            self._hits += 1
+            self._skipped_in_row += 1
+            self._saved_time += self._detect_time
+            return self._last_detections
+
+        start = time.perf_counter()
+        detections = detector.process(frame)
+        elapsed = time.perf_counter() - start
+
+        self._detect_time = (elapsed if self._detect_time == 0.0
+                             else self._detect_time * 0.9 + elapsed * 0.1)
+        self._spent_time += elapsed
+        self._last_detections = detections
+        self._skipped_in_row = 0
+        return detections
+
+    def _should_process(self, frame: np.ndarray) -> bool:
+        """Сравнение миниатюры с миниатюрой последнего обработанного кадра"""
+        start = time.perf_counter()
+        cfg = self.config
+
+        height, width = frame.shape[:2]
+        cell = max(1, int(np.sqrt(cfg.min_object_area)) // 2)
+        thumbnail = frame
+        if cell > 1:
+            thumbnail = cv2.resize(frame, (max(1, width // cell), max(1, height // cell)),
+                                   interpolation=cv2.INTER_AREA)
+        if thumbnail.ndim == 3:
+            thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+
+        changed = True
+        if self._reference is not None and self._reference.shape == thumbnail.shape:
+            self._diff = cv2.absdiff(thumbnail, self._reference, dst=self._diff)
+            if cfg.min_changed_pixels == 1:
+                changed = int(self._diff.max()) > cfg.pixel_threshold
+            else:
+                _, mask = cv2.threshold(self._diff, cfg.pixel_threshold, 255,
+                                        cv2.THRESH_BINARY)
+                changed = cv2.countNonZero(mask) >= cfg.min_changed_pixels
+
+        # Принудительное обновление для обучающихся моделей; непустые
+        # результаты не повторяются дольше max_repeat кадров
+        process = (changed or
+                   (self.stateful and self._skipped_in_row >= cfg.refresh_interval) or
+                   (len(self._last_detections) > 0 and
+                    self._skipped_in_row >= cfg.max_repeat))
+        if process:
+            self._reference = thumbnail
+
+        self._gate_time = self._gate_time * 0.9 + (time.perf_counter() - start) * 0.1
+        return process
+
+    def reset(self, stateful: bool = True) -> None:
+        """Сброс после смены детектора"""
+        self.stateful = stateful
+        self._reference = None
+        self._last_detections = DetectionBatch.empty()
+        self._skipped_in_row = 0
+        self._detect_time = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Доля пропущенных кадров и сэкономленное время детекции"""
+        if not self.config.enabled or self._frames == 0:
+            return {}
+
+        total = self._saved_time + self._spent_time
+        return {
+            'gate_hit_pct': self._hits / self._frames * 100,
+            'gate_ms': self._gate_time * 1000,
+            'gate_saved_s': self._saved_time,
+            'gate_saved_pct': self._saved_time / total * 100 if total > 0 else 0.0
+        }
@@ -0,0 +1,103 @@
+"""Тепловая карта активности на грубой сетке"""
+
+import cv2
+import numpy as np
+import threading
+from typing import Optional, Tuple
+from models.config import HeatmapConfig
+
+
+class ActivityHeatmap:
+    """Тепловая карта центров объектов
+
+    Карта хранится на сетке с ячейкой ``cell_size`` пикселей и затухает
+    один раз за кадр с множителем, зависящим от прошедшего времени
+    (период полураспада ``half_life``), поэтому не зависит ни от числа
+    объектов, ни от частоты кадров. Центры всех объектов добавляются
+    одним векторным вызовом; до размера кадра карта увеличивается только
+    при наложении. Карту могут разделять рендереры нескольких потоков.
+    Вместо текущей активности может показываться заданная карта истории
+    (сумма карт занятости за окно времени).
+    """
+
+    def __init__(self, config: HeatmapConfig):
+        self.config = config
+        self._grid: Optional[np.ndarray] = None
+        self._frame_shape: Tuple[int, int] = (0, 0)
+        self._last_time: Optional[float] = None
+        self._history: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def update(self, centers: np.ndarray, shape: Tuple[int, ...],
+               timestamp: float) -> None:
+        """Затухание и добавление центров объектов (x, y в пикселях кадра)"""
+        with self._lock:
+            self._update(centers, shape, timestamp)
+
+    def _update(self, centers: np.ndarray, shape: Tuple[int, ...],
+                timestamp: float) -> None:
+        cell = self.config.cell_size
+        height, width = shape[:2]
+        if (height, width) != self._frame_shape:
+            self._grid = np.zeros((-(-height // cell), -(-width // cell)),
+                                  dtype=np.float32)
+            self._frame_shape = (height, width)
+            self._last_time = None
+
+        # Кадры из разных потоков могут прийти не по порядку
+        if self._last_time is not None:
+            elapsed = max(0.0, timestamp - self._last_time)
+            self._grid *= 0.5 ** (elapsed / self.config.half_life)
+            timestamp = max(timestamp, self._last_time)
+        self._last_time = timestamp
+
+        if len(centers) == 0:
+            return
+
+        cells = np.asarray(centers, dtype=np.int64) // cell
+        inside = ((cells[:, 0] >= 0) & (cells[:, 0] < self._grid.shape[1]) &
+                  (cells[:, 1] >= 0) & (cells[:, 1] < self._grid.shape[0]))
+        cells = cells[inside]
+        np.add.at(self._grid, (cells[:, 1], cells[:, 0]), 1.0)
+
+    def set_history(self, grid: Optional[np.ndarray]) -> None:
+        """Показ карты истории вместо текущей активности (None - текущая)"""
+        with self._lock:
+            self._history = grid
+
+    def colorize(self) -> Optional[np.ndarray]:
+        """Цветная карта на сетке (None - карта пуста)"""
+        with self._lock:
+            grid = self._history if self._history is not None else self._grid
+            if grid is None:
+                return None
+
+            peak = float(grid.max())
+            if peak <= 0:
+                return None
+
+            # Нормализация, сглаживание и цвет на сетке, увеличение при наложении
+            normalized = cv2.convertScaleAbs(grid, alpha=255.0 / peak)
+        normalized = cv2.GaussianBlur(normalized, (3, 3), 0)
+        return cv2.applyColorMap(normalized, cv2.COLORMAP_JET)
+
+    def composite(self, image: np.ndarray, strength: float = 1.0) -> np.ndarray:
+        """Наложение карты на изображение на месте (карта растягивается
+        на изображение, которое может быть уменьшенной копией кадра);
+        ``strength`` - множитель непрозрачности карты"""
+        colored = self.colorize()
+        if colored is None:
+            return image
+
+        height, width = image.shape[:2]
+        colored = cv2.resize(colored, (width, height), interpolation=cv2.INTER_LINEAR)
+
+        opacity = self.config.opacity * strength
+        return cv2.addWeighted(image, 1.0 - opacity, colored, opacity, 0, dst=image)
+
+    def reset(self) -> None:
+        """Очистка карты"""
+        with self._lock:
+            if self._grid is not None:
+                self._grid.fill(0)
+            self._last_time = None
@@ -0,0 +1,232 @@
+"""Маски исключения игнорируемых областей кадра"""
+
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+from models.config import ExclusionConfig
+from utils.logger import logger
+
+# (x1, y1, x2, y2)
+Rect = Tuple[int, int, int, int]
+
+
+class ExclusionMask:
+    """Статические зоны пользователя и выученная маска мерцания
+
+    Зоны исключения задаются прямоугольниками в координатах кадра. Если
+    они отсекают края кадра, детектор получает только обрезанную область.
+    Мерцающие пиксели (часы, бегущие строки, индикаторы) выявляются по
+    долговременной частоте активности на сетке пониженного разрешения.
+    Обе маски объединяются заранее и накладываются на бинарную маску
+    детектора до выделения компонент.
+    """
+
+    _MAX_CACHED_SHAPES = 4
+
+    def __init__(self, config: ExclusionConfig):
+        self.config = config
+        self._zones_key = None
+        self._frame_shape: Optional[Tuple[int, int]] = None
+        self._crop: Rect = (0, 0, 0, 0)
+        self._static: Optional[np.ndarray] = None
+        self._zones_fraction = 0.0
+
+        # Долговременная активность на сетке всего кадра: переживает
+        # изменение зон и обрезки
+        self._cell = 1
+        self._activity: Optional[np.ndarray] = None
+        self._learned: Optional[np.ndarray] = None
+        self._learned_cells = 0
+        self._flicker: Optional[np.ndarray] = None  # Мерцающие ячейки до расширения
+        self._frames = 0
+
+        # Объединенные маски под размер маски детектора
+        self._allowed: Dict[Tuple[int, int, bool], Optional[np.ndarray]] = {}
+
+        # Окно поиска внутри обрабатываемой области (детекция по окнам)
+        self._window: Optional[Rect] = None
+
+    def begin_frame(self, shape: Tuple[int, ...]) -> Rect:
+        """Обновление статических зон и область кадра для обработки"""
+        height, width = shape[:2]
+        cfg = self.config
+        if not cfg.enabled:
+            return (0, 0, width, height)
+
+        key = ((height, width), tuple(tuple(zone) for zone in cfg.zones), cfg.crop)
+        if key != self._zones_key:
+            self._set_frame_shape(height, width)
+            self._build_static(height, width)
+            self._zones_key = key
+        return self._crop
+
+    def _set_frame_shape(self, height: int, width: int) -> None:
+        """Сетка активности под размер кадра"""
+        if self._frame_shape == (height, width):
+            return
+
+        self._frame_shape = (height, width)
+        self._cell = max(1, int(round(1.0 / self.config.flicker_scale)))
+        self._activity = np.zeros((-(-height // self._cell), -(-width // self._cell)),
+                                  dtype=np.float32)
+        self._learned = None
+        self._learned_cells = 0
+        self._flicker = np.zeros(self._activity.shape, dtype=np.uint8)
+        self._frames = 0
+
+    def _build_static(self, height: int, width: int) -> None:
+        """Построение маски статических зон и области обрезки"""
+        allowed = np.full((height, width), 255, dtype=np.uint8)
+        for x1, y1, x2, y2 in self.config.zones:
+            allowed[max(0, y1):max(0, y2), max(0, x1):max(0, x2)] = 0
+
+        self._zones_fraction = 1.0 - cv2.countNonZero(allowed) / allowed.size
+
+        # Обрезка по ограничивающему прямоугольнику разрешенной области
+        x, y, w, h = cv2.boundingRect(allowed)
+        if self.config.crop and w and h:
+            self._crop = (x, y, x + w, y + h)
+            allowed = allowed[y:y + h, x:x + w]
+        else:
+            self._crop = (0, 0, width, height) if w and h else (0, 0, 0, 0)
+
+        fully_allowed = cv2.countNonZero(allowed) == allowed.size
+        self._static = None if fully_allowed or not (w and h) else allowed
+        self._allowed.clear()
+
+        if self.config.zones:
+            logger.info(f"Exclusion zones: {len(self.config.zones)}, "
+                        f"processing region {self._crop}")
+
+    def set_window(self, window: Optional[Rect]) -> None:
+        """Окно обрабатываемой области, из которого получена маска детектора
+
+        Пока окно задано, маски детектора накладываются на соответствующую
+        часть масок исключения, а мерцание не изучается: статистика по
+        окнам вокруг объектов смещена.
+        """
+        self._window = window
+
+    def apply(self, mask: np.ndarray, learn: bool = True) -> np.ndarray:
+        """Наложение масок исключения на бинарную маску на месте
+
+        ``learn`` - маска отражает изменения между кадрами и может
+        использоваться для выявления мерцания. Для масок яркости и порогов
+        (контурный, тепловизионный детекторы) применяются только зоны.
+        Маска может быть уменьшенной копией обрабатываемой области.
+        """
+        cfg = self.config
+        if not cfg.enabled:
+            return mask
+
+        if self._frame_shape is None:
+            # Вложенный детектор вызывается без process: маска - весь кадр
+            self._set_frame_shape(*mask.shape[:2])
+            self._crop = (0, 0, mask.shape[1], mask.shape[0])
+
+        # Обучение по исходной маске, иначе исключенное мерцание забудется
+        if learn and cfg.learn_flicker and self._window is None:
+            self._learn(mask)
+
+        allowed = self.allowed(mask.shape[:2], learned=learn and cfg.learn_flicker)
+        if allowed is not None:
+            cv2.bitwise_and(mask, allowed, dst=mask)
+        return mask
+
+    def allowed(self, shape: Tuple[int, int],
+                learned: bool = True) -> Optional[np.ndarray]:
+        """Маска разрешенных пикселей заданного размера (None - без исключений)"""
+        if self._window is not None:
+            x1, y1, x2, y2 = self._crop
+            combined = self._allowed_region((y2 - y1, x2 - x1), learned)
+            if combined is None:
+                return None
+            wx1, wy1, wx2, wy2 = self._window
+            part = combined[wy1:wy2, wx1:wx2]
+            if part.shape != tuple(shape):
+                part = cv2.resize(part, (shape[1], shape[0]),
+                                  interpolation=cv2.INTER_NEAREST)
+            return part
+        return self._allowed_region(shape, learned)
+
+    def _allowed_region(self, shape: Tuple[int, int],
+                       learned: bool = True) -> Optional[np.ndarray]:
+        """Маска разрешенных пикселей всей обрабатываемой области"""
+        key = (shape[0], shape[1], learned)
+        if key in self._allowed:
+            return self._allowed[key]
+
+        height, width = shape
+        parts = [self._static]
+        if learned and self._learned is not None:
+            gx1, gy1, gx2, gy2 = self._crop_cells()
+            parts.append(self._learned[gy1:gy2, gx1:gx2])
+
+        combined = None
+        for part in parts:
+            if part is None:
+                continue
+            if part.shape != (height, width):
+                part = cv2.resize(part, (width, height),
+                                  interpolation=cv2.INTER_NEAREST)
+            combined = part if combined is None else cv2.bitwise_and(combined, part)
+
+        if len(self._allowed) >= self._MAX_CACHED_SHAPES:
+            self._allowed.clear()
+        self._allowed[key] = combined
+        return combined
+
+    def _crop_cells(self) -> Rect:
+        """Ячейки сетки активности, покрывающие обрабатываемую область"""
+        x1, y1, x2, y2 = self._crop
+        cell = self._cell
+        return x1 // cell, y1 // cell, -(-x2 // cell), -(-y2 // cell)
+
+    def _learn(self, mask: np.ndarray) -> None:
+        """Накопление частоты активности на сетке пониженного разрешения"""
+        cfg = self.config
+        gx1, gy1, gx2, gy2 = self._crop_cells()
+        if gx2 <= gx1 or gy2 <= gy1:
+            return
+
+        # INTER_AREA дает долю активных пикселей ячейки (0-255)
+        cell_activity = cv2.resize(mask, (gx2 - gx1, gy2 - gy1),
+                                   interpolation=cv2.INTER_AREA)
+        cv2.accumulateWeighted(cell_activity, self._activity[gy1:gy2, gx1:gx2],
+                               cfg.flicker_rate)
+        self._frames += 1
+
+        if (self._frames >= cfg.warmup_frames and
+                self._frames % cfg.refresh_interval == 0):
+            self._refresh_learned()
+
+    def _refresh_learned(self) -> None:
+        """Пересчет маски хронически мерцающих ячеек"""
+        threshold = self.config.flicker_threshold * 255
+        flicker = (self._activity >= threshold).astype(np.uint8)
+        # Сравнение самих ячеек: при том же числе мерцание могло сместиться
+        if np.array_equal(flicker, self._flicker):
+            return
+        self._flicker = flicker
+        cells = int(cv2.countNonZero(flicker))
+
+        if cells:
+            # Расширение на соседние ячейки: край мерцающей области
+            flicker = cv2.dilate(flicker, np.ones((3, 3), np.uint8))
+            self._learned = np.where(flicker > 0, 0, 255).astype(np.uint8)
+        else:
+            self._learned = None
+
+        logger.info(f"Flicker mask updated: {cells} cells excluded")
+        self._learned_cells = cells
+        self._allowed.clear()
+
+    def get_stats(self) -> dict:
+        """Доля кадра, исключенная зонами и маской мерцания"""
+        if not self.config.enabled:
+            return {}
+
+        stats = {'excluded_zones_pct': self._zones_fraction * 100}
+        if self._activity is not None and self.config.learn_flicker:
+            stats['flicker_pct'] = self._learned_cells / self._activity.size * 100
+        return stats
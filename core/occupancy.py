@@ -0,0 +1,166 @@
+"""Долговременные карты занятости в файлах, отображенных в память"""
+
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from models.config import OccupancyConfig
+from utils.logger import logger
+
+
+class OccupancyMap:
+    """Кольцо карт занятости по интервалам времени (по умолчанию по часу)
+
+    Центры объектов каждого кадра добавляются в грубую сетку карты
+    текущего интервала. Карты хранятся в кольце ``buckets`` слотов в
+    файле .npy, отображенном в память, поэтому занятая память не растет
+    с длительностью работы, а сумма за длинный период считается по одной
+    карте за раз. Рядом хранится индекс слотов: номер интервала
+    (время начала / bucket_seconds, -1 - пусто) и число кадров в нем.
+    Файлы различаются размером кадра, ячейки и интервала.
+    """
+
+    def __init__(self, config: OccupancyConfig):
+        self.config = config
+        self._grid: Optional[np.ndarray] = None  # buckets x строки x столбцы
+        self._index: Optional[np.ndarray] = None  # buckets x [интервал, кадры]
+        self._frame_shape: Tuple[int, int] = (0, 0)
+        self._slot = -1
+
+    def _paths(self, shape: Tuple[int, int]) -> Tuple[str, str]:
+        """Пути файла карт и файла индекса для размера кадра"""
+        cfg = self.config
+        height, width = shape
+        name = f'occupancy_{width}x{height}_{cfg.cell_size}px_{cfg.bucket_seconds:g}s'
+        root = os.path.join(cfg.path, name)
+        return root + '.npy', root + '.index.npy'
+
+    def open(self, shape: Tuple[int, ...], create: bool = True) -> bool:
+        """Открытие кольца для кадров размера shape (create - создать новое,
+        если файлов нет или их формат не совпадает); False - кольца нет"""
+        cfg = self.config
+        height, width = shape[:2]
+        if (height, width) == self._frame_shape and self._grid is not None:
+            return True
+
+        self.close()
+        cell = cfg.cell_size
+        grid_shape = (cfg.buckets, -(-height // cell), -(-width // cell))
+        grid_path, index_path = self._paths((height, width))
+
+        grid = index = None
+        if os.path.exists(grid_path) and os.path.exists(index_path):
+            try:
+                grid = np.lib.format.open_memmap(grid_path, mode='r+')
+                index = np.lib.format.open_memmap(index_path, mode='r+')
+                if grid.shape != grid_shape or index.shape != (cfg.buckets, 2):
+                    logger.warning(f"Occupancy ring {grid_path} has a different "
+                                   f"layout {grid.shape}, starting a new one")
+                    grid = index = None
+            except Exception as e:
+                logger.error(f"Failed to open occupancy ring {grid_path}: {e}")
+                grid = index = None
+
+        if grid is None:
+            if not create:
+                return False
+            os.makedirs(cfg.path, exist_ok=True)
+            grid = np.lib.format.open_memmap(grid_path, mode='w+',
+                                             dtype=np.float32, shape=grid_shape)
+            index = np.lib.format.open_memmap(index_path, mode='w+',
+                                              dtype=np.int64, shape=(cfg.buckets, 2))
+            index[:, 0] = -1
+            logger.info(f"Occupancy ring created: {grid_path} "
+                        f"({grid.nbytes / 1024 ** 2:.1f} MB)")
+
+        self._grid = grid
+        self._index = index
+        self._frame_shape = (height, width)
+        self._slot = -1
+        return True
+
+    def add(self, centers: np.ndarray, shape: Tuple[int, ...],
+            timestamp: float) -> None:
+        """Добавление центров объектов кадра (x, y в пикселях кадра)"""
+        self.open(shape)
+
+        # Слот интервала; слот, занятый старым интервалом, очищается
+        bucket = int(timestamp // self.config.bucket_seconds)
+        slot = bucket % self.config.buckets
+        if self._index[slot, 0] != bucket:
+            if self._slot >= 0:
+                self.flush()
+            self._grid[slot] = 0
+            self._index[slot] = (bucket, 0)
+        self._slot = slot
+        self._index[slot, 1] += 1
+
+        if len(centers) == 0:
+            return
+
+        cell = self.config.cell_size
+        grid = self._grid[slot]
+        cells = np.asarray(centers, dtype=np.int64) // cell
+        inside = ((cells[:, 0] >= 0) & (cells[:, 0] < grid.shape[1]) &
+                  (cells[:, 1] >= 0) & (cells[:, 1] < grid.shape[0]))
+        cells = cells[inside]
+        np.add.at(grid, (cells[:, 1], cells[:, 0]), 1.0)
+
+    def window(self, start: float, end: float,
+               per_frame: bool = False) -> Optional[np.ndarray]:
+        """Сумма карт интервалов, пересекающихся с [start, end)
+
+        Интервал, идущий в момент start, входит в сумму целиком.
+        ``per_frame`` - деление на число кадров (средняя занятость ячейки
+        на кадр). None - кольцо не открыто или в окне нет данных.
+        """
+        if self._grid is None:
+            return None
+
+        seconds = self.config.bucket_seconds
+        first, last = int(start // seconds), int(np.ceil(end / seconds))
+        buckets = self._index[:, 0]
+        slots = np.flatnonzero((buckets >= first) & (buckets < last))
+        if len(slots) == 0:
+            return None
+
+        # По одной карте: с диска читаются только нужные слоты
+        total = np.zeros(self._grid.shape[1:], dtype=np.float64)
+        for slot in slots.tolist():
+            total += self._grid[slot]
+
+        if per_frame:
+            frames = int(self._index[slots, 1].sum())
+            if frames:
+                total /= frames
+        return total
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Сохраненные интервалы: (время начала, число кадров) по времени"""
+        if self._index is None:
+            return []
+        stored = self._index[self._index[:, 0] >= 0]
+        stored = stored[np.argsort(stored[:, 0])]
+        seconds = self.config.bucket_seconds
+        return [(bucket * seconds, frames) for bucket, frames in stored.tolist()]
+
+    def flush(self) -> None:
+        """Запись измененных страниц на диск"""
+        if self._grid is not None:
+            self._grid.flush()
+            self._index.flush()
+
+    def close(self) -> None:
+        """Запись и закрытие файлов кольца"""
+        if self._grid is None:
+            return
+        self.flush()
+        self._grid = None
+        self._index = None
+        self._frame_shape = (0, 0)
+        self._slot = -1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Число сохраненных интервалов"""
+        if self._index is None:
+            return {}
+        return {'occupancy_buckets': int((self._index[:, 0] >= 0).sum())}
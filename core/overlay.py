@@ -0,0 +1,224 @@
+"""Поверхности рисования оверлея"""
+
+import cv2
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+from utils.rects import Rect
+
+Color = Tuple[int, int, int]
+
+
+class Surface(ABC):
+    """Поверхность, на которой рендерер рисует детекции"""
+
+    @abstractmethod
+    def contours(self, contours: Sequence[np.ndarray], color: Color,
+                 thickness: int = 1) -> None:
+        """Контуры одним вызовом"""
+        pass
+
+    @abstractmethod
+    def blit(self, image: np.ndarray, alpha: np.ndarray,
+             position: Tuple[int, int]) -> None:
+        """Копирование готового патча по маске (левый верхний угол)"""
+        pass
+
+    @abstractmethod
+    def polylines(self, polys: np.ndarray, color: Color, thickness: int = 1) -> None:
+        """Замкнутые ломаные одним вызовом (массив n x k x 2)"""
+        pass
+
+    @abstractmethod
+    def stamp(self, offsets: np.ndarray, centers: np.ndarray, color: Color) -> None:
+        """Один и тот же набор пикселей (смещения dx, dy) вокруг всех центров"""
+        pass
+
+
+def stamp_pixels(shape: Tuple[int, ...], offsets: np.ndarray,
+                 centers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Координаты пикселей штампа вокруг центров в границах изображения"""
+    height, width = shape[:2]
+    xs = (centers[:, None, 0] + offsets[None, :, 0]).ravel()
+    ys = (centers[:, None, 1] + offsets[None, :, 1]).ravel()
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return ys[inside], xs[inside]
+
+
+def clip_blit(shape: Tuple[int, ...], size: Tuple[int, int],
+              position: Tuple[int, int]) -> Optional[Tuple[slice, slice, slice, slice]]:
+    """Срезы цели и патча для патча, частично выходящего за границы"""
+    height, width = shape[:2]
+    patch_h, patch_w = size
+    x, y = position
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(width, x + patch_w), min(height, y + patch_h)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return (slice(y1, y2), slice(x1, x2),
+            slice(y1 - y, y2 - y), slice(x1 - x, x2 - x))
+
+
+class ImageSurface(Surface):
+    """Рисование прямо в изображение"""
+
+    def __init__(self, image: np.ndarray):
+        self.image = image
+
+    def contours(self, contours, color, thickness=1):
+        cv2.drawContours(self.image, list(contours), -1, color, thickness)
+
+    def blit(self, image, alpha, position):
+        slices = clip_blit(self.image.shape, alpha.shape, position)
+        if slices is None:
+            return
+        ty, tx, py, px = slices
+        cv2.copyTo(image[py, px], alpha[py, px], dst=self.image[ty, tx])
+
+    def polylines(self, polys, color, thickness=1):
+        cv2.polylines(self.image, polys, True, color, thickness)
+
+    def stamp(self, offsets, centers, color):
+        ys, xs = stamp_pixels(self.image.shape, offsets, centers)
+        self.image[ys, xs] = color
+
+
+class OverlayLayer(Surface):
+    """Разреженный слой оверлея с маской и списком грязных прямоугольников
+
+    Каждая операция рисует в цветной слой и в маску непрозрачности и
+    запоминает затронутый прямоугольник. На кадр накладываются только эти
+    прямоугольники, а перед следующим кадром в них очищается маска,
+    поэтому стоимость определяется числом объектов, а не размером кадра.
+    """
+
+    _CELL = 32
+
+    def __init__(self):
+        self._image: Optional[np.ndarray] = None
+        self._alpha: Optional[np.ndarray] = None
+        self._dirty: List[Rect] = []
+        self._shape: Tuple[int, int] = (0, 0)
+
+    def begin(self, shape: Tuple[int, ...]) -> None:
+        """Начало нового кадра: очистка прошлых грязных областей"""
+        height, width = shape[:2]
+        if (height, width) != self._shape:
+            self._image = np.zeros((height, width, 3), dtype=np.uint8)
+            self._alpha = np.zeros((height, width), dtype=np.uint8)
+            self._shape = (height, width)
+        else:
+            # Кадр не был наложен: маска очищается здесь. Цвет под
+            # нулевой маской не важен
+            for x1, y1, x2, y2 in self._dirty_runs():
+                self._alpha[y1:y2, x1:x2] = 0
+        self._dirty = []
+
+    def composite(self, frame: np.ndarray, opacity: float = 1.0) -> np.ndarray:
+        """Наложение слоя на кадр на месте (opacity < 1 - полупрозрачно)
+
+        Грязные прямоугольники сводятся к отрезкам строк сетки ячеек
+        ``_CELL`` пикселей, поэтому число вызовов OpenCV не растет с
+        числом объектов. Маска наложенных областей сразу очищается.
+        """
+        for x1, y1, x2, y2 in self._dirty_runs():
+            target = frame[y1:y2, x1:x2]
+            layer = self._image[y1:y2, x1:x2]
+            alpha = self._alpha[y1:y2, x1:x2]
+            if opacity < 1.0:
+                layer = cv2.addWeighted(target, 1.0 - opacity, layer, opacity, 0)
+            cv2.copyTo(layer, alpha, dst=target)
+            alpha[...] = 0
+        self._dirty = []
+        return frame
+
+    def _dirty_runs(self) -> List[Rect]:
+        """Непересекающиеся отрезки строк сетки, покрывающие грязные области"""
+        if not self._dirty:
+            return []
+
+        height, width = self._shape
+        cell = self._CELL
+        grid_h, grid_w = -(-height // cell), -(-width // cell)
+
+        # Покрытие ячеек через двумерный разностный массив
+        rects = np.array(self._dirty, dtype=np.int64)
+        x1, y1 = rects[:, 0] // cell, rects[:, 1] // cell
+        x2, y2 = -(-rects[:, 2] // cell), -(-rects[:, 3] // cell)
+        coverage = np.zeros((grid_h + 1, grid_w + 1), dtype=np.int32)
+        np.add.at(coverage, (y1, x1), 1)
+        np.add.at(coverage, (y1, x2), -1)
+        np.add.at(coverage, (y2, x1), -1)
+        np.add.at(coverage, (y2, x2), 1)
+        dirty = coverage.cumsum(axis=0).cumsum(axis=1)[:grid_h, :grid_w] > 0
+
+        # Начала и концы отрезков в каждой строке ячеек
+        padded = np.zeros((grid_h, grid_w + 2), dtype=np.int8)
+        padded[:, 1:-1] = dirty
+        edges = np.diff(padded, axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+
+        return [
+            (start * cell, row * cell,
+             min(width, end * cell), min(height, (row + 1) * cell))
+            for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist())
+        ]
+
+    @property
+    def dirty_rects(self) -> List[Rect]:
+        """Прямоугольники, затронутые в текущем кадре"""
+        return self._dirty
+
+    def contours(self, contours, color, thickness=1):
+        contours = list(contours)
+        if not contours:
+            return
+        cv2.drawContours(self._image, contours, -1, color, thickness)
+        cv2.drawContours(self._alpha, contours, -1, 255, thickness)
+        pad = max(thickness, 0) + 1
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            self._mark(x - pad, y - pad, x + w + pad, y + h + pad)
+
+    def blit(self, image, alpha, position):
+        slices = clip_blit(self._shape, alpha.shape, position)
+        if slices is None:
+            return
+        ty, tx, py, px = slices
+        cv2.copyTo(image[py, px], alpha[py, px], dst=self._image[ty, tx])
+        cv2.max(self._alpha[ty, tx], alpha[py, px], dst=self._alpha[ty, tx])
+        self._dirty.append((tx.start, ty.start, tx.stop, ty.stop))
+
+    def polylines(self, polys, color, thickness=1):
+        if len(polys) == 0:
+            return
+        cv2.polylines(self._image, polys, True, color, thickness)
+        cv2.polylines(self._alpha, polys, True, 255, thickness)
+        pad = max(thickness, 0)
+        self._mark_many(np.concatenate([polys.min(axis=1) - pad,
+                                        polys.max(axis=1) + pad + 1], axis=1))
+
+    def stamp(self, offsets, centers, color):
+        if len(centers) == 0:
+            return
+        ys, xs = stamp_pixels(self._shape, offsets, centers)
+        self._image[ys, xs] = color
+        self._alpha[ys, xs] = 255
+        self._mark_many(np.concatenate([centers + offsets.min(axis=0),
+                                        centers + offsets.max(axis=0) + 1], axis=1))
+
+    def _mark_many(self, rects: np.ndarray) -> None:
+        """Запоминание массива областей (x1, y1, x2, y2) в границах слоя"""
+        height, width = self._shape
+        rects = np.clip(rects, 0, [width, height, width, height])
+        valid = (rects[:, 2] > rects[:, 0]) & (rects[:, 3] > rects[:, 1])
+        self._dirty.extend(map(tuple, rects[valid].tolist()))
+
+    def _mark(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        """Запоминание затронутой области в границах слоя"""
+        height, width = self._shape
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(width, int(x2)), min(height, int(y2))
+        if x2 > x1 and y2 > y1:
+            self._dirty.append((x1, y1, x2, y2))
@@ -0,0 +1,76 @@
+"""Пресеты конфигурации детекторов"""
+
+import json
+import os
+from enum import Enum
+from typing import Any, Dict, Optional
+from models.config import GlobalConfig
+from models.enums import TrackingMethod
+from utils.logger import logger
+
+
+def get_param(config: GlobalConfig, path: str) -> Any:
+    """Значение параметра по пути вида 'contour.threshold'"""
+    target = config
+    for name in path.split('.'):
+        target = getattr(target, name)
+    return target
+
+
+def set_param(config: GlobalConfig, path: str, value: Any) -> None:
+    """Установка параметра с приведением к типу текущего значения"""
+    *sections, name = path.split('.')
+    target = config
+    for section in sections:
+        target = getattr(target, section)
+
+    current = getattr(target, name)
+    if isinstance(current, bool):
+        value = bool(value)
+    elif isinstance(current, int):
+        value = int(round(value))
+    elif isinstance(current, float):
+        value = float(value)
+    elif isinstance(current, Enum):
+        value = type(current)[value] if isinstance(value, str) else type(current)(value)
+    setattr(target, name, value)
+
+
+def save_preset(path: str, method: TrackingMethod, params: Dict[str, Any],
+                metrics: Optional[Dict[str, Any]] = None) -> None:
+    """Сохранение пресета: метод, параметры и метрики подбора"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    preset = {
+        'method': method.name,
+        'params': params,
+        'metrics': metrics or {}
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(preset, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"Preset saved to {path}")
+
+
+def load_preset(config: GlobalConfig, path: str) -> GlobalConfig:
+    """Применение пресета к конфигурации"""
+    with open(path, 'r', encoding='utf-8') as f:
+        preset = json.load(f)
+
+    method = preset.get('method')
+    if method:
+        config.method = TrackingMethod[method]
+
+    for param, value in preset.get('params', {}).items():
+        try:
+            set_param(config, param, value)
+        except (AttributeError, KeyError, ValueError) as e:
+            logger.warning(f"Preset parameter '{param}' ignored: {e}")
+
+    if not config.validate_all():
+        raise ValueError(f'Preset {path} produces an invalid configuration')
+
+    logger.info(f"Preset loaded from {os.path.basename(path)}")
+    return config
@@ -0,0 +1,151 @@
+"""Реестр детекторов с метаданными возможностей и стоимости"""
+
+import importlib
+from dataclasses import dataclass
+from importlib import metadata
+from typing import Dict, List, Optional, Type, Union
+from models.enums import TrackingMethod
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class DetectorInfo:
+    """Описание детектора для фабрики и планировщиков
+
+    ``target`` - путь ``"модуль:Класс"``; модуль импортируется только при
+    первом создании детектора.
+    """
+    name: str
+    target: str
+    title: str = ""
+    needs_color: bool = False  # False - достаточно оттенков серого
+    stateful: bool = True  # Результат зависит от предыдущих кадров
+    supports_roi: bool = False  # Детекция корректна на вырезанных окнах кадра
+    relative_cost: float = 1.0  # Относительно контурного детектора
+
+
+BUILTIN_DETECTORS = [
+    DetectorInfo(
+        name=TrackingMethod.CONTOUR_DETECTION.name,
+        target='.detectors.contour:ContourDetector',
+        title=TrackingMethod.CONTOUR_DETECTION.value,
+        stateful=False, supports_roi=True,
+        relative_cost=1.0
+    ),
+    DetectorInfo(
+        name=TrackingMethod.MOTION_DETECTION.name,
+        target='.detectors.motion:MotionDetector',
+        title=TrackingMethod.MOTION_DETECTION.value,
+        relative_cost=1.0
+    ),
+    DetectorInfo(
+        name=TrackingMethod.ADAPTIVE_BACKGROUND.name,
+        target='.detectors.adaptive:AdaptiveDetector',
+        title=TrackingMethod.ADAPTIVE_BACKGROUND.value,
+        needs_color=True, relative_cost=3.0
+    ),
+    DetectorInfo(
+        name=TrackingMethod.SENSITIVE_MOTION.name,
+        target='.detectors.sensitive:SensitiveDetector',
+        title=TrackingMethod.SENSITIVE_MOTION.value,
+        relative_cost=1.5
+    ),
+    DetectorInfo(
+        name=TrackingMethod.MULTI_SCALE.name,
+        target='.detectors.multiscale:MultiScaleDetector',
+        title=TrackingMethod.MULTI_SCALE.value,
+        needs_color=True, stateful=False, relative_cost=4.0
+    ),
+    DetectorInfo(
+        name=TrackingMethod.THERMAL_SIMULATION.name,
+        target='.detectors.thermal:ThermalDetector',
+        title=TrackingMethod.THERMAL_SIMULATION.value,
+        stateful=False, supports_roi=True, relative_cost=0.8
+    ),
+    DetectorInfo(
+        name=TrackingMethod.MOVEMENT_TRAILS.name,
+        target='.detectors.trails:TrailsDetector',
+        title=TrackingMethod.MOVEMENT_TRAILS.value,
+        relative_cost=1.5
+    ),
+    DetectorInfo(
+        name=TrackingMethod.RUNNING_AVERAGE.name,
+        target='.detectors.running_average:RunningAverageDetector',
+        title=TrackingMethod.RUNNING_AVERAGE.value,
+        relative_cost=0.5
+    ),
+]
+
+
+class DetectorRegistry:
+    """Реестр детекторов
+
+    Встроенные детекторы регистрируются описаниями без импорта модулей.
+    Сторонние детекторы подключаются через entry points группы
+    ``ENTRY_POINT_GROUP``; точка входа должна указывать на DetectorInfo.
+    """
+
+    ENTRY_POINT_GROUP = 'detector_object.detectors'
+
+    def __init__(self):
+        self._infos: Dict[str, DetectorInfo] = {}
+        self._classes: Dict[str, Type] = {}
+        self._plugins_loaded = False
+
+        for info in BUILTIN_DETECTORS:
+            self.register(info)
+
+    def register(self, info: DetectorInfo) -> None:
+        """Регистрация детектора"""
+        if info.name in self._infos:
+            logger.warning(f"Detector '{info.name}' re-registered")
+        self._infos[info.name] = info
+        self._classes.pop(info.name, None)
+
+    def get(self, key: Union[TrackingMethod, str]) -> Optional[DetectorInfo]:
+        """Описание детектора по методу или имени"""
+        name = key.name if isinstance(key, TrackingMethod) else key
+        if name not in self._infos:
+            self._load_plugins()
+        return self._infos.get(name)
+
+    def infos(self) -> List[DetectorInfo]:
+        """Все зарегистрированные детекторы"""
+        self._load_plugins()
+        return list(self._infos.values())
+
+    def load_class(self, info: DetectorInfo) -> Type:
+        """Ленивый импорт класса детектора"""
+        detector_class = self._classes.get(info.name)
+        if detector_class is None:
+            module_name, _, class_name = info.target.partition(':')
+            module = importlib.import_module(module_name, package=__package__)
+            detector_class = getattr(module, class_name)
+            self._classes[info.name] = detector_class
+        return detector_class
+
+    def _load_plugins(self) -> None:
+        """Подключение сторонних детекторов из entry points"""
+        if self._plugins_loaded:
+            return
+        self._plugins_loaded = True
+
+        try:
+            entry_points = metadata.entry_points(group=self.ENTRY_POINT_GROUP)
+        except Exception as e:
+            logger.error(f"Failed to read detector entry points: {e}")
+            return
+
+        for entry_point in entry_points:
+            try:
+                info = entry_point.load()
+                if not isinstance(info, DetectorInfo):
+                    raise TypeError('entry point must reference a DetectorInfo')
+                self.register(info)
+                logger.info(f"Detector plugin registered: {info.name}")
+            except Exception as e:
+                logger.error(f"Failed to load detector plugin {entry_point.name}: {e}")
+
+
+# Глобальный реестр
+detector_registry = DetectorRegistry()
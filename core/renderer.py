@@ -2,143 +2,208 @@
 
 import cv2
 import numpy as np
-from typing import List, Tuple
-from models.detection import DetectionResult
+import time
+from typing import Any, Dict, Optional, Tuple
+from .heatmap import ActivityHeatmap
+from .overlay import ImageSurface, OverlayLayer, Surface
+from .sprites import LabelSpriteCache
+from models.detection import DetectionBatch, CATEGORY_ORDER
 from models.config import GlobalConfig
 from utils.logger import logger
 
 
+def _circle_offsets(radius: int, thickness: int) -> np.ndarray:
+    """Смещения (dx, dy) пикселей круга, нарисованного cv2.circle"""
+    size = 2 * (radius + abs(thickness)) + 1
+    center = size // 2
+    template = np.zeros((size, size), dtype=np.uint8)
+    cv2.circle(template, (center, center), radius, 255, thickness)
+    ys, xs = np.nonzero(template)
+    return np.stack([xs - center, ys - center], axis=1).astype(np.int64)
+
+
 class OverlayRenderer:
-    """Рендерер оверлея"""
+    """Рендерер оверлея
+
+    В режиме разреженного слоя (``display.sparse_overlay``) детекции
+    рисуются в OverlayLayer и накладываются на переданный кадр на месте,
+    без копии кадра. Кадр после рендеринга принадлежит оверлею, поэтому
+    один и тот же кадр не должен рендериться дважды.
+
+    Если задан размер отображения (``set_display_size``), кадр один раз
+    уменьшается до него (INTER_AREA), а детекции рисуются в масштабе
+    отображения: оверлей сразу имеет размер холста.
+    """
 
-    def __init__(self, config: GlobalConfig):
+    # Пиксели маркера центра: круг радиуса 5 и белое кольцо радиуса 7
+    _MARKER_DOT = _circle_offsets(5, -1)
+    _MARKER_RING = _circle_offsets(7, 1)
+
+    def __init__(self, config: GlobalConfig,
+                 heatmap: Optional[ActivityHeatmap] = None):
         self.config = config
-        self._heatmap = None
-        self._heatmap_decay = 0.95
+        self._heatmap = heatmap or ActivityHeatmap(config.heatmap)
+        self._layer = OverlayLayer()
+        self._labels = LabelSpriteCache()
+        self._display_size: Optional[Tuple[int, int]] = None
+        self._source_size: Optional[Tuple[int, int]] = None
+
+    def set_display_size(self, width: int, height: int) -> None:
+        """Размер области отображения (ширина или высота < 2 - без уменьшения)"""
+        self._display_size = (width, height) if width > 1 and height > 1 else None
+
+    @property
+    def source_size(self) -> Optional[Tuple[int, int]]:
+        """Размер (ширина, высота) последнего кадра до уменьшения"""
+        return self._source_size
+
+    def _fit(self, frame: np.ndarray) -> Tuple[np.ndarray, float, float]:
+        """Кадр, уменьшенный под область отображения, и масштабы по осям"""
+        height, width = frame.shape[:2]
+        self._source_size = (width, height)
+        if self._display_size is None:
+            return frame, 1.0, 1.0
+
+        # Вписывание с сохранением пропорций, только уменьшение
+        scale = min(self._display_size[0] / width, self._display_size[1] / height)
+        if scale >= 1.0:
+            return frame, 1.0, 1.0
+
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+        frame = cv2.resize(frame, target, interpolation=cv2.INTER_AREA)
+        return frame, target[0] / width, target[1] / height
 
     def render(self, frame: np.ndarray,
-               detections: List[DetectionResult]) -> np.ndarray:
+               detections: DetectionBatch) -> np.ndarray:
         """Рендеринг оверлея с детекциями"""
         if frame is None:
             return np.zeros((100, 100, 3), dtype=np.uint8)
 
-        overlay = frame.copy()
-
-        # Инициализация тепловой карты
-        if self.config.display.show_heatmap and self._heatmap is None:
-            self._heatmap = np.zeros(frame.shape[:2], dtype=np.float32)
+        display = self.config.display
+        source_shape = frame.shape
+        frame, scale_x, scale_y = self._fit(frame)
+        if display.sparse_overlay:
+            self._layer.begin(frame.shape)
+            surface = self._layer
+            overlay = frame
+        else:
+            overlay = frame.copy()
+            surface = ImageSurface(overlay)
+
+        # Обновление тепловой карты всеми центрами сразу (в координатах кадра)
+        batch = DetectionBatch.from_results(detections)
+        if display.show_heatmap:
+            self._heatmap.update(batch.centers, source_shape, time.time())
 
         # Отрисовка объектов
-        for detection in detections:
-            overlay = self._draw_detection(overlay, detection)
+        self._draw_batch(surface, batch, scale_x, scale_y)
+
+        if display.sparse_overlay:
+            # Тепловая карта под слоем; карта и слой ослабляются так же,
+            # как при смешивании копии с оригиналом
+            opacity = 0.7 if display.show_original else 1.0
+            if display.show_heatmap:
+                self._composite_heatmap(overlay, opacity)
+            return self._layer.composite(overlay, opacity)
 
         # Наложение тепловой карты
-        if self.config.display.show_heatmap:
-            overlay = self._apply_heatmap(overlay)
+        if display.show_heatmap:
+            self._composite_heatmap(overlay)
 
         # Смешивание с оригиналом
-        if self.config.display.show_original:
-            overlay = cv2.addWeighted(frame, 0.3, overlay, 0.7, 0)
-
-        return overlay
-
-    def _draw_detection(self, overlay: np.ndarray,
-                        detection: DetectionResult) -> np.ndarray:
-        """Отрисовка одного детекта"""
-        color = self.config.colors.get(
-            detection.category.value,
-            (0, 255, 0)  # Зеленый по умолчанию
-        )
-
-        # Ограничивающий прямоугольник
-        x, y, w, h = detection.bbox
-        cv2.rectangle(overlay, (x, y), (x + w, y + h), color, 2)
-
-        # Центральный маркер
-        cx, cy = detection.center
-        cv2.circle(overlay, (cx, cy), 5, color, -1)
-        cv2.circle(overlay, (cx, cy), 7, (255, 255, 255), 1)
-
-        # Метка
-        label = f"{detection.category.value} ({detection.confidence:.1f})"
-        if detection.velocity > 0:
-            label += f" {detection.velocity:.1f}px/s"
-
-        self._draw_text_with_background(
-            overlay, label, (cx + 10, cy - 10), color
-        )
-
-        # Контур
-        if detection.contour is not None:
-            cv2.drawContours(overlay, [detection.contour], -1, color, 1)
-
-        # Обновление тепловой карты
-        if self.config.display.show_heatmap:
-            self._update_heatmap(cx, cy, overlay.shape)
+        if display.show_original:
+            overlay = self._blend(frame, overlay, 0.7)
 
         return overlay
 
-    def _draw_text_with_background(self, image: np.ndarray, text: str,
-                                   position: Tuple[int, int],
-                                   text_color: Tuple[int, int, int]) -> None:
-        """Рисование текста с фоном"""
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        scale = 0.5
-        thickness = 2
-
-        text_size = cv2.getTextSize(text, font, scale, thickness)[0]
-        text_width, text_height = text_size
-
-        x, y = position
-
-        # Фон
-        bg_rect = (
-            x - 5, y - text_height - 5,
-            x + text_width + 10, y + 5
-        )
-        cv2.rectangle(image,
-                      (bg_rect[0], bg_rect[1]),
-                      (bg_rect[2], bg_rect[3]),
-                      (0, 0, 0), -1)
-
-        # Текст
-        cv2.putText(image, text, (x, y),
-                    font, scale, text_color, thickness)
-
-    def _update_heatmap(self, x: int, y: int, shape: Tuple[int, int, int]) -> None:
-        """Обновление тепловой карты"""
-        if self._heatmap is None:
-            return
-
-        # Проверяем границы
-        if x < 0 or y < 0 or x >= shape[1] or y >= shape[0]:
+    def _composite_heatmap(self, image: np.ndarray, strength: float = 1.0) -> None:
+        """Наложение тепловой карты на изображение на месте"""
+        self._heatmap.composite(image, strength)
+
+    def _blend(self, frame: np.ndarray, overlay: np.ndarray,
+               opacity: float) -> np.ndarray:
+        """Полупрозрачное наложение оверлея на весь кадр"""
+        return cv2.addWeighted(frame, 1.0 - opacity, overlay, opacity, 0)
+
+    @property
+    def heatmap(self) -> ActivityHeatmap:
+        """Тепловая карта рендерера"""
+        return self._heatmap
+
+    def _draw_batch(self, surface: Surface, batch: DetectionBatch,
+                    scale_x: float = 1.0, scale_y: float = 1.0) -> None:
+        """Пакетная отрисовка: примитивы группами по цвету категории
+
+        Прямоугольники - одним polylines на группу, контуры - одним
+        drawContours, маркеры - штампом пикселей по всем центрам группы.
+        Поверх всего копируются метки из кэша. Координаты кадра переводятся
+        в координаты поверхности масштабами по осям; толщины линий, маркеры
+        и метки остаются в пикселях поверхности.
+        """
+        if not len(batch):
             return
 
-        # Добавление тепла в точку
-        radius = 10
-        y_min = max(0, y - radius)
-        y_max = min(self._heatmap.shape[0], y + radius)
-        x_min = max(0, x - radius)
-        x_max = min(self._heatmap.shape[1], x + radius)
-
-        if y_min < y_max and x_min < x_max:
-            self._heatmap[y_min:y_max, x_min:x_max] += 1.0
-
-        # Затухание
-        self._heatmap *= self._heatmap_decay
-
-    def _apply_heatmap(self, image: np.ndarray) -> np.ndarray:
-        """Применение тепловой карты к изображению"""
-        if self._heatmap is None:
-            return image
-
-        # Нормализация
-        heatmap_norm = cv2.normalize(
-            self._heatmap, None, 0, 255, cv2.NORM_MINMAX
-        ).astype(np.uint8)
-
-        # Цветовая карта
-        heatmap_color = cv2.applyColorMap(heatmap_norm, cv2.COLORMAP_JET)
+        scale = np.array([scale_x, scale_y])
+        boxes = batch.bboxes
+        x, y, w, h = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+        corners = np.stack([
+            np.stack([x, y], axis=1), np.stack([x + w, y], axis=1),
+            np.stack([x + w, y + h], axis=1), np.stack([x, y + h], axis=1)
+        ], axis=1)
+        centers = batch.centers
+        if scale_x != 1.0 or scale_y != 1.0:
+            corners = np.round(corners * scale)
+            centers = np.round(centers * scale)
+        corners = corners.astype(np.int32)
+        centers = centers.astype(np.int64)
+
+        colors = []
+        for code in np.unique(batch.category_codes).tolist():
+            category = CATEGORY_ORDER[code]
+            color = self.config.colors.get(category.value, (0, 255, 0))  # Зеленый по умолчанию
+            group = np.flatnonzero(batch.category_codes == code)
+            colors.append((group, color))
+
+            # Ограничивающие прямоугольники
+            surface.polylines(corners[group], color, 2)
+
+            # Контуры
+            contours = [batch.get_contour(i) for i in group.tolist()]
+            contours = [contour for contour in contours if contour is not None]
+            if contours and (scale_x != 1.0 or scale_y != 1.0):
+                contours = [np.round(contour * scale).astype(np.int32)
+                            for contour in contours]
+            if contours:
+                surface.contours(contours, color, 1)
+
+            # Центральные маркеры
+            surface.stamp(self._MARKER_DOT, centers[group], color)
+        surface.stamp(self._MARKER_RING, centers, (255, 255, 255))
+
+        # Метки из кэша; метки движущихся объектов со скоростью в исходной
+        # точности повторяются реже и чаще отрисовываются заново
+        confidences = batch.confidences.tolist()
+        velocities = batch.velocities.tolist()
+        moving = (batch.velocities > 0).tolist()
+        label_x = (centers[:, 0] + 10).tolist()
+        label_y = (centers[:, 1] - 10).tolist()
+        for group, color in colors:
+            category = CATEGORY_ORDER[batch.category_codes[group[0]]].value
+            for i in group.tolist():
+                label = f"{category} ({confidences[i]:.1f})"
+                if moving[i]:
+                    label += f" {velocities[i]:.1f}px/s"
+                self._draw_label(surface, label, (label_x[i], label_y[i]), color)
+
+    def _draw_label(self, surface: Surface, text: str,
+                    position: Tuple[int, int],
+                    text_color: Tuple[int, int, int]) -> None:
+        """Метка с фоном из кэша растровых меток"""
+        sprite = self._labels.get(text, text_color)
+        x, y = position
+        surface.blit(sprite.image, sprite.alpha,
+                     (x + sprite.offset[0], y + sprite.offset[1]))
 
-        # Наложение
-        return cv2.addWeighted(image, 0.7, heatmap_color, 0.3, 0)
\ No newline at end of file
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика кэша меток"""
+        return self._labels.get_stats()
@@ -0,0 +1,270 @@
+"""Асинхронный рендеринг оверлея и бэкенд OpenCL (T-API)"""
+
+import cv2
+import numpy as np
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from .heatmap import ActivityHeatmap
+from .renderer import OverlayRenderer
+from models.config import GlobalConfig
+from models.detection import DetectionBatch
+from models.enums import RenderBackend
+from utils.gpu_check import gpu_manager
+from utils.logger import logger
+
+
+class UMatOverlayRenderer(OverlayRenderer):
+    """Рендерер с полнокадровыми стадиями на OpenCL через cv2.UMat
+
+    Рисование детекций остается на CPU (оно разреженное), на устройство
+    переносятся увеличение и наложение тепловой карты и смешивание
+    с оригиналом. При первой ошибке OpenCL рендерер переходит на CPU.
+    """
+
+    def __init__(self, config: GlobalConfig,
+                 heatmap: Optional[ActivityHeatmap] = None):
+        super().__init__(config, heatmap)
+        self._use_umat = True
+
+    def _composite_heatmap(self, image: np.ndarray, strength: float = 1.0) -> None:
+        if not self._use_umat:
+            return super()._composite_heatmap(image, strength)
+
+        colored = self._heatmap.colorize()
+        if colored is None:
+            return
+
+        try:
+            height, width = image.shape[:2]
+            opacity = self.config.heatmap.opacity * strength
+            colored = cv2.resize(cv2.UMat(colored), (width, height),
+                                 interpolation=cv2.INTER_LINEAR)
+            blended = cv2.addWeighted(cv2.UMat(image), 1.0 - opacity,
+                                      colored, opacity, 0)
+            image[...] = blended.get()
+        except cv2.error as e:
+            self._fallback(e)
+            super()._composite_heatmap(image, strength)
+
+    def _blend(self, frame: np.ndarray, overlay: np.ndarray,
+               opacity: float) -> np.ndarray:
+        if not self._use_umat:
+            return super()._blend(frame, overlay, opacity)
+
+        try:
+            return cv2.addWeighted(cv2.UMat(frame), 1.0 - opacity,
+                                   cv2.UMat(overlay), opacity, 0).get()
+        except cv2.error as e:
+            self._fallback(e)
+            return super()._blend(frame, overlay, opacity)
+
+    def _fallback(self, error: Exception) -> None:
+        """Переход на CPU после ошибки OpenCL"""
+        logger.warning(f"OpenCL rendering failed, falling back to CPU: {error}")
+        self._use_umat = False
+
+
+class RendererFactory:
+    """Фабрика рендереров по бэкенду"""
+
+    @staticmethod
+    def create(config: GlobalConfig,
+               heatmap: Optional[ActivityHeatmap] = None) -> OverlayRenderer:
+        """Рендерер для бэкенда конфигурации (недоступный бэкенд - CPU)"""
+        backend = config.render.backend or gpu_manager.get_optimal_backend()
+        if backend == RenderBackend.OPENCL:
+            if RenderBackend.OPENCL in gpu_manager.get_capabilities().backends:
+                return UMatOverlayRenderer(config, heatmap)
+            logger.warning("OpenCL backend unavailable, using CPU renderer")
+        return OverlayRenderer(config, heatmap)
+
+
+@dataclass
+class RenderResult:
+    """Результат рендеринга кадра"""
+    task_id: int
+    overlay: np.ndarray
+    render_time: float  # Секунды
+    submit_time: float
+
+
+class AsyncRenderer:
+    """Пул потоков рендеринга с очередью задач
+
+    ``submit`` ставит кадр в очередь и возвращает ID задачи (-1, если
+    очередь заполнена или рендерер остановлен). У каждого потока свой
+    рендерер (слой оверлея и кэш меток), тепловая карта общая.
+    ``get_result`` возвращает самый свежий готовый кадр; результаты,
+    устаревшие относительно уже выданного, отбрасываются.
+    """
+
+    def __init__(self, config: GlobalConfig):
+        self.config = config
+        self._renderer = RendererFactory.create(config)
+        self._generation = 0
+
+        self._tasks: queue.Queue = queue.Queue(maxsize=config.render.queue_size)
+        self._results: queue.Queue = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._running = False
+        self._next_id = 0
+        self._last_delivered = -1
+        self._lock = threading.Lock()
+        self._display_size = (0, 0)
+        self._source_size: Optional[Tuple[int, int]] = None
+
+        # Статистика
+        self._dropped = 0
+        self._stale = 0
+        self._render_time = 0.0
+        self._latency = 0.0
+
+    @property
+    def renderer(self) -> OverlayRenderer:
+        """Рендерер первого потока; остальные создаются по его конфигурации"""
+        return self._renderer
+
+    @renderer.setter
+    def renderer(self, renderer: OverlayRenderer) -> None:
+        with self._lock:
+            self._renderer = renderer
+            self._generation += 1
+
+    @property
+    def heatmap(self) -> ActivityHeatmap:
+        """Тепловая карта, общая для всех потоков"""
+        return self._renderer.heatmap
+
+    def set_display_size(self, width: int, height: int) -> None:
+        """Размер области отображения для всех потоков"""
+        self._display_size = (width, height)
+
+    @property
+    def source_size(self) -> Optional[Tuple[int, int]]:
+        """Размер (ширина, высота) последнего кадра до уменьшения"""
+        return self._source_size
+
+    def start(self) -> None:
+        """Запуск потоков рендеринга"""
+        if self._running:
+            return
+
+        self._running = True
+        self._workers = [
+            threading.Thread(target=self._worker_loop, args=(index,),
+                             daemon=True, name=f"RenderWorker-{index}")
+            for index in range(self.config.render.workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        logger.info(f"Async renderer started: {len(self._workers)} workers, "
+                    f"{type(self._renderer).__name__}")
+
+    def stop(self) -> None:
+        """Остановка потоков; задачи в очереди отбрасываются"""
+        if not self._running:
+            return
+
+        self._running = False
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=2)
+        self._workers = []
+
+    def submit(self, frame: np.ndarray, detections: DetectionBatch) -> int:
+        """Постановка кадра в очередь рендеринга"""
+        if not self._running:
+            return -1
+
+        with self._lock:
+            task_id = self._next_id
+            self._next_id += 1
+
+        try:
+            self._tasks.put_nowait((task_id, frame, detections, time.perf_counter()))
+        except queue.Full:
+            self._dropped += 1
+            return -1
+
+        return task_id
+
+    def get_result(self, timeout: Optional[float] = None) -> Optional[RenderResult]:
+        """Самый свежий готовый кадр (None - нет нового за timeout)"""
+        latest = None
+        try:
+            latest = self._results.get(timeout=timeout)
+            while True:
+                candidate = self._results.get_nowait()
+                if candidate.task_id > latest.task_id:
+                    self._stale += 1
+                    latest = candidate
+        except queue.Empty:
+            pass
+
+        if latest is None or latest.task_id <= self._last_delivered:
+            if latest is not None:
+                self._stale += 1
+            return None
+
+        self._last_delivered = latest.task_id
+        self._latency = self._latency * 0.9 + (time.perf_counter() - latest.submit_time) * 0.1
+        return latest
+
+    def _worker_loop(self, index: int) -> None:
+        """Цикл потока рендеринга"""
+        generation = -1
+        renderer = None
+
+        while True:
+            task = self._tasks.get()
+            if task is None or not self._running:
+                break
+
+            # Рендерер потока пересоздается после замены основного
+            if generation != self._generation:
+                with self._lock:
+                    generation = self._generation
+                    renderer = (self._renderer if index == 0 else
+                                RendererFactory.create(self._renderer.config,
+                                                       self._renderer.heatmap))
+
+            task_id, frame, detections, submit_time = task
+            start = time.perf_counter()
+            try:
+                renderer.set_display_size(*self._display_size)
+                overlay = renderer.render(frame, detections)
+            except Exception as e:
+                logger.error(f"Render error: {e}")
+                continue
+            self._source_size = renderer.source_size
+
+            render_time = time.perf_counter() - start
+            self._render_time = self._render_time * 0.9 + render_time * 0.1
+            self._results.put(RenderResult(task_id, overlay, render_time, submit_time))
+
+    @property
+    def render_time(self) -> float:
+        """Сглаженное время рендеринга кадра (секунды)"""
+        return self._render_time
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика очереди и времени рендеринга"""
+        stats = self._renderer.get_stats()
+        stats.update({
+            'render_ms': self._render_time * 1000,
+            'render_latency_ms': self._latency * 1000,
+            'render_queue': self._tasks.qsize(),
+            'render_dropped': self._dropped,
+            'render_stale': self._stale
+        })
+        return stats
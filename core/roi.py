@@ -0,0 +1,141 @@
+"""Детекция в окнах вокруг предсказанных положений треков"""
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from models.config import RoiConfig
+from models.detection import DetectionBatch
+from utils.rects import Rect, merge_overlapping
+
+
+class RoiPlanner:
+    """Выбор между детекцией по всему кадру и по окнам поиска
+
+    Полный кадр обрабатывается каждые ``full_frame_interval`` кадров,
+    а также когда треков нет или окна покрывают слишком большую часть
+    кадра. Между полными кадрами детектор видит только окна вокруг
+    положения каждого трека, предсказанного по постоянной скорости.
+    Окно растет с числом кадров без подтверждения трека; трек,
+    пропавший в окнах, сохраняется для планирования до ``max_missed``
+    кадров. Новые объекты вне окон находятся на следующем полном кадре.
+    """
+
+    def __init__(self, config: RoiConfig):
+        self.config = config
+        # ID трека -> [cx, cy, vx, vy, w, h, пропущенные кадры]
+        self._tracks: Dict[int, np.ndarray] = {}
+        self._since_full = 0
+        self._full = True
+
+        # Статистика
+        self._frames = 0
+        self._full_frames = 0
+        self._coverage = 1.0
+
+    def plan(self, region: Rect) -> Optional[List[Rect]]:
+        """Окна поиска в координатах кадра (None - детекция по всему кадру)"""
+        cfg = self.config
+        self._frames += 1
+        self._full = (not self._tracks or
+                      self._since_full + 1 >= cfg.full_frame_interval)
+
+        windows = None
+        if not self._full:
+            windows = self._windows(region)
+            area = (region[2] - region[0]) * (region[3] - region[1])
+            covered = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in windows)
+            self._coverage = covered / area if area else 1.0
+            self._full = not windows or self._coverage > cfg.max_coverage
+
+        if self._full:
+            self._since_full = 0
+            self._full_frames += 1
+            self._coverage = 1.0
+            return None
+
+        self._since_full += 1
+        return windows
+
+    def observe(self, batch: DetectionBatch) -> None:
+        """Обновление треков по результатам кадра с присвоенными ID"""
+        tracks = {}
+        for track_id, center, bbox in zip(batch.track_ids.tolist(),
+                                          batch.centers, batch.bboxes):
+            state = self._tracks.get(track_id)
+            cx, cy = float(center[0]), float(center[1])
+            if state is None:
+                vx = vy = 0.0
+            else:
+                # Смещение за кадр с учетом кадров без подтверждения
+                frames = state[6] + 1
+                vx = (cx - (state[0] - state[2] * state[6])) / frames
+                vy = (cy - (state[1] - state[3] * state[6])) / frames
+            tracks[track_id] = np.array([cx, cy, vx, vy, bbox[2], bbox[3], 0],
+                                        dtype=np.float32)
+
+        # На кадре с окнами не найденные треки продолжаются по прогнозу;
+        # полный кадр отменяет все, что не найдено
+        if not self._full:
+            for track_id, state in self._tracks.items():
+                if track_id in tracks or state[6] >= self.config.max_missed:
+                    continue
+                state = state.copy()
+                state[0] += state[2]
+                state[1] += state[3]
+                state[6] += 1
+                tracks[track_id] = state
+
+        self._tracks = tracks
+
+    def _windows(self, region: Rect) -> List[Rect]:
+        """Окна вокруг прогнозов, объединенные при перекрытии"""
+        cfg = self.config
+        rx1, ry1, rx2, ry2 = region
+        windows = []
+        for cx, cy, vx, vy, w, h, missed in self._tracks.values():
+            # Прогноз на текущий кадр и неопределенность, растущая
+            # с числом кадров без подтверждения
+            steps = missed + 1
+            px = cx + vx * steps
+            py = cy + vy * steps
+            pad = cfg.margin + cfg.margin_growth * max(w, h) * steps
+            half_w = w / 2 + pad + abs(vx) * steps
+            half_h = h / 2 + pad + abs(vy) * steps
+            window = (max(rx1, int(px - half_w)), max(ry1, int(py - half_h)),
+                      min(rx2, int(np.ceil(px + half_w))),
+                      min(ry2, int(np.ceil(py + half_h))))
+            if window[2] > window[0] and window[3] > window[1]:
+                windows.append(window)
+        return merge_overlapping(windows)
+
+    def coasted(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Треки, не найденные на прошлом кадре: ID, прогноз центра на
+        текущий кадр и размер (w, h)"""
+        coasted = [(track_id, state) for track_id, state in self._tracks.items()
+                   if state[6] > 0]
+        if not coasted:
+            return (np.empty(0, dtype=np.int64), np.empty((0, 2), dtype=np.float32),
+                    np.empty((0, 2), dtype=np.float32))
+
+        ids = np.array([track_id for track_id, _ in coasted], dtype=np.int64)
+        states = np.array([state for _, state in coasted])
+        return ids, states[:, 0:2] + states[:, 2:4], states[:, 4:6]
+
+    @property
+    def full_frame(self) -> bool:
+        """Текущий кадр обрабатывается целиком"""
+        return self._full
+
+    def reset(self) -> None:
+        """Следующий кадр обрабатывается целиком"""
+        self._tracks = {}
+        self._since_full = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Доля полных кадров и доля площади, обработанной в окнах"""
+        if self._frames == 0:
+            return {}
+        return {
+            'roi_full_pct': self._full_frames / self._frames * 100,
+            'roi_coverage_pct': self._coverage * 100,
+            'roi_tracks': len(self._tracks)
+        }
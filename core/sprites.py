@@ -0,0 +1,96 @@
+"""Кэш растровых меток оверлея"""
+
+import cv2
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+Color = Tuple[int, int, int]
+
+
+class LabelSprite:
+    """Готовая метка: цветной патч, маска непрозрачности и смещение
+    левого верхнего угла относительно точки привязки текста"""
+
+    __slots__ = ('image', 'alpha', 'offset', 'nbytes')
+
+    def __init__(self, image: np.ndarray, alpha: np.ndarray, offset: Tuple[int, int]):
+        self.image = image
+        self.alpha = alpha
+        self.offset = offset
+        self.nbytes = image.nbytes + alpha.nbytes
+
+
+class LabelSpriteCache:
+    """LRU-кэш меток (текст на черном фоне) по тексту, цвету и масштабу
+
+    Метки в основном повторяются (категория и квантованная уверенность),
+    поэтому getTextSize и putText выполняются только при промахе, а на
+    кадр метка копируется срезами. Размер кэша ограничен ``max_bytes``.
+    """
+
+    FONT = cv2.FONT_HERSHEY_SIMPLEX
+    THICKNESS = 2
+    PADDING = 5
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._sprites: 'OrderedDict[Tuple[str, Color, float], LabelSprite]' = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, text: str, color: Color, scale: float = 0.5) -> LabelSprite:
+        """Метка из кэша или новая"""
+        key = (text, tuple(color), scale)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self._hits += 1
+            return sprite
+
+        self._misses += 1
+        sprite = self._render(text, key[1], scale)
+        self._sprites[key] = sprite
+        self._bytes += sprite.nbytes
+        while self._bytes > self.max_bytes and len(self._sprites) > 1:
+            _, evicted = self._sprites.popitem(last=False)
+            self._bytes -= evicted.nbytes
+        return sprite
+
+    def _render(self, text: str, color: Color, scale: float) -> LabelSprite:
+        """Отрисовка метки так же, как текст с фоном прямо на кадре"""
+        pad = self.PADDING
+        thickness = self.THICKNESS
+        (text_width, text_height), baseline = cv2.getTextSize(
+            text, self.FONT, scale, thickness
+        )
+
+        # Фон от (x - 5, y - h - 5) до (x + w + 10, y + 5) включительно;
+        # нижние выносные элементы текста могут выходить за фон
+        below = max(pad, baseline + thickness)
+        height = text_height + pad + below + 1
+        width = text_width + 3 * pad + 1
+        origin = (pad, text_height + pad)
+
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        alpha = np.zeros((height, width), dtype=np.uint8)
+        alpha[:text_height + 2 * pad + 1] = 255
+        cv2.putText(image, text, origin, self.FONT, scale, color, thickness)
+        cv2.putText(alpha, text, origin, self.FONT, scale, 255, thickness)
+
+        return LabelSprite(image, alpha, (-origin[0], -origin[1]))
+
+    def clear(self) -> None:
+        """Очистка кэша"""
+        self._sprites.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Доля попаданий и занятая память"""
+        requests = self._hits + self._misses
+        return {
+            'label_hit_pct': self._hits / requests * 100 if requests else 0.0,
+            'label_sprites': len(self._sprites),
+            'label_cache_kb': self._bytes / 1024
+        }
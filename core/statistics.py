@@ -1,9 +1,10 @@
 """Сбор и расчет статистики"""
 
 import time
+import numpy as np
 from typing import List, Dict
 from collections import deque, defaultdict
-from models.detection import DetectionResult
+from models.detection import DetectionBatch, CATEGORY_ORDER
 
 
 class TrackingStatistics:
@@ -17,16 +18,17 @@ class TrackingStatistics:
         self._last_update_time = time.time()
         self._detections_per_second = 0
 
-    def update(self, detections: List[DetectionResult], fps: float) -> Dict:
+    def update(self, detections: DetectionBatch, fps: float) -> Dict:
         """Обновление статистики"""
         current_time = time.time()
         time_diff = current_time - self._last_update_time
 
         self.total_detections += len(detections)
 
-        # Обновление счетчиков категорий
-        for detection in detections:
-            self.category_counts[detection.category] += 1
+        # Обновление счетчиков категорий по столбцу кодов
+        counts = DetectionBatch.from_results(detections).category_counts()
+        for code in np.flatnonzero(counts):
+            self.category_counts[CATEGORY_ORDER[code]] += int(counts[code])
 
         # Расчет детекций в секунду
         if time_diff >= 1.0:
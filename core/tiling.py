@@ -0,0 +1,244 @@
+"""Параллельная обработка кадра по перекрывающимся тайлам"""
+
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from .detectors.components import ComponentSet
+from models.config import TilingConfig
+
+# (x1, y1, x2, y2)
+Rect = Tuple[int, int, int, int]
+# Метки центральной части тайла, прямоугольники, площади и центроиды
+# ее компонент
+TilePart = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class TileExecutor:
+    """Выполнение stateless-стадий по тайлам в пуле потоков
+
+    Кадр делится на тайлы с перекрытием; для каждого тайла стадия строит
+    бинарную маску, после чего в том же потоке выделяются компоненты.
+    OpenCV отпускает GIL, поэтому тайлы обрабатываются параллельно.
+    Центральные части масок тайлов сшиваются в общую маску кадра;
+    компоненты выделяются в центральных частях, а фрагменты, пиксели
+    которых соседствуют через шов, объединяются.
+    """
+
+    _MAX_LAYOUTS = 8
+
+    def __init__(self, config: TilingConfig):
+        self.tile_size = config.tile_size
+        self.overlap = config.overlap
+        self._pool = ThreadPoolExecutor(
+            max_workers=config.workers, thread_name_prefix='TileWorker'
+        )
+        self._layouts: Dict[Tuple[int, int], List[Tuple[Rect, Rect]]] = {}
+
+    def layout(self, shape: Tuple[int, int]) -> List[Tuple[Rect, Rect]]:
+        """Разбиение кадра на пары (центральная часть, расширенный тайл)"""
+        shape = tuple(shape[:2])
+        if shape not in self._layouts:
+            if len(self._layouts) >= self._MAX_LAYOUTS:
+                # Размер меняется от кадра к кадру (окна поиска)
+                self._layouts.clear()
+            height, width = shape
+            tiles = []
+            for y in range(0, height, self.tile_size):
+                for x in range(0, width, self.tile_size):
+                    core = (x, y, min(x + self.tile_size, width),
+                            min(y + self.tile_size, height))
+                    extended = (max(0, core[0] - self.overlap),
+                                max(0, core[1] - self.overlap),
+                                min(width, core[2] + self.overlap),
+                                min(height, core[3] + self.overlap))
+                    tiles.append((core, extended))
+            self._layouts[shape] = tiles
+        return self._layouts[shape]
+
+    def run(self, image: np.ndarray,
+            stage: Callable[[np.ndarray], np.ndarray],
+            allowed: Optional[np.ndarray] = None) -> ComponentSet:
+        """Построение маски и компонент по тайлам
+
+        ``allowed`` - необязательная маска разрешенных пикселей кадра,
+        накладываемая на маску каждого тайла до выделения компонент.
+        """
+        tiles = self.layout(image.shape)
+        if len(tiles) == 1:
+            mask = stage(image)
+            if allowed is not None:
+                cv2.bitwise_and(mask, allowed, dst=mask)
+            return ComponentSet.from_mask(mask)
+
+        # Маска и метки выделяются на кадр: ленивые контуры ссылаются на них
+        mask = np.empty(image.shape[:2], dtype=np.uint8)
+        labels = np.empty(image.shape[:2], dtype=np.int32)
+
+        futures = [
+            self._pool.submit(self._process_tile, image, mask, stage, allowed,
+                              core, extended)
+            for core, extended in tiles
+        ]
+        parts = [future.result() for future in futures]
+        return self._stitch(parts, tiles, mask, labels)
+
+    @staticmethod
+    def _process_tile(image: np.ndarray, mask: np.ndarray,
+                      stage: Callable[[np.ndarray], np.ndarray],
+                      allowed: Optional[np.ndarray],
+                      core: Rect, extended: Rect) -> TilePart:
+        """Обработка одного тайла: маска, запись в общую маску, компоненты
+
+        Компоненты выделяются только в центральной части тайла, поэтому
+        фрагменты разных тайлов не пересекаются.
+        """
+        ex1, ey1, ex2, ey2 = extended
+        tile_mask = stage(image[ey1:ey2, ex1:ex2])
+        if allowed is not None:
+            cv2.bitwise_and(tile_mask, allowed[ey1:ey2, ex1:ex2], dst=tile_mask)
+
+        # Центральные части тайлов не пересекаются - запись без блокировок
+        cx1, cy1, cx2, cy2 = core
+        core_mask = tile_mask[cy1 - ey1:cy2 - ey1, cx1 - ex1:cx2 - ex1]
+        mask[cy1:cy2, cx1:cx2] = core_mask
+
+        components = ComponentSet.from_mask(core_mask)
+        boxes = components.boxes.copy()
+        boxes[:, 0] += cx1
+        boxes[:, 1] += cy1
+        centroids = components.centroids + (cx1, cy1)
+        return components.labels, boxes, components.areas.copy(), centroids
+
+    def _stitch(self, parts: List[TilePart], tiles: List[Tuple[Rect, Rect]],
+                mask: np.ndarray, labels: np.ndarray) -> ComponentSet:
+        """Сшивка фрагментов, соприкасающихся через швы тайлов
+
+        Метки фрагментов каждого тайла переводятся в номера объединенных
+        компонент и записываются в общий буфер меток кадра, поэтому маска
+        и контур компоненты строятся только по ее собственным пикселям.
+        """
+        boxes = np.concatenate([p[1] for p in parts]).astype(np.int64)
+        areas = np.concatenate([p[2] for p in parts]).astype(np.int64)
+        centroids = np.concatenate([p[3] for p in parts])
+
+        # Номер первого фрагмента каждого тайла в общем списке
+        offsets = np.cumsum([0] + [len(p[1]) for p in parts[:-1]])
+        pairs = self._seam_pairs(parts, tiles, offsets, mask.shape)
+        group = self._fragment_groups(len(boxes), pairs)
+        count = int(group.max()) + 1 if len(group) else 0
+
+        # Номер компоненты (с 1) для каждой метки: 0 - фон
+        lut = np.concatenate(([0], group + 1)).astype(np.int32)
+        futures = [
+            self._pool.submit(self._write_labels, part[0],
+                              lut[offset:offset + len(part[1]) + 1], core, labels)
+            for part, (core, _), offset in zip(parts, tiles, offsets)
+        ]
+        for future in futures:
+            future.result()
+        if count == 0:
+            return ComponentSet.empty()
+
+        x1 = np.full(count, np.iinfo(np.int64).max)
+        y1 = np.full(count, np.iinfo(np.int64).max)
+        x2 = np.zeros(count, dtype=np.int64)
+        y2 = np.zeros(count, dtype=np.int64)
+        np.minimum.at(x1, group, boxes[:, 0])
+        np.minimum.at(y1, group, boxes[:, 1])
+        np.maximum.at(x2, group, boxes[:, 0] + boxes[:, 2])
+        np.maximum.at(y2, group, boxes[:, 1] + boxes[:, 3])
+
+        # Площадь - сумма площадей фрагментов, центроид - взвешенный по ним
+        merged_areas = np.bincount(group, weights=areas, minlength=count)
+        merged_centroids = np.stack([
+            np.bincount(group, weights=centroids[:, axis] * areas, minlength=count)
+            for axis in (0, 1)
+        ], axis=1) / merged_areas[:, None]
+
+        return ComponentSet(
+            labels=labels,
+            ids=np.arange(1, count + 1, dtype=np.int32),
+            boxes=np.stack((x1, y1, x2 - x1, y2 - y1), axis=1).astype(np.int32),
+            areas=merged_areas.astype(np.int32),
+            centroids=merged_centroids,
+            mask=mask
+        )
+
+    @staticmethod
+    def _write_labels(local: np.ndarray, lut: np.ndarray, core: Rect,
+                      labels: np.ndarray) -> None:
+        """Запись меток центральной части тайла в номерах компонент кадра
+
+        ``lut[0]`` соответствует фону: срез таблицы начинается на одну
+        позицию раньше первого фрагмента тайла.
+        """
+        cx1, cy1, cx2, cy2 = core
+        tile_lut = lut.copy()
+        tile_lut[0] = 0
+        labels[cy1:cy2, cx1:cx2] = tile_lut[local]
+
+    @staticmethod
+    def _seam_pairs(parts: List[TilePart], tiles: List[Tuple[Rect, Rect]],
+                    offsets: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+        """Пары фрагментов, чьи пиксели соседствуют через шов (8-связность)
+
+        Для каждого шва берутся столбцы (строки) меток по обе стороны на всю
+        высоту (ширину) кадра, поэтому учитываются и диагональные соседи
+        в углах тайлов. Номера фрагментов - индексы в общем списке.
+        """
+        def line(axis: int, position: int) -> np.ndarray:
+            """Общие номера фрагментов (-1 - фон) в столбце или строке кадра"""
+            ids = np.full(shape[axis], -1, dtype=np.int64)
+            for (labels, *_), (core, _), offset in zip(parts, tiles, offsets):
+                start, end = core[axis], core[axis + 2]
+                if not start <= position < end:
+                    continue
+                local = (labels[:, position - start] if axis == 0
+                         else labels[position - start])
+                span = slice(core[1 - axis], core[3 - axis])
+                ids[span] = np.where(local > 0, local - 1 + offset, -1)
+            return ids
+
+        pairs = []
+        for axis in (0, 1):
+            seams = sorted({core[axis] for core, _ in tiles if core[axis] > 0})
+            for position in seams:
+                before, after = line(axis, position - 1), line(axis, position)
+                for shift in (-1, 0, 1):
+                    a = before[max(0, -shift):len(before) - max(0, shift)]
+                    b = after[max(0, shift):len(after) - max(0, -shift)]
+                    touching = (a >= 0) & (b >= 0)
+                    pairs.append(np.stack((a[touching], b[touching]), axis=1))
+
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.unique(np.concatenate(pairs), axis=0)
+
+    @staticmethod
+    def _fragment_groups(count: int, pairs: np.ndarray) -> np.ndarray:
+        """Номер компоненты каждого фрагмента (union-find по парам)
+
+        Компоненты нумеруются по первому входящему в них фрагменту.
+        """
+        parent = np.arange(count)
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in pairs.tolist():
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        if not len(pairs):
+            return parent
+        roots = np.array([find(i) for i in range(count)], dtype=np.int64)
+        return np.unique(roots, return_inverse=True)[1].ravel()
+
+    def shutdown(self) -> None:
+        """Остановка пула потоков (незавершенные тайлы дорабатывают)"""
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,314 @@
+"""Офлайн подбор параметров детекторов по записанным роликам
+
+Ролик - видеофайл и файл разметки с тем же именем и расширением .json:
+``{"frames": {"12": [[x, y, w, h], ...], ...}}``. Оцениваются только
+размеченные кадры, остальные лишь прогоняются через детектор (фон и
+буферы кадров прогреваются как при живом захвате).
+
+Запуск:
+    python -m core.tuning --method CONTOUR_DETECTION --clips clips/*.mp4 \
+        --budget-ms 15 --search halving --output presets/contour.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from .factory import DetectorFactory
+from .presets import get_param, save_preset, set_param
+from models.config import GlobalConfig
+from models.enums import TrackingMethod
+from utils.logger import logger
+from utils.metrics import Box, f1_score, match_counts
+
+
+@dataclass(frozen=True)
+class ParamSpec:
+    """Диапазон одного параметра (путь вида 'contour.threshold')"""
+    path: str
+    low: float = 0.0
+    high: float = 1.0
+    log: bool = False  # Равномерно по логарифму (скорости обучения)
+    choices: Tuple[Any, ...] = ()
+
+    def sample(self, rng: random.Random) -> Any:
+        if self.choices:
+            return rng.choice(self.choices)
+        if self.log:
+            return float(np.exp(rng.uniform(np.log(self.low), np.log(self.high))))
+        return rng.uniform(self.low, self.high)
+
+
+SEARCH_SPACES: Dict[str, List[ParamSpec]] = {
+    TrackingMethod.CONTOUR_DETECTION.name: [
+        ParamSpec('contour.sensitivity', 0.5, 2.0),
+        ParamSpec('contour.threshold', 10, 60),
+        ParamSpec('contour.blur_size', choices=(0, 3, 5, 7)),
+        ParamSpec('contour.min_area', 10, 200),
+        ParamSpec('contour.solidity_threshold', 0.2, 0.9),
+    ],
+    TrackingMethod.MOTION_DETECTION.name: [
+        ParamSpec('motion.sensitivity', 0.5, 2.0),
+        ParamSpec('motion.min_pixel_change', 2, 30),
+    ],
+    TrackingMethod.ADAPTIVE_BACKGROUND.name: [
+        ParamSpec('adaptive.sensitivity', 0.5, 2.0),
+        ParamSpec('adaptive.learning_rate', 0.0002, 0.02, log=True),
+        ParamSpec('adaptive.var_threshold', 8.0, 64.0, log=True),
+        ParamSpec('adaptive.detect_shadows', choices=(True, False)),
+        ParamSpec('adaptive.processing_scale', choices=(0.25, 0.5, 1.0)),
+    ],
+    TrackingMethod.SENSITIVE_MOTION.name: [
+        ParamSpec('sensitive.sensitivity', 0.5, 2.0),
+        ParamSpec('sensitive.min_pixel_change', 1, 15),
+        ParamSpec('sensitive.accumulation_threshold', choices=(1, 2, 3)),
+        ParamSpec('sensitive.enhancement_factor', 1.0, 4.0),
+    ],
+    TrackingMethod.RUNNING_AVERAGE.name: [
+        ParamSpec('running_average.sensitivity', 0.5, 2.0),
+        ParamSpec('running_average.learning_shift', choices=(3, 4, 5, 6)),
+        ParamSpec('running_average.threshold', 8, 60),
+        ParamSpec('running_average.min_area', 10, 200),
+        ParamSpec('running_average.morphology', choices=(True, False)),
+    ],
+}
+
+
+# Разметка роликов, уже прочитанная в процессе-исполнителе. Кадры не
+# кэшируются: каждый исполнитель держал бы в памяти все ролики целиком
+_truth_cache: Dict[str, Dict[int, List[Box]]] = {}
+
+
+def load_truth(path: str) -> Dict[int, List[Box]]:
+    """Разметка ролика по номерам кадров"""
+    cached = _truth_cache.get(path)
+    if cached is not None:
+        return cached
+
+    with open(os.path.splitext(path)[0] + '.json', 'r', encoding='utf-8') as f:
+        annotations = json.load(f)
+    truth = {
+        int(index): [tuple(int(v) for v in box) for box in boxes]
+        for index, boxes in annotations.get('frames', {}).items()
+    }
+    _truth_cache[path] = truth
+    return truth
+
+
+def iter_frames(path: str, count: int) -> Iterator[np.ndarray]:
+    """Последовательное декодирование первых count кадров ролика"""
+    video = cv2.VideoCapture(path)
+    try:
+        for _ in range(count):
+            ok, frame = video.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        video.release()
+
+
+def evaluate(method: str, params: Dict[str, Any], clip_paths: Sequence[str],
+             max_frames: Optional[int] = None) -> Dict[str, float]:
+    """Прогон роликов через детектор с параметрами; выполняется в процессе-исполнителе"""
+    cv2.setNumThreads(1)  # Параллелизм обеспечивают процессы
+
+    tp = fp = fn = 0
+    total_time = 0.0
+    scored = 0
+    for path in clip_paths:
+        # Кадры после последнего размеченного не оцениваются
+        truth = load_truth(path)
+        count = max(truth) + 1 if truth else 0
+        if max_frames is not None:
+            count = min(count, max_frames)
+
+        # Свой детектор на ролик: состояние фона не переносится между записями
+        config = make_config(method, params)
+        detector = DetectorFactory.create(method, config)
+
+        decoded = 0
+        for index, frame in enumerate(iter_frames(path, count)):
+            decoded += 1
+            start = time.perf_counter()
+            batch = detector.process(frame)
+            elapsed = time.perf_counter() - start
+
+            boxes = truth.get(index)
+            if boxes is None:
+                continue
+
+            predicted = [tuple(int(v) for v in box) for box in batch.bboxes]
+            t, p, f = match_counts(predicted, boxes)
+            tp += t
+            fp += p
+            fn += f
+            total_time += elapsed
+            scored += 1
+
+        detector.close()
+        if decoded < count:
+            logger.warning(f"{path}: annotations beyond the last frame ({decoded})")
+
+    precision, recall, f1 = f1_score(tp, fp, fn)
+    return {
+        'f1': f1,
+        'precision': precision,
+        'recall': recall,
+        'ms_per_frame': total_time * 1000 / scored if scored else 0.0,
+        'frames': scored
+    }
+
+
+def make_config(method: str, params: Dict[str, Any]) -> GlobalConfig:
+    """Конфигурация для подбора: параметры пробы без подсистем вне детектора"""
+    config = GlobalConfig()
+    if method in TrackingMethod.__members__:
+        config.method = TrackingMethod[method]
+    config.adaptive.warm_start = False  # Без снимков фона с прошлых запусков
+    config.flow.enabled = False  # Оценивается только детектор
+    for path, value in params.items():
+        set_param(config, path, value)
+    return config
+
+
+class ParameterTuner:
+    """Поиск параметров с лучшим F1 при ограничении задержки на кадр
+
+    Пробы выполняются в отдельных процессах; один пул процессов служит
+    всему поиску. Пробы, уложившиеся в бюджет
+    задержки, всегда лучше не уложившихся; среди равных по F1 выигрывает
+    более быстрая.
+    """
+
+    def __init__(self, method: str, clip_paths: Sequence[str], budget_ms: float,
+                 workers: int = 0, seed: Optional[int] = None):
+        if method not in SEARCH_SPACES:
+            raise ValueError(f'No search space for method {method}')
+
+        self.method = method
+        self.clip_paths = list(clip_paths)
+        self.budget_ms = budget_ms
+        self.workers = workers or max(1, (os.cpu_count() or 1) - 1)
+        self.space = SEARCH_SPACES[method]
+        self._rng = random.Random(seed)
+
+    def score(self, metrics: Dict[str, float]) -> Tuple[bool, float, float]:
+        """Ключ сортировки проб"""
+        return (metrics['ms_per_frame'] <= self.budget_ms,
+                metrics['f1'], -metrics['ms_per_frame'])
+
+    def sample(self) -> Dict[str, Any]:
+        """Случайная точка пространства параметров (с проверкой конфигурации)"""
+        for _ in range(100):
+            params = {spec.path: spec.sample(self._rng) for spec in self.space}
+            config = make_config(self.method, params)
+            if config.validate_all():
+                # Значения приведены к типам полей конфигурации
+                return {path: get_param(config, path) for path in params}
+        raise RuntimeError(f'Search space for {self.method} yields no valid configuration')
+
+    def random_search(self, trials: int) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Случайный поиск на полных роликах"""
+        candidates = [self.sample() for _ in range(trials)]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = self._evaluate_all(executor, candidates, None)
+        return max(results, key=lambda item: self.score(item[1]))
+
+    def successive_halving(self, trials: int, min_frames: int = 50,
+                           eta: int = 3) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Последовательное деление: все пробы на коротких отрезках,
+        лучшая 1/eta переходит на отрезок в eta раз длиннее"""
+        candidates = [self.sample() for _ in range(trials)]
+        longest = self._longest_clip()
+        frames = min_frames
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                results = self._evaluate_all(executor, candidates, frames)
+                results.sort(key=lambda item: self.score(item[1]), reverse=True)
+                if frames is None or len(results) <= 1:
+                    return results[0]
+
+                candidates = [params for params, _ in results[:max(1, len(results) // eta)]]
+                frames *= eta
+                if frames >= longest:
+                    frames = None  # Финальный раунд на полных роликах
+
+    def _evaluate_all(self, executor: ProcessPoolExecutor,
+                      candidates: List[Dict[str, Any]],
+                      max_frames: Optional[int]) -> List[Tuple[Dict[str, Any], Dict[str, float]]]:
+        """Параллельная оценка проб в пуле процессов"""
+        start = time.time()
+        futures = [
+            executor.submit(evaluate, self.method, params, self.clip_paths, max_frames)
+            for params in candidates
+        ]
+        results = [(params, future.result())
+                   for params, future in zip(candidates, futures)]
+
+        best = max(results, key=lambda item: self.score(item[1]))[1]
+        logger.info(
+            f"Tuning round: {len(candidates)} trials, "
+            f"{'all' if max_frames is None else max_frames} frames, "
+            f"best F1 {best['f1']:.3f} at {best['ms_per_frame']:.2f} ms/frame "
+            f"({time.time() - start:.1f}s)"
+        )
+        return results
+
+    def _longest_clip(self) -> int:
+        """Длина самого длинного ролика в кадрах"""
+        longest = 0
+        for path in self.clip_paths:
+            video = cv2.VideoCapture(path)
+            longest = max(longest, int(video.get(cv2.CAP_PROP_FRAME_COUNT)))
+            video.release()
+        return longest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--method', required=True, choices=sorted(SEARCH_SPACES))
+    parser.add_argument('--clips', nargs='+', required=True)
+    parser.add_argument('--budget-ms', type=float, default=20.0)
+    parser.add_argument('--search', choices=('random', 'halving'), default='halving')
+    parser.add_argument('--trials', type=int, default=27)
+    parser.add_argument('--min-frames', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    clip_paths = sorted({path for pattern in args.clips for path in glob.glob(pattern)})
+    if not clip_paths:
+        parser.error('no clips found')
+
+    tuner = ParameterTuner(args.method, clip_paths, args.budget_ms,
+                           workers=args.workers, seed=args.seed)
+    if args.search == 'random':
+        params, metrics = tuner.random_search(args.trials)
+    else:
+        params, metrics = tuner.successive_halving(args.trials, args.min_frames)
+
+    if metrics['ms_per_frame'] > args.budget_ms:
+        logger.warning(f"No trial met the {args.budget_ms} ms budget, saving the fastest best")
+
+    metrics['budget_ms'] = args.budget_ms
+    metrics['clips'] = [os.path.basename(path) for path in clip_paths]
+    save_preset(args.output, TrackingMethod[args.method], params, metrics)
+
+    print(f"F1 {metrics['f1']:.3f}, precision {metrics['precision']:.3f}, "
+          f"recall {metrics['recall']:.3f}, {metrics['ms_per_frame']:.2f} ms/frame")
+    for path, value in params.items():
+        print(f'  {path} = {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,12 @@
 """Точка входа приложения"""
 
+import argparse
 import sys
 import tkinter as tk
 from tkinter import messagebox
 from ui.main_window import MainApplication
+from models.config import GlobalConfig
+from core.presets import load_preset
 from utils.logger import logger
 
 
@@ -30,8 +33,16 @@ def check_dependencies():
     return missing
 
 
+def parse_args():
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description='Wildlife Motion Tracker Pro')
+    parser.add_argument('--preset', help='JSON-пресет параметров детектора (python -m core.tuning)')
+    return parser.parse_args()
+
+
 def main():
     """Главная функция приложения"""
+    args = parse_args()
     try:
         # Проверка зависимостей
         missing = check_dependencies()
@@ -53,8 +64,13 @@ def main():
 
             return 1
 
+        # Конфигурация из пресета
+        config = GlobalConfig()
+        if args.preset:
+            load_preset(config, args.preset)
+
         # Запуск приложения
-        app = MainApplication()
+        app = MainApplication(config)
         app.run()
 
         return 0
@@ -2,7 +2,7 @@
 
 from dataclasses import dataclass, field
 from typing import Dict, Tuple, List, Optional
-from .enums import TrackingMethod, ObjectCategory, CaptureSource
+from .enums import TrackingMethod, ObjectCategory, CaptureSource, RenderBackend
 from abc import ABC, abstractmethod
 
 @dataclass
@@ -52,10 +52,20 @@ class AdaptiveConfig(AlgorithmConfig):
     var_threshold: float = 16.0
     detect_shadows: bool = True
     shadow_threshold: float = 0.5
+    processing_scale: float = 1.0  # Масштаб кадра для модели фона (1.0 - полный)
+    refine_threshold: int = 25  # Порог разности при уточнении на полном разрешении
+    warm_start: bool = True  # Запуск модели фона с сохраненного снимка
+    snapshot_path: str = 'cache/adaptive_background.png'
+    snapshot_interval: float = 60.0  # Секунды между сохранениями снимка
+    snapshot_max_age: float = 6 * 3600.0  # Более старый снимок не используется
+    bootstrap_frames: int = 50  # Кадры ускоренного обучения (скорость 1/2k)
 
     def validate(self) -> bool:
         return (0 < self.learning_rate <= 1 and
-                self.history_length > 0)
+                self.history_length > 0 and
+                0 < self.processing_scale <= 1 and
+                self.snapshot_interval > 0 and
+                self.bootstrap_frames >= 0)
 
 @dataclass
 class SensitiveConfig(AlgorithmConfig):
@@ -110,6 +120,139 @@ class TrailsConfig(AlgorithmConfig):
     def validate(self) -> bool:
         return self.trail_length > 0
 
+@dataclass
+class RunningAverageConfig(AlgorithmConfig):
+    """Конфигурация детектора с бегущим средним"""
+    learning_shift: int = 5  # Скорость обучения 2^-shift
+    threshold: int = 25  # Порог разности с фоном (уровни яркости)
+    min_area: int = 50
+    max_area: int = 10000
+    morphology: bool = True
+
+    def validate(self) -> bool:
+        return (1 <= self.learning_shift <= 7 and
+                0 < self.threshold < 255 and
+                0 < self.min_area < self.max_area)
+
+@dataclass
+class TilingConfig:
+    """Конфигурация параллельной обработки по тайлам"""
+    enabled: bool = False
+    tile_size: int = 512
+    overlap: int = 32  # Должно быть не меньше радиуса размытия и морфологии
+    workers: int = 4
+
+    def validate(self) -> bool:
+        return (self.tile_size > 2 * self.overlap and
+                self.overlap >= 0 and
+                self.workers > 0)
+
+@dataclass
+class ExclusionConfig:
+    """Конфигурация зон исключения"""
+    enabled: bool = True
+    zones: List[Tuple[int, int, int, int]] = field(default_factory=list)  # x1, y1, x2, y2
+    crop: bool = True  # Обрезать кадр по области вне зон исключения
+    learn_flicker: bool = True
+    flicker_scale: float = 0.125  # Разрешение карты активности (ячейка 8x8)
+    flicker_rate: float = 0.002  # Скорость накопления активности (~500 кадров)
+    flicker_threshold: float = 0.3  # Доля времени, когда пиксель активен
+    warmup_frames: int = 300
+    refresh_interval: int = 30
+
+    def validate(self) -> bool:
+        return (0 < self.flicker_scale <= 1.0 and
+                0 < self.flicker_rate < 1.0 and
+                0 < self.flicker_threshold <= 1.0 and
+                self.refresh_interval > 0)
+
+@dataclass
+class GateConfig:
+    """Конфигурация пропуска статичных кадров"""
+    enabled: bool = True
+    min_object_area: int = 30  # Наименьший объект (пиксели кадра); задает размер ячейки
+    pixel_threshold: int = 8  # Изменение средней яркости ячейки
+    min_changed_pixels: int = 1  # Измененные ячейки
+    refresh_interval: int = 30  # Принудительная обработка каждые N пропусков
+    max_repeat: int = 3  # Пропуски подряд, пока повторяются непустые результаты
+
+    def validate(self) -> bool:
+        return (self.min_object_area > 0 and
+                self.min_changed_pixels > 0 and
+                self.refresh_interval > 0 and
+                self.max_repeat >= 0)
+
+@dataclass
+class FlowConfig:
+    """Конфигурация оценки скорости оптическим потоком"""
+    enabled: bool = True
+    max_points: int = 8  # Точек на объект
+    min_points: int = 3  # Меньше - точки объекта выбираются заново
+    win_size: int = 15
+    pyramid_levels: int = 2
+
+    def validate(self) -> bool:
+        return (0 < self.min_points <= self.max_points and
+                self.win_size >= 3 and
+                self.pyramid_levels >= 0)
+
+@dataclass
+class RoiConfig:
+    """Конфигурация детекции в окнах вокруг треков"""
+    enabled: bool = False
+    full_frame_interval: int = 10  # Полный кадр каждые N кадров
+    margin: int = 16  # Запас окна вокруг объекта (пиксели)
+    margin_growth: float = 0.25  # Рост запаса на кадр без подтверждения (доля размера)
+    max_missed: int = 3  # Кадры, в течение которых трек ищется по прогнозу
+    max_coverage: float = 0.5  # Большая доля площади - детекция по всему кадру
+
+    def validate(self) -> bool:
+        return (self.full_frame_interval >= 1 and
+                self.margin >= 0 and
+                self.margin_growth >= 0 and
+                self.max_missed >= 0 and
+                0 < self.max_coverage <= 1.0)
+
+@dataclass
+class HeatmapConfig:
+    """Конфигурация тепловой карты активности"""
+    cell_size: int = 16  # Размер ячейки сетки в пикселях кадра
+    half_life: float = 2.0  # Секунды, за которые тепло уменьшается вдвое
+    opacity: float = 0.3
+
+    def validate(self) -> bool:
+        return (self.cell_size > 0 and
+                self.half_life > 0 and
+                0 <= self.opacity <= 1.0)
+
+@dataclass
+class OccupancyConfig:
+    """Конфигурация долговременных карт занятости"""
+    enabled: bool = False
+    path: str = 'cache/occupancy'  # Каталог файлов карт
+    cell_size: int = 32  # Размер ячейки сетки в пикселях кадра
+    bucket_seconds: float = 3600.0  # Интервал одной карты
+    buckets: int = 24 * 14  # Длина кольца карт (две недели по часу)
+    history_hours: float = 0.0  # Окно истории на тепловой карте (0 - текущая активность)
+    refresh_interval: float = 10.0  # Секунды между пересчетами окна истории
+
+    def validate(self) -> bool:
+        return (self.cell_size > 0 and
+                self.bucket_seconds > 0 and
+                self.buckets > 0 and
+                self.history_hours >= 0 and
+                self.refresh_interval > 0)
+
+@dataclass
+class RenderConfig:
+    """Конфигурация асинхронного рендеринга"""
+    backend: Optional[RenderBackend] = None  # None - выбор по возможностям машины
+    workers: int = 2
+    queue_size: int = 3  # Кадры в очереди рендеринга; лишние отбрасываются
+
+    def validate(self) -> bool:
+        return self.workers > 0 and self.queue_size > 0
+
 @dataclass
 class CaptureConfig:
     """Конфигурация захвата экрана"""
@@ -124,8 +267,10 @@ class DisplayConfig:
     """Конфигурация отображения"""
     show_original: bool = False
     show_heatmap: bool = False
+    show_thermal: bool = False  # Цветное тепловизионное изображение
     show_grid: bool = False
     show_info: bool = True
+    sparse_overlay: bool = True  # Разреженный слой оверлея вместо копии кадра
     zoom_factor: float = 1.0
     brightness: float = 1.0
     contrast: float = 1.0
@@ -151,6 +296,14 @@ class GlobalConfig:
     capture: CaptureConfig = field(default_factory=CaptureConfig)
     display: DisplayConfig = field(default_factory=DisplayConfig)
     alerts: AlertConfig = field(default_factory=AlertConfig)
+    tiling: TilingConfig = field(default_factory=TilingConfig)
+    exclusion: ExclusionConfig = field(default_factory=ExclusionConfig)
+    gate: GateConfig = field(default_factory=GateConfig)
+    flow: FlowConfig = field(default_factory=FlowConfig)
+    roi: RoiConfig = field(default_factory=RoiConfig)
+    heatmap: HeatmapConfig = field(default_factory=HeatmapConfig)
+    occupancy: OccupancyConfig = field(default_factory=OccupancyConfig)
+    render: RenderConfig = field(default_factory=RenderConfig)
 
     # Конфигурации алгоритмов
     contour: ContourConfig = field(default_factory=ContourConfig)
@@ -160,6 +313,7 @@ class GlobalConfig:
     multiscale: MultiScaleConfig = field(default_factory=MultiScaleConfig)
     thermal: ThermalConfig = field(default_factory=ThermalConfig)
     trails: TrailsConfig = field(default_factory=TrailsConfig)
+    running_average: RunningAverageConfig = field(default_factory=RunningAverageConfig)
 
     # Цветовая схема
     colors: Dict[str, Tuple[int, int, int]] = field(default_factory=lambda: {
@@ -179,5 +333,14 @@ class GlobalConfig:
             self.sensitive.validate(),
             self.multiscale.validate(),
             self.thermal.validate(),
-            self.trails.validate()
+            self.trails.validate(),
+            self.running_average.validate(),
+            self.tiling.validate(),
+            self.exclusion.validate(),
+            self.gate.validate(),
+            self.flow.validate(),
+            self.roi.validate(),
+            self.heatmap.validate(),
+            self.occupancy.validate(),
+            self.render.validate()
         ])
\ No newline at end of file
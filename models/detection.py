@@ -1,8 +1,8 @@
 """Модели данных для детекции"""
 
 import numpy as np
-from typing import Tuple, Optional, Dict, Any
-from dataclasses import dataclass
+from typing import Tuple, Optional, Dict, Any, Callable, List, Iterator
+from dataclasses import dataclass, field
 from .enums import ObjectCategory
 
 
@@ -18,6 +18,9 @@ class DetectionResult:
     velocity: float = 0.0
     direction: float = 0.0
     id: int = 0
+    contour_loader: Optional[Callable[[], Optional[np.ndarray]]] = field(
+        default=None, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.id == 0:
@@ -39,6 +42,13 @@ class DetectionResult:
     def y(self) -> int:
         return self.bbox[1]
 
+    def get_contour(self) -> Optional[np.ndarray]:
+        """Контур объекта (извлекается лениво при первом обращении)"""
+        if self.contour is None and self.contour_loader is not None:
+            self.contour = self.contour_loader()
+            self.contour_loader = None
+        return self.contour
+
     def to_dict(self) -> Dict[str, Any]:
         """Конвертация в словарь"""
         return {
@@ -50,4 +60,324 @@ class DetectionResult:
             'confidence': self.confidence,
             'velocity': self.velocity,
             'direction': self.direction
-        }
\ No newline at end of file
+        }
+
+# Порядок категорий для кодирования в числовой столбец
+CATEGORY_ORDER: List[ObjectCategory] = list(ObjectCategory)
+CATEGORY_CODES: Dict[ObjectCategory, int] = {
+    category: code for code, category in enumerate(CATEGORY_ORDER)
+}
+
+
+class DetectionView:
+    """Ленивое представление одного объекта из DetectionBatch
+
+    Повторяет интерфейс DetectionResult, но читает и пишет значения
+    напрямую в столбцы пакета.
+    """
+
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch: 'DetectionBatch', index: int):
+        self._batch = batch
+        self._index = index
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        x, y, w, h = self._batch.bboxes[self._index]
+        return int(x), int(y), int(w), int(h)
+
+    @bbox.setter
+    def bbox(self, value: Tuple[int, int, int, int]) -> None:
+        self._batch.bboxes[self._index] = value
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        cx, cy = self._batch.centers[self._index]
+        return int(cx), int(cy)
+
+    @center.setter
+    def center(self, value: Tuple[int, int]) -> None:
+        self._batch.centers[self._index] = value
+
+    @property
+    def area(self) -> int:
+        return int(self._batch.areas[self._index])
+
+    @area.setter
+    def area(self, value: int) -> None:
+        self._batch.areas[self._index] = value
+
+    @property
+    def category(self) -> ObjectCategory:
+        return CATEGORY_ORDER[self._batch.category_codes[self._index]]
+
+    @category.setter
+    def category(self, value: ObjectCategory) -> None:
+        self._batch.category_codes[self._index] = CATEGORY_CODES[value]
+
+    @property
+    def confidence(self) -> float:
+        return float(self._batch.confidences[self._index])
+
+    @confidence.setter
+    def confidence(self, value: float) -> None:
+        self._batch.confidences[self._index] = value
+
+    @property
+    def velocity(self) -> float:
+        return float(self._batch.velocities[self._index])
+
+    @velocity.setter
+    def velocity(self, value: float) -> None:
+        self._batch.velocities[self._index] = value
+
+    @property
+    def direction(self) -> float:
+        return float(self._batch.directions[self._index])
+
+    @direction.setter
+    def direction(self, value: float) -> None:
+        self._batch.directions[self._index] = value
+
+    @property
+    def id(self) -> int:
+        return int(self._batch.track_ids[self._index])
+
+    @id.setter
+    def id(self, value: int) -> None:
+        self._batch.track_ids[self._index] = value
+
+    @property
+    def contour(self) -> Optional[np.ndarray]:
+        return self._batch.contours[self._index]
+
+    @contour.setter
+    def contour(self, value: Optional[np.ndarray]) -> None:
+        self._batch.contours[self._index] = value
+
+    @property
+    def contour_loader(self) -> Optional[Callable[[], Optional[np.ndarray]]]:
+        return self._batch.contour_loaders[self._index]
+
+    @contour_loader.setter
+    def contour_loader(self, value: Optional[Callable[[], Optional[np.ndarray]]]) -> None:
+        self._batch.contour_loaders[self._index] = value
+
+    @property
+    def width(self) -> int:
+        return int(self._batch.bboxes[self._index, 2])
+
+    @property
+    def height(self) -> int:
+        return int(self._batch.bboxes[self._index, 3])
+
+    @property
+    def x(self) -> int:
+        return int(self._batch.bboxes[self._index, 0])
+
+    @property
+    def y(self) -> int:
+        return int(self._batch.bboxes[self._index, 1])
+
+    def get_contour(self) -> Optional[np.ndarray]:
+        """Контур объекта (извлекается лениво при первом обращении)"""
+        return self._batch.get_contour(self._index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Конвертация в словарь"""
+        return {
+            'id': self.id,
+            'bbox': self.bbox,
+            'center': self.center,
+            'area': self.area,
+            'category': self.category.value,
+            'confidence': self.confidence,
+            'velocity': self.velocity,
+            'direction': self.direction
+        }
+
+
+def _shifted_loader(loader: Callable[[], Optional[np.ndarray]],
+                    offset: np.ndarray) -> Callable[[], Optional[np.ndarray]]:
+    """Отложенный сдвиг лениво извлекаемого контура"""
+    def load():
+        contour = loader()
+        if contour is None:
+            return None
+        return contour + offset
+
+    return load
+
+
+class DetectionBatch:
+    """Результаты детектирования кадра в виде столбцов
+
+    Каждый признак хранится отдельным numpy-массивом, поэтому трекинг,
+    статистика и рендеринг могут работать со всеми объектами сразу.
+    Итерация и индексация возвращают DetectionView для совместимости
+    с кодом, написанным под списки DetectionResult.
+    """
+
+    def __init__(self, bboxes: np.ndarray, centers: np.ndarray,
+                 areas: np.ndarray, confidences: np.ndarray,
+                 category_codes: np.ndarray,
+                 velocities: Optional[np.ndarray] = None,
+                 directions: Optional[np.ndarray] = None,
+                 track_ids: Optional[np.ndarray] = None,
+                 contours: Optional[List[Optional[np.ndarray]]] = None,
+                 contour_loaders: Optional[List[Optional[Callable]]] = None):
+        count = len(areas)
+        # Копии: исходные массивы (например, столбцы ComponentSet) читаются
+        # ленивыми загрузчиками контуров и не должны меняться через пакет
+        self.bboxes = np.array(bboxes, dtype=np.int32).reshape(count, 4)
+        self.centers = np.array(centers, dtype=np.int32).reshape(count, 2)
+        self.areas = np.array(areas, dtype=np.int32)
+        self.confidences = np.asarray(confidences, dtype=np.float32)
+        self.category_codes = np.asarray(category_codes, dtype=np.int8)
+        self.velocities = (np.zeros(count, dtype=np.float32) if velocities is None
+                           else np.asarray(velocities, dtype=np.float32))
+        self.directions = (np.zeros(count, dtype=np.float32) if directions is None
+                           else np.asarray(directions, dtype=np.float32))
+        self.track_ids = (np.zeros(count, dtype=np.int64) if track_ids is None
+                          else np.asarray(track_ids, dtype=np.int64))
+        self.contours = contours if contours is not None else [None] * count
+        self.contour_loaders = (contour_loaders if contour_loaders is not None
+                                else [None] * count)
+
+    @classmethod
+    def empty(cls) -> 'DetectionBatch':
+        """Пустой пакет"""
+        return cls(
+            bboxes=np.empty((0, 4), dtype=np.int32),
+            centers=np.empty((0, 2), dtype=np.int32),
+            areas=np.empty(0, dtype=np.int32),
+            confidences=np.empty(0, dtype=np.float32),
+            category_codes=np.empty(0, dtype=np.int8)
+        )
+
+    @classmethod
+    def from_results(cls, results) -> 'DetectionBatch':
+        """Построение пакета из списка DetectionResult или DetectionView"""
+        if isinstance(results, DetectionBatch):
+            return results
+
+        results = list(results)
+        if not results:
+            return cls.empty()
+
+        return cls(
+            bboxes=[r.bbox for r in results],
+            centers=[r.center for r in results],
+            areas=[r.area for r in results],
+            confidences=[r.confidence for r in results],
+            category_codes=[CATEGORY_CODES[r.category] for r in results],
+            velocities=[r.velocity for r in results],
+            directions=[r.direction for r in results],
+            contours=[r.contour for r in results],
+            contour_loaders=[r.contour_loader for r in results]
+        )
+
+    @classmethod
+    def concat(cls, batches: List['DetectionBatch']) -> 'DetectionBatch':
+        """Объединение нескольких пакетов"""
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+
+        return cls(
+            bboxes=np.concatenate([b.bboxes for b in batches]),
+            centers=np.concatenate([b.centers for b in batches]),
+            areas=np.concatenate([b.areas for b in batches]),
+            confidences=np.concatenate([b.confidences for b in batches]),
+            category_codes=np.concatenate([b.category_codes for b in batches]),
+            velocities=np.concatenate([b.velocities for b in batches]),
+            directions=np.concatenate([b.directions for b in batches]),
+            track_ids=np.concatenate([b.track_ids for b in batches]),
+            contours=[c for b in batches for c in b.contours],
+            contour_loaders=[c for b in batches for c in b.contour_loaders]
+        )
+
+    def select(self, keep: np.ndarray) -> 'DetectionBatch':
+        """Отбор объектов по булевой маске или индексам"""
+        indices = np.arange(len(self))[keep]
+        return DetectionBatch(
+            bboxes=self.bboxes[indices],
+            centers=self.centers[indices],
+            areas=self.areas[indices],
+            confidences=self.confidences[indices],
+            category_codes=self.category_codes[indices],
+            velocities=self.velocities[indices],
+            directions=self.directions[indices],
+            track_ids=self.track_ids[indices],
+            contours=[self.contours[i] for i in indices],
+            contour_loaders=[self.contour_loaders[i] for i in indices]
+        )
+
+    def translate(self, dx: int, dy: int) -> 'DetectionBatch':
+        """Сдвиг координат (из обрезанной области в кадр)"""
+        offset = np.array([dx, dy], dtype=np.int32)
+        self.bboxes = self.bboxes + np.array([dx, dy, 0, 0], dtype=np.int32)
+        self.centers = self.centers + offset
+        for i, contour in enumerate(self.contours):
+            if contour is not None:
+                self.contours[i] = contour + offset
+        self.contour_loaders = [
+            None if loader is None else _shifted_loader(loader, offset)
+            for loader in self.contour_loaders
+        ]
+        return self
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def __getitem__(self, index: int) -> DetectionView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('detection index out of range')
+        return DetectionView(self, index)
+
+    def __iter__(self) -> Iterator[DetectionView]:
+        for index in range(len(self)):
+            yield DetectionView(self, index)
+
+    @property
+    def categories(self) -> List[ObjectCategory]:
+        """Категории объектов"""
+        return [CATEGORY_ORDER[code] for code in self.category_codes]
+
+    def category_counts(self) -> np.ndarray:
+        """Количество объектов по кодам категорий"""
+        return np.bincount(self.category_codes, minlength=len(CATEGORY_ORDER))
+
+    def get_contour(self, index: int) -> Optional[np.ndarray]:
+        """Контур объекта (извлекается лениво при первом обращении)"""
+        contour = self.contours[index]
+        loader = self.contour_loaders[index]
+        if contour is None and loader is not None:
+            contour = loader()
+            self.contours[index] = contour
+            self.contour_loaders[index] = None
+        return contour
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Конвертация в список словарей для экспорта"""
+        return [
+            {
+                'id': int(track_id),
+                'bbox': tuple(int(v) for v in bbox),
+                'center': tuple(int(v) for v in center),
+                'area': int(area),
+                'category': CATEGORY_ORDER[code].value,
+                'confidence': float(confidence),
+                'velocity': float(velocity),
+                'direction': float(direction)
+            }
+            for track_id, bbox, center, area, code, confidence, velocity, direction
+            in zip(self.track_ids, self.bboxes, self.centers, self.areas,
+                   self.category_codes, self.confidences,
+                   self.velocities, self.directions)
+        ]
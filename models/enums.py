@@ -11,6 +11,7 @@ class TrackingMethod(Enum):
     MULTI_SCALE = "Многоуровневый"
     THERMAL_SIMULATION = "Тепловизионный"
     MOVEMENT_TRAILS = "Следы движения"
+    RUNNING_AVERAGE = "Бегущее среднее"
 
 class ObjectCategory(Enum):
     """Категории объектов"""
@@ -25,4 +26,9 @@ class CaptureSource(Enum):
     FULL_SCREEN = "Весь экран"
     ACTIVE_WINDOW = "Активное окно"
     WINDOW_BY_TITLE = "Окно по названию"
-    REGION = "Область экрана"
\ No newline at end of file
+    REGION = "Область экрана"
+
+class RenderBackend(Enum):
+    """Бэкенды рендеринга оверлея"""
+    CPU = "CPU"
+    OPENCL = "OpenCL (T-API)"
@@ -0,0 +1,57 @@
+"""Фильтрация компонент по площади контура"""
+
+import cv2
+import numpy as np
+import pytest
+from core.detectors.components import ComponentSet
+
+
+def _random_mask(seed: int) -> np.ndarray:
+    """Линии, кольца, прямоугольники и шум, в том числе у края кадра"""
+    rng = np.random.default_rng(seed)
+    height, width = 120, 160
+    mask = np.zeros((height, width), np.uint8)
+    for _ in range(int(rng.integers(1, 12))):
+        kind = int(rng.integers(0, 4))
+        p1 = tuple(int(v) for v in rng.integers(0, [width, height]))
+        p2 = tuple(int(v) for v in rng.integers(0, [width, height]))
+        if kind == 0:
+            cv2.line(mask, p1, p2, 255, int(rng.integers(1, 4)))
+        elif kind == 1:
+            cv2.circle(mask, p1, int(rng.integers(1, 40)), 255,
+                       int(rng.choice([-1, 1, 2, 3])))
+        elif kind == 2:
+            cv2.rectangle(mask, p1, p2, 255, int(rng.choice([-1, 1, 2])))
+        else:
+            mask[rng.random((height, width)) > 0.93] = 255
+    return mask
+
+
+def _components(mask: np.ndarray, detached: bool) -> ComponentSet:
+    components = ComponentSet.from_mask(mask)
+    return components.detach() if detached else components
+
+
+@pytest.mark.parametrize('detached', [False, True])
+@pytest.mark.parametrize('seed', range(20))
+def test_interior_pixels_bound_contour_area(seed, detached):
+    components = _components(_random_mask(seed), detached)
+    interior = components._interior_areas(np.arange(len(components)))
+    assert np.all(interior <= components.contour_areas)
+
+
+@pytest.mark.parametrize('detached', [False, True])
+@pytest.mark.parametrize('seed', range(20))
+def test_filter_area_matches_traced_contours(seed, detached):
+    mask = _random_mask(seed)
+    areas = _components(mask, detached).contour_areas
+    ids = _components(mask, detached).ids
+    for min_area, max_area, strict in [(10, 200, False), (50, 1000, True),
+                                       (0, 30, False), (100, np.inf, False),
+                                       (5, 5, False)]:
+        if strict:
+            expected = (areas > min_area) & (areas < max_area)
+        else:
+            expected = (areas >= min_area) & (areas <= max_area)
+        filtered = _components(mask, detached).filter_area(min_area, max_area, strict)
+        assert np.array_equal(filtered.ids, ids[expected])
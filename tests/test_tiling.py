@@ -0,0 +1,63 @@
+"""Сравнение компонент, найденных по тайлам и по всему кадру"""
+
+import cv2
+import numpy as np
+import pytest
+from core.detectors.components import ComponentSet
+from core.tiling import TileExecutor
+from models.config import TilingConfig
+
+
+def _executor(tile_size: int) -> TileExecutor:
+    config = TilingConfig()
+    config.enabled = True
+    config.tile_size = tile_size
+    config.overlap = 8
+    config.workers = 2
+    return TileExecutor(config)
+
+
+def _describe(components: ComponentSet):
+    """Прямоугольник, площади и маска каждой компоненты в порядке прямоугольников"""
+    result = []
+    for i in range(len(components)):
+        result.append((
+            tuple(int(v) for v in components.boxes[i]),
+            int(components.areas[i]),
+            float(components.contour_areas[i]),
+            components.component_mask(i).tobytes()
+        ))
+    return sorted(result)
+
+
+def _compare(mask: np.ndarray, tile_size: int) -> None:
+    executor = _executor(tile_size)
+    try:
+        tiled = executor.run(np.dstack([mask] * 3), lambda image: image[..., 0].copy())
+    finally:
+        executor.shutdown()
+    assert _describe(tiled) == _describe(ComponentSet.from_mask(mask))
+
+
+def test_bar_around_block_keeps_own_pixels():
+    """Диагональная полоса, в прямоугольнике которой лежит отдельный блок"""
+    mask = np.zeros((400, 400), dtype=np.uint8)
+    cv2.line(mask, (20, 20), (380, 380), 255, 7)
+    cv2.rectangle(mask, (250, 60), (319, 129), 255, -1)
+    _compare(mask, 128)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_random_shapes_match_untiled(seed):
+    """Случайные пятна и линии с пересекающимися прямоугольниками"""
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((300, 420), dtype=np.uint8)
+    for _ in range(12):
+        x1, x2 = rng.integers(0, 420, 2)
+        y1, y2 = rng.integers(0, 300, 2)
+        cv2.line(mask, (int(x1), int(y1)), (int(x2), int(y2)), 255,
+                 int(rng.integers(1, 6)))
+    for _ in range(20):
+        cv2.circle(mask, (int(rng.integers(0, 420)), int(rng.integers(0, 300))),
+                   int(rng.integers(2, 25)), 255, -1)
+    _compare(mask, int(rng.integers(40, 130)))
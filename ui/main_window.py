@@ -1,25 +1,27 @@
 """Главное окно приложения"""
 
 import tkinter as tk
+from typing import Optional
 from tkinter import ttk, messagebox
 from .video import VideoDisplay
 from .stats import StatisticsPanel
 from .control import ControlPanel
 from .logs import LogPanel
 from core.controller import TrackingController
+from models.config import GlobalConfig
 from utils.logger import logger
 
 
 class MainApplication:
     """Главное окно приложения"""
 
-    def __init__(self):
+    def __init__(self, config: Optional[GlobalConfig] = None):
         self.root = tk.Tk()
         self.root.title('Wildlife Motion Tracker Pro')
         self.root.geometry('1200x800')
 
         # Инициализация контроллера
-        self.controller = TrackingController()
+        self.controller = TrackingController(config)
 
         # Настройка интерфейса
         self._setup_ui()
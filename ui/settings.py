@@ -162,6 +162,99 @@ class SettingsWindow(tk.Toplevel):
         ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
         row += 1
 
+        ttk.Label(frame, text='Затухание тепловой карты вдвое за (с):').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.heatmap_half_life_var = tk.DoubleVar()
+        ttk.Entry(frame, textvariable=self.heatmap_half_life_var, width=10).grid(
+            row=row, column=1, sticky='w', padx=5, pady=5
+        )
+        row += 1
+
+        # Долговременные карты занятости
+        self.occupancy_enabled_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            frame, text='Записывать карты занятости по часам',
+            variable=self.occupancy_enabled_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        ttk.Label(frame, text='Тепловая карта за последние (ч, 0 - текущая):').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.occupancy_history_var = tk.DoubleVar()
+        ttk.Entry(frame, textvariable=self.occupancy_history_var, width=10).grid(
+            row=row, column=1, sticky='w', padx=5, pady=5
+        )
+        row += 1
+
+        # Тепловизионное изображение
+        self.show_thermal_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            frame, text='Показать тепловизионное изображение',
+            variable=self.show_thermal_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        # Оверлей отдельным слоем без копии кадра
+        self.sparse_overlay_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            frame, text='Оверлей отдельным слоем (без копии кадра)',
+            variable=self.sparse_overlay_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        # Зоны исключения (рисуются правой кнопкой мыши на видео)
+        self.exclusion_enabled_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            frame, text='Зоны исключения (правая кнопка мыши на видео)',
+            variable=self.exclusion_enabled_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        self.exclusion_flicker_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            frame, text='Исключать мерцающие области',
+            variable=self.exclusion_flicker_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        # Пропуск статичных кадров
+        self.gate_enabled_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            frame, text='Пропускать статичные кадры',
+            variable=self.gate_enabled_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        # Скорость объектов по оптическому потоку
+        self.flow_enabled_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            frame, text='Скорость объектов по оптическому потоку',
+            variable=self.flow_enabled_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        # Детекция в окнах вокруг треков между полными кадрами
+        self.roi_enabled_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            frame, text='Детекция в окнах вокруг треков (контуры, тепловизор)',
+            variable=self.roi_enabled_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        ttk.Label(frame, text='Полный кадр каждые N кадров:').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.roi_interval_var = tk.IntVar()
+        ttk.Entry(frame, textvariable=self.roi_interval_var, width=10).grid(
+            row=row, column=1, sticky='w', padx=5, pady=5
+        )
+        row += 1
+
         # Яркость
         ttk.Label(frame, text='Яркость:').grid(
             row=row, column=0, sticky='w', padx=5, pady=5
@@ -343,6 +436,11 @@ class SettingsWindow(tk.Toplevel):
         algorithm_notebook.add(trails_frame, text='Следы')
         self._create_trails_settings(trails_frame)
 
+        # Бегущее среднее
+        running_average_frame = ttk.Frame(algorithm_notebook)
+        algorithm_notebook.add(running_average_frame, text='Бегущее среднее')
+        self._create_running_average_settings(running_average_frame)
+
     def _create_contour_settings(self, parent):
         """Настройки контурного детектора"""
         row = 0
@@ -404,6 +502,34 @@ class SettingsWindow(tk.Toplevel):
         ttk.Entry(parent, textvariable=self.contour_blur_var, width=10).grid(
             row=row, column=1, sticky='w', padx=5, pady=5
         )
+        row += 1
+
+        # Параллельная обработка по тайлам
+        self.tiling_enabled_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            parent, text='Обработка по тайлам',
+            variable=self.tiling_enabled_var
+        ).grid(row=row, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        row += 1
+
+        ttk.Label(parent, text='Размер тайла:').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.tiling_size_var = tk.IntVar()
+        ttk.Entry(parent, textvariable=self.tiling_size_var, width=10).grid(
+            row=row, column=1, sticky='w', padx=5, pady=5
+        )
+        row += 1
+
+        ttk.Label(parent, text='Перекрытие тайлов:').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.tiling_overlap_var = tk.IntVar()
+        ttk.Entry(parent, textvariable=self.tiling_overlap_var, width=10).grid(
+            row=row, column=1, sticky='w', padx=5, pady=5
+        )
 
     def _create_motion_settings(self, parent):
         """Настройки детектора движения"""
@@ -506,6 +632,17 @@ class SettingsWindow(tk.Toplevel):
         ttk.Entry(parent, textvariable=self.adaptive_var_threshold_var, width=10).grid(
             row=row, column=1, sticky='w', padx=5, pady=5
         )
+        row += 1
+
+        # Масштаб модели фона
+        ttk.Label(parent, text='Масштаб модели фона:').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.adaptive_scale_var = tk.DoubleVar()
+        ttk.Entry(parent, textvariable=self.adaptive_scale_var, width=10).grid(
+            row=row, column=1, sticky='w', padx=5, pady=5
+        )
 
     def _create_sensitive_settings(self, parent):
         """Настройки чувствительного детектора"""
@@ -681,6 +818,69 @@ class SettingsWindow(tk.Toplevel):
             row=row, column=1, sticky='w', padx=5, pady=5
         )
 
+    def _create_running_average_settings(self, parent):
+        """Настройки детектора с бегущим средним"""
+        row = 0
+
+        # Чувствительность
+        ttk.Label(parent, text='Чувствительность:').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.running_average_sensitivity_var = tk.DoubleVar()
+        sensitivity_scale = ttk.Scale(
+            parent, from_=0.1, to=3.0,
+            variable=self.running_average_sensitivity_var, orient='horizontal'
+        )
+        sensitivity_scale.grid(row=row, column=1, sticky='ew', padx=5, pady=5)
+
+        sensitivity_label = ttk.Label(
+            parent, textvariable=tk.StringVar(
+                value=f'{self.running_average_sensitivity_var.get():.1f}'
+            )
+        )
+        sensitivity_label.grid(row=row, column=2, padx=5, pady=5)
+
+        sensitivity_scale.configure(
+            command=lambda v: sensitivity_label.config(
+                text=f'{float(v):.1f}'
+            )
+        )
+        row += 1
+
+        # Скорость обучения 2^-shift
+        ttk.Label(parent, text='Сдвиг скорости обучения (1-7):').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.running_average_shift_var = tk.IntVar()
+        ttk.Spinbox(
+            parent, from_=1, to=7, textvariable=self.running_average_shift_var,
+            width=10
+        ).grid(row=row, column=1, sticky='w', padx=5, pady=5)
+        row += 1
+
+        # Порог разности
+        ttk.Label(parent, text='Порог разности:').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.running_average_threshold_var = tk.IntVar()
+        ttk.Entry(parent, textvariable=self.running_average_threshold_var, width=10).grid(
+            row=row, column=1, sticky='w', padx=5, pady=5
+        )
+        row += 1
+
+        # Минимальная площадь
+        ttk.Label(parent, text='Минимальная площадь:').grid(
+            row=row, column=0, sticky='w', padx=5, pady=5
+        )
+
+        self.running_average_min_area_var = tk.IntVar()
+        ttk.Entry(parent, textvariable=self.running_average_min_area_var, width=10).grid(
+            row=row, column=1, sticky='w', padx=5, pady=5
+        )
+
     def _load_current_settings(self):
         """Загрузка текущих настроек"""
         cfg = self.controller.config
@@ -694,6 +894,17 @@ class SettingsWindow(tk.Toplevel):
         # Отображение
         self.show_original_var.set(cfg.display.show_original)
         self.show_heatmap_var.set(cfg.display.show_heatmap)
+        self.heatmap_half_life_var.set(cfg.heatmap.half_life)
+        self.occupancy_enabled_var.set(cfg.occupancy.enabled)
+        self.occupancy_history_var.set(cfg.occupancy.history_hours)
+        self.show_thermal_var.set(cfg.display.show_thermal)
+        self.sparse_overlay_var.set(cfg.display.sparse_overlay)
+        self.exclusion_enabled_var.set(cfg.exclusion.enabled)
+        self.exclusion_flicker_var.set(cfg.exclusion.learn_flicker)
+        self.gate_enabled_var.set(cfg.gate.enabled)
+        self.flow_enabled_var.set(cfg.flow.enabled)
+        self.roi_enabled_var.set(cfg.roi.enabled)
+        self.roi_interval_var.set(cfg.roi.full_frame_interval)
         self.brightness_var.set(cfg.display.brightness)
         self.contrast_var.set(cfg.display.contrast)
 
@@ -714,6 +925,9 @@ class SettingsWindow(tk.Toplevel):
         self.contour_min_area_var.set(cfg.contour.min_area)
         self.contour_threshold_var.set(cfg.contour.threshold)
         self.contour_blur_var.set(cfg.contour.blur_size)
+        self.tiling_enabled_var.set(cfg.tiling.enabled)
+        self.tiling_size_var.set(cfg.tiling.tile_size)
+        self.tiling_overlap_var.set(cfg.tiling.overlap)
 
         self.motion_sensitivity_var.set(cfg.motion.sensitivity)
         self.motion_min_pixel_var.set(cfg.motion.min_pixel_change)
@@ -722,6 +936,7 @@ class SettingsWindow(tk.Toplevel):
         self.adaptive_sensitivity_var.set(cfg.adaptive.sensitivity)
         self.adaptive_learning_var.set(cfg.adaptive.learning_rate)
         self.adaptive_var_threshold_var.set(cfg.adaptive.var_threshold)
+        self.adaptive_scale_var.set(cfg.adaptive.processing_scale)
 
         self.sensitive_sensitivity_var.set(cfg.sensitive.sensitivity)
         self.sensitive_enhancement_var.set(cfg.sensitive.enhancement_factor)
@@ -736,6 +951,11 @@ class SettingsWindow(tk.Toplevel):
         self.trails_sensitivity_var.set(cfg.trails.sensitivity)
         self.trails_length_var.set(cfg.trails.trail_length)
 
+        self.running_average_sensitivity_var.set(cfg.running_average.sensitivity)
+        self.running_average_shift_var.set(cfg.running_average.learning_shift)
+        self.running_average_threshold_var.set(cfg.running_average.threshold)
+        self.running_average_min_area_var.set(cfg.running_average.min_area)
+
         # Обновление списка окон
         self._refresh_window_list()
 
@@ -789,6 +1009,17 @@ class SettingsWindow(tk.Toplevel):
             # Отображение
             cfg.display.show_original = self.show_original_var.get()
             cfg.display.show_heatmap = self.show_heatmap_var.get()
+            cfg.heatmap.half_life = self.heatmap_half_life_var.get()
+            cfg.occupancy.enabled = self.occupancy_enabled_var.get()
+            cfg.occupancy.history_hours = self.occupancy_history_var.get()
+            cfg.display.show_thermal = self.show_thermal_var.get()
+            cfg.display.sparse_overlay = self.sparse_overlay_var.get()
+            cfg.exclusion.enabled = self.exclusion_enabled_var.get()
+            cfg.exclusion.learn_flicker = self.exclusion_flicker_var.get()
+            cfg.gate.enabled = self.gate_enabled_var.get()
+            cfg.flow.enabled = self.flow_enabled_var.get()
+            cfg.roi.enabled = self.roi_enabled_var.get()
+            cfg.roi.full_frame_interval = self.roi_interval_var.get()
             cfg.display.brightness = self.brightness_var.get()
             cfg.display.contrast = self.contrast_var.get()
 
@@ -816,6 +1047,9 @@ class SettingsWindow(tk.Toplevel):
             cfg.contour.min_area = self.contour_min_area_var.get()
             cfg.contour.threshold = self.contour_threshold_var.get()
             cfg.contour.blur_size = self.contour_blur_var.get()
+            cfg.tiling.enabled = self.tiling_enabled_var.get()
+            cfg.tiling.tile_size = self.tiling_size_var.get()
+            cfg.tiling.overlap = self.tiling_overlap_var.get()
 
             cfg.motion.sensitivity = self.motion_sensitivity_var.get()
             cfg.motion.min_pixel_change = self.motion_min_pixel_var.get()
@@ -824,6 +1058,7 @@ class SettingsWindow(tk.Toplevel):
             cfg.adaptive.sensitivity = self.adaptive_sensitivity_var.get()
             cfg.adaptive.learning_rate = self.adaptive_learning_var.get()
             cfg.adaptive.var_threshold = self.adaptive_var_threshold_var.get()
+            cfg.adaptive.processing_scale = self.adaptive_scale_var.get()
 
             cfg.sensitive.sensitivity = self.sensitive_sensitivity_var.get()
             cfg.sensitive.enhancement_factor = self.sensitive_enhancement_var.get()
@@ -838,6 +1073,11 @@ class SettingsWindow(tk.Toplevel):
             cfg.trails.sensitivity = self.trails_sensitivity_var.get()
             cfg.trails.trail_length = self.trails_length_var.get()
 
+            cfg.running_average.sensitivity = self.running_average_sensitivity_var.get()
+            cfg.running_average.learning_shift = self.running_average_shift_var.get()
+            cfg.running_average.threshold = self.running_average_threshold_var.get()
+            cfg.running_average.min_area = self.running_average_min_area_var.get()
+
             # Применение конфигурации
             self.controller.update_config(cfg)
 
@@ -3,14 +3,26 @@
 import tkinter as tk
 from tkinter import ttk
 import queue
-from collections import deque
+import numpy as np
 from .widgets import BaseWidget
 from models.enums import ObjectCategory
 from utils.logger import logger
+from utils.series import RingSeries
 
 
 class StatisticsPanel(BaseWidget):
-    """Панель статистики"""
+    """Панель статистики
+
+    График активности состоит из постоянных элементов холста (одна
+    ломаная, маркер последнего значения, подпись), которые обновляются
+    через ``coords`` и ``itemconfigure``. История хранится в кольцевом
+    буфере и прореживается по минимуму и максимуму до ширины холста,
+    поэтому время потока Tk не зависит от длины истории.
+    """
+
+    _HISTORY = 4 * 3600  # Значения раз в секунду: четыре часа
+    _MARGIN_X = 20
+    _MARGIN_Y = 10
 
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
@@ -29,7 +41,8 @@ class StatisticsPanel(BaseWidget):
             'small': tk.StringVar(value='Мелкие: 0'),
             'medium': tk.StringVar(value='Средние: 0'),
             'large': tk.StringVar(value='Крупные: 0'),
-            'uptime': tk.StringVar(value='Время работы: 00:00')
+            'uptime': tk.StringVar(value='Время работы: 00:00'),
+            'detector': tk.StringVar(value='')
         }
 
         for var in self.stats_vars.values():
@@ -45,7 +58,17 @@ class StatisticsPanel(BaseWidget):
         )
         self.graph_canvas.pack(fill='x', padx=2, pady=2)
 
-        self._activity_data = deque(maxlen=50)
+        self._activity_data = RingSeries(self._HISTORY)
+        self._graph_line = self.graph_canvas.create_line(
+            0, 0, 0, 0, fill='blue', width=2, state='hidden'
+        )
+        self._graph_marker = self.graph_canvas.create_oval(
+            0, 0, 0, 0, fill='red', outline='red', state='hidden'
+        )
+        self._graph_label = self.graph_canvas.create_text(
+            5, 5, anchor='nw', fill='black'
+        )
+        self.graph_canvas.bind('<Configure>', lambda event: self._draw_activity_graph())
 
         # Запуск обновления
         self._update_statistics()
@@ -93,6 +116,11 @@ class StatisticsPanel(BaseWidget):
                         f'Время работы: {minutes:02d}:{seconds:02d}'
                     )
 
+                # Внутренняя статистика детектора
+                self.stats_vars['detector'].set(
+                    self._format_detector_stats(stats.get('detector', {}))
+                )
+
                 # Обновление графика
                 self._activity_data.append(stats.get('current', 0))
                 self._draw_activity_graph()
@@ -103,52 +131,56 @@ class StatisticsPanel(BaseWidget):
         # Следующее обновление
         self.after(1000, self._update_statistics)
 
-    def _draw_activity_graph(self) -> None:
-        """Отрисовка графика активности"""
-        if not self._activity_data:
-            return
+    @staticmethod
+    def _format_detector_stats(detector_stats: dict) -> str:
+        """Форматирование статистики детектора"""
+        lines = []
+        for key, value in detector_stats.items():
+            if isinstance(value, float):
+                lines.append(f'{key}: {value:.2f}')
+            else:
+                lines.append(f'{key}: {value}')
+        return '\n'.join(lines)
 
+    def _draw_activity_graph(self) -> None:
+        """Обновление графика активности"""
         canvas = self.graph_canvas
-        canvas.delete('all')
-
         width = canvas.winfo_width()
         height = canvas.winfo_height()
-
-        if width <= 1 or height <= 1:
+        if not len(self._activity_data) or width <= 1 or height <= 1:
             return
 
-        # Масштабирование
-        max_val = max(self._activity_data) if self._activity_data else 1
-        if max_val == 0:
-            max_val = 1
-        scale_y = (height - 20) / max_val
-
-        # Отрисовка графика
-        points = []
-        for i, value in enumerate(self._activity_data):
-            x = (i / len(self._activity_data)) * (width - 40) + 20
-            y = height - 10 - (value * scale_y)
-            points.append((x, y))
-
-        # Линия
-        if len(points) >= 2:
-            for i in range(1, len(points)):
-                canvas.create_line(
-                    points[i - 1][0], points[i - 1][1],
-                    points[i][0], points[i][1],
-                    fill='blue', width=2
-                )
-
-        # Точки
-        for x, y in points:
-            canvas.create_oval(
-                x - 2, y - 2, x + 2, y + 2,
-                fill='red', outline='red'
-            )
+        # Два значения (минимум и максимум) на каждые два пикселя ширины
+        plot_width = max(width - 2 * self._MARGIN_X, 1)
+        starts, lows, highs = self._activity_data.decimate(max(plot_width // 2, 1))
+
+        max_val = max(float(highs.max()), 1.0)
+        scale_y = (height - 2 * self._MARGIN_Y) / max_val
+        step = plot_width / max(len(self._activity_data) - 1, 1)
+
+        xs = self._MARGIN_X + starts * step
+        low_ys = height - self._MARGIN_Y - lows * scale_y
+        high_ys = height - self._MARGIN_Y - highs * scale_y
+        if len(starts) == len(self._activity_data):
+            points = np.column_stack((xs, low_ys))
+        else:
+            # Вертикальный отрезок от максимума к минимуму в каждом интервале
+            points = np.column_stack((xs, high_ys, xs, low_ys)).reshape(-1, 2)
+        if len(points) == 1:
+            points = np.repeat(points, 2, axis=0)
+
+        canvas.coords(self._graph_line, *points.ravel().tolist())
+
+        # Маркер на самом свежем значении, а не на минимуме последнего интервала
+        x = self._MARGIN_X + (len(self._activity_data) - 1) * step
+        y = height - self._MARGIN_Y - self._activity_data.latest() * scale_y
+        canvas.coords(self._graph_marker, x - 2, y - 2, x + 2, y + 2)
+        canvas.itemconfigure(self._graph_line, state='normal')
+        canvas.itemconfigure(self._graph_marker, state='normal')
 
         # Подписи
-        canvas.create_text(
-            5, 5,
-            text=f'Макс: {max_val}',
-            anchor='nw', fill='black'
-        )
\ No newline at end of file
+        span = len(self._activity_data)
+        canvas.itemconfigure(
+            self._graph_label,
+            text=f'Макс: {max_val:.0f} за {span // 3600:d}:{span % 3600 // 60:02d}'
+        )
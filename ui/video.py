@@ -1,16 +1,33 @@
 """Виджет отображения видео"""
 
 import cv2
+import numpy as np
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
-import queue
 from .widgets import BaseWidget
 from utils.logger import logger
 
 
 class VideoDisplay(BaseWidget):
-    """Виджет отображения видео"""
+    """Виджет отображения видео
+
+    Уменьшение под холст и перевод BGR -> RGB выполняются в отдельном
+    потоке в заранее выделенные буферы (три: заполняемый, готовый и
+    показываемый). Поток Tk только копирует готовый буфер в единственный
+    PhotoImage через ``paste``; PhotoImage и элемент холста создаются
+    заново лишь при изменении размера изображения.
+
+    Поток конвертации ждет оверлей в ящике контроллера и только
+    отмечает готовый буфер; вызовы Tk из него небезопасны, поэтому цикл
+    Tk сам проверяет отметку через ``after`` каждые ``POLL_MS`` мс.
+    Показывается только последний кадр; кадры, замененные до показа,
+    считаются.
+    """
+
+    POLL_MS = 10  # Период проверки готового кадра потоком Tk
 
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
@@ -18,45 +35,259 @@ class VideoDisplay(BaseWidget):
         self.canvas = tk.Canvas(self, bg='black')
         self.canvas.pack(fill='both', expand=True)
 
-        self._current_image = None
         self._photo_image = None
+        self._image_item = None
+        self._hud_item = self.canvas.create_text(
+            5, 5, anchor='nw', fill='white', font=('Consolas', 9), tags='hud'
+        )
 
-        # Запуск обновления
-        self._update_display()
+        # Буферы RGB и обмен ими с потоком конвертации
+        self._buffers = []
+        self._buffer_size = None
+        self._ready = None  # (индекс буфера, размер исходного кадра)
+        self._presenting = None
+        self._superseded = 0  # Сконвертированные, но не показанные кадры
+        self._buffer_lock = threading.Lock()
+        self._target_size = (0, 0)
+        self._converting = True
+        self._convert_thread = threading.Thread(
+            target=self._convert_loop, daemon=True, name="VideoConvert"
+        )
+
+        # Геометрия отображаемого кадра: масштаб и смещение на холсте
+        self._display_scale = 1.0
+        self._display_offset = (0, 0)
+        self._frame_size = None
+        self._zones_drawn = None
+
+        # FPS отображения и время потока Tk на кадр
+        self._fps = 0.0
+        self._tk_time = 0.0
+        self._presented = 0
+        self._fps_time = time.perf_counter()
+
+        # Рисование зон исключения правой кнопкой мыши
+        self._zone_start = None
+        self.canvas.bind('<ButtonPress-3>', self._on_zone_start)
+        self.canvas.bind('<B3-Motion>', self._on_zone_drag)
+        self.canvas.bind('<ButtonRelease-3>', self._on_zone_end)
+        self.canvas.bind('<Double-Button-3>', self._on_zones_clear)
+
+        # Оверлей рендерится сразу в размере холста
+        self.canvas.bind('<Configure>', self._on_resize)
+        self.bind('<Destroy>', self._on_destroy)
+
+        # Запуск конвертации, показа и статистики отображения
+        self._convert_thread.start()
+        self._poll_overlay()
+        self._update_hud()
+
+    def _convert_loop(self) -> None:
+        """Поток конвертации: уменьшение и BGR -> RGB в свободный буфер"""
+        while self._converting:
+            try:
+                overlay = self.controller.overlay_mailbox.get(timeout=0.1)
+            except Exception as e:
+                logger.error(f"Display mailbox error: {e}")
+                continue
+            if overlay is None:
+                continue
 
-    def _update_display(self) -> None:
-        """Обновление отображения"""
-        try:
-            # Получение оверлея из очереди
-            overlay = None
             try:
-                overlay = self.controller.overlay_queue.get_nowait()
-            except queue.Empty:
-                pass
-
-            if overlay is not None:
-                # Конвертация для Tkinter
-                overlay_rgb = cv2.cvtColor(overlay, cv2.COLOR_BGR2RGB)
-                image = Image.fromarray(overlay_rgb)
-
-                # Масштабирование
-                width = self.canvas.winfo_width()
-                height = self.canvas.winfo_height()
-
-                if width > 1 and height > 1:
-                    image.thumbnail((width, height), Image.Resampling.LANCZOS)
-
-                # Отображение
-                self._photo_image = ImageTk.PhotoImage(image)
-                self.canvas.delete('all')
-                self.canvas.create_image(
-                    width // 2, height // 2,
-                    image=self._photo_image,
-                    anchor='center'
-                )
+                frame_size = (self.controller.frame_size or
+                              (overlay.shape[1], overlay.shape[0]))
+                size = self._fit_size(overlay.shape[1], overlay.shape[0])
+
+                with self._buffer_lock:
+                    if size != self._buffer_size:
+                        self._buffers = [np.empty((size[1], size[0], 3), dtype=np.uint8)
+                                         for _ in range(3)]
+                        self._buffer_size = size
+                        self._ready = self._presenting = None
+                    busy = {self._presenting,
+                            self._ready[0] if self._ready else None}
+                    index = next(i for i in range(3) if i not in busy)
+                buffer = self._buffers[index]
+
+                if size != (overlay.shape[1], overlay.shape[0]):
+                    overlay = cv2.resize(overlay, size, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(overlay, cv2.COLOR_BGR2RGB, dst=buffer)
+
+                with self._buffer_lock:
+                    if self._ready is not None:
+                        self._superseded += 1
+                    self._ready = (index, frame_size)
+
+            except Exception as e:
+                if self._converting:
+                    logger.error(f"Display conversion error: {e}")
+
+    def _fit_size(self, width: int, height: int):
+        """Размер изображения, вписанного в холст (только уменьшение)"""
+        target_w, target_h = self._target_size
+        if target_w <= 1 or target_h <= 1:
+            return width, height
+        scale = min(target_w / width, target_h / height, 1.0)
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    def _poll_overlay(self) -> None:
+        """Показ последнего готового буфера (в потоке Tk)"""
+        if not self._converting:
+            return
+
+        try:
+            with self._buffer_lock:
+                ready, self._ready = self._ready, None
+                if ready is not None:
+                    self._presenting = ready[0]
+                    buffer = self._buffers[ready[0]]
+
+            if ready is not None:
+                start = time.perf_counter()
+                self._present(buffer, ready[1])
+                with self._buffer_lock:
+                    self._presenting = None
+                self._tk_time = self._tk_time * 0.9 + (time.perf_counter() - start) * 0.1
+                self._presented += 1
+
+            if self._frame_size is not None:
+                self._refresh_zones()
 
         except Exception as e:
             logger.error(f"Display update error: {e}")
 
-        # Следующее обновление
-        self.after(33, self._update_display)  # ~30 FPS
\ No newline at end of file
+        self.after(self.POLL_MS, self._poll_overlay)
+
+    def _present(self, buffer: np.ndarray, frame_size) -> None:
+        """Копирование буфера в PhotoImage и обновление геометрии"""
+        height, width = buffer.shape[:2]
+        image = Image.frombuffer('RGB', (width, height), buffer, 'raw', 'RGB', 0, 1)
+
+        canvas_w = self.canvas.winfo_width()
+        canvas_h = self.canvas.winfo_height()
+        if self._photo_image is None or (self._photo_image.width(),
+                                         self._photo_image.height()) != (width, height):
+            # Новый размер: PhotoImage и элемент холста создаются заново
+            self._photo_image = ImageTk.PhotoImage(image)
+            self.canvas.delete('frame')
+            self._image_item = self.canvas.create_image(
+                canvas_w // 2, canvas_h // 2,
+                image=self._photo_image,
+                anchor='center',
+                tags='frame'
+            )
+            self.canvas.tag_lower('frame')
+        else:
+            self._photo_image.paste(image)
+
+        self._frame_size = frame_size
+        self._display_scale = width / frame_size[0]
+        self._display_offset = ((canvas_w - width) // 2, (canvas_h - height) // 2)
+
+    def _update_hud(self) -> None:
+        """FPS отображения, время потока Tk на кадр и пропущенные кадры"""
+        now = time.perf_counter()
+        elapsed = now - self._fps_time
+        if elapsed > 0:
+            self._fps = self._presented / elapsed
+        self._presented = 0
+        self._fps_time = now
+
+        # Замененные в ящике контроллера и после конвертации
+        superseded = self.controller.overlay_mailbox.superseded + self._superseded
+        self.canvas.itemconfigure(
+            self._hud_item,
+            text=(f'{self._fps:.1f} FPS, Tk {self._tk_time * 1000:.1f} ms, '
+                  f'пропущено {superseded}')
+        )
+
+        self.after(1000, self._update_hud)
+
+    def _on_resize(self, event) -> None:
+        """Передача нового размера холста рендереру и потоку конвертации"""
+        self._target_size = (event.width, event.height)
+        self.controller.set_display_size(event.width, event.height)
+        if self._image_item is not None:
+            self.canvas.coords(self._image_item, event.width // 2, event.height // 2)
+
+    def _on_destroy(self, event) -> None:
+        """Остановка потока конвертации"""
+        if event.widget is self:
+            self._converting = False
+
+    def _refresh_zones(self) -> None:
+        """Перерисовка зон исключения при изменении списка или геометрии"""
+        key = (self.controller.config.exclusion.zones,
+               self._display_scale, self._display_offset)
+        if key == self._zones_drawn:
+            return
+        self._zones_drawn = key
+        self.canvas.delete('zone')
+        self._draw_zones()
+        self.canvas.tag_raise('zone_draft')
+        self.canvas.tag_raise('hud')
+
+    def _draw_zones(self) -> None:
+        """Отображение зон исключения поверх кадра"""
+        for zone in self.controller.config.exclusion.zones:
+            x1, y1 = self._frame_to_canvas(zone[0], zone[1])
+            x2, y2 = self._frame_to_canvas(zone[2], zone[3])
+            self.canvas.create_rectangle(
+                x1, y1, x2, y2, outline='red', dash=(4, 2), tags='zone'
+            )
+
+    def _frame_to_canvas(self, x: int, y: int):
+        """Перевод координат кадра в координаты холста"""
+        ox, oy = self._display_offset
+        return x * self._display_scale + ox, y * self._display_scale + oy
+
+    def _canvas_to_frame(self, x: int, y: int):
+        """Перевод координат холста в координаты кадра"""
+        ox, oy = self._display_offset
+        width, height = self._frame_size
+        fx = int(round((x - ox) / self._display_scale))
+        fy = int(round((y - oy) / self._display_scale))
+        return min(max(fx, 0), width), min(max(fy, 0), height)
+
+    def _on_zone_start(self, event) -> None:
+        """Начало рисования зоны исключения"""
+        if self._frame_size is None:
+            return
+        self._zone_start = (event.x, event.y)
+        self.canvas.delete('zone_draft')
+        self.canvas.create_rectangle(
+            event.x, event.y, event.x, event.y,
+            outline='yellow', dash=(4, 2), tags='zone_draft'
+        )
+
+    def _on_zone_drag(self, event) -> None:
+        """Изменение размера рисуемой зоны"""
+        if self._zone_start is None:
+            return
+        x0, y0 = self._zone_start
+        self.canvas.coords('zone_draft', x0, y0, event.x, event.y)
+
+    def _on_zone_end(self, event) -> None:
+        """Завершение рисования и добавление зоны исключения"""
+        if self._zone_start is None:
+            return
+        self.canvas.delete('zone_draft')
+
+        x1, y1 = self._canvas_to_frame(*self._zone_start)
+        x2, y2 = self._canvas_to_frame(event.x, event.y)
+        self._zone_start = None
+
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            return
+        self.controller.add_exclusion_zone((x1, y1, x2, y2))
+        self._refresh_zones()
+
+    def _on_zones_clear(self, event) -> None:
+        """Удаление всех зон исключения (двойной щелчок правой кнопкой)"""
+        self._zone_start = None
+        self.canvas.delete('zone_draft')
+        self.controller.clear_exclusion_zones()
+        if self._frame_size is not None:
+            self._refresh_zones()
@@ -0,0 +1,43 @@
+"""Утилиты измерения аллокаций памяти"""
+
+import tracemalloc
+from contextlib import contextmanager
+
+
+class AllocationMeter:
+    """Выборочное измерение аллокаций на кадр
+
+    tracemalloc включается только на каждом ``sample_interval``-м кадре,
+    поэтому в остальных кадрах измерение ничего не стоит. Аллокации numpy
+    и массивов, возвращаемых OpenCV, учитываются tracemalloc.
+    """
+
+    def __init__(self, sample_interval: int = 100):
+        self.sample_interval = max(1, sample_interval)
+        self.peak_bytes = 0
+        self.retained_bytes = 0
+        self._frame = 0
+
+    @contextmanager
+    def measure(self):
+        """Контекст измерения одного кадра"""
+        self._frame += 1
+        if self._frame % self.sample_interval != 0 or tracemalloc.is_tracing():
+            yield
+            return
+
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.retained_bytes = current
+            self.peak_bytes = peak
+
+    def get_stats(self) -> dict:
+        """Последние измеренные значения в килобайтах"""
+        return {
+            'alloc_peak_kb': self.peak_bytes / 1024,
+            'alloc_retained_kb': self.retained_bytes / 1024
+        }
@@ -0,0 +1,104 @@
+"""Проверка возможностей GPU для рендеринга"""
+
+import cv2
+import numpy as np
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+from models.enums import RenderBackend
+from utils.logger import logger
+
+
+@dataclass
+class GPUCapabilities:
+    """Возможности машины для рендеринга"""
+    gpu_available: bool = False
+    gpu_name: str = ""
+    gpu_memory: int = 0  # Байты
+    cuda_available: bool = False
+    opencl_available: bool = False
+    backends: List[RenderBackend] = field(default_factory=lambda: [RenderBackend.CPU])
+
+
+class GPUManager:
+    """Ленивая проверка OpenCL (T-API) и CUDA в сборке OpenCV
+
+    Бэкенд OpenCL считается доступным, только если устройство по
+    умолчанию - GPU и пробная операция над cv2.UMat выполняется без
+    ошибок. Любой сбой проверки означает рендеринг на CPU.
+    """
+
+    def __init__(self):
+        self._capabilities: Optional[GPUCapabilities] = None
+        self._lock = threading.Lock()
+
+    def get_capabilities(self) -> GPUCapabilities:
+        """Возможности машины (проверка выполняется один раз)"""
+        with self._lock:
+            if self._capabilities is None:
+                self._capabilities = self._probe()
+            return self._capabilities
+
+    @property
+    def capabilities(self) -> GPUCapabilities:
+        return self.get_capabilities()
+
+    @property
+    def has_gpu(self) -> bool:
+        return self.get_capabilities().gpu_available
+
+    def get_optimal_backend(self) -> RenderBackend:
+        """Бэкенд рендеринга по умолчанию"""
+        caps = self.get_capabilities()
+        if RenderBackend.OPENCL in caps.backends:
+            return RenderBackend.OPENCL
+        return RenderBackend.CPU
+
+    def _probe(self) -> GPUCapabilities:
+        caps = GPUCapabilities()
+
+        try:
+            if hasattr(cv2, 'cuda'):
+                caps.cuda_available = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except cv2.error:
+            caps.cuda_available = False
+
+        # Проверка включает T-API, но не меняет глобальную настройку процесса
+        use_opencl = cv2.ocl.useOpenCL()
+        try:
+            if cv2.ocl.haveOpenCL():
+                cv2.ocl.setUseOpenCL(True)
+                device = cv2.ocl.Device.getDefault()
+                if device.available() and device.type() & cv2.ocl.DEVICE_TYPE_GPU:
+                    caps.gpu_name = device.name()
+                    caps.gpu_memory = int(device.globalMemSize())
+                    caps.opencl_available = self._umat_works()
+        except cv2.error as e:
+            logger.warning(f"OpenCL probe failed: {e}")
+            caps.opencl_available = False
+        finally:
+            cv2.ocl.setUseOpenCL(use_opencl)
+
+        caps.gpu_available = caps.opencl_available or caps.cuda_available
+        if caps.opencl_available:
+            caps.backends.append(RenderBackend.OPENCL)
+
+        logger.info(f"Render backends: {', '.join(b.value for b in caps.backends)}"
+                    + (f" (GPU: {caps.gpu_name})" if caps.gpu_name else ""))
+        return caps
+
+    @staticmethod
+    def _umat_works() -> bool:
+        """Пробная операция T-API: некоторые драйверы падают при первом ядре"""
+        try:
+            image = cv2.UMat(np.zeros((64, 64, 3), dtype=np.uint8))
+            resized = cv2.resize(image, (128, 128), interpolation=cv2.INTER_LINEAR)
+            cv2.addWeighted(resized, 0.5, resized, 0.5, 0).get()
+            return cv2.ocl.useOpenCL()
+        except cv2.error as e:
+            logger.warning(f"OpenCL test kernel failed: {e}")
+            return False
+
+
+# Глобальный менеджер
+gpu_manager = GPUManager()
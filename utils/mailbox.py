@@ -0,0 +1,57 @@
+"""Ящик на одно значение для передачи последнего кадра между потоками"""
+
+import threading
+from typing import Any, Dict, Generic, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class Mailbox(Generic[T]):
+    """Ящик на одно значение: новое значение заменяет непрочитанное
+
+    Отправитель никогда не ждет, получатель всегда берет самое свежее
+    значение. Замененные до прочтения значения считаются в ``superseded``.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._value: Optional[T] = None
+        self._full = False
+        self._delivered = 0
+        self._superseded = 0
+
+    def put(self, value: T) -> None:
+        """Запись значения (непрочитанное предыдущее отбрасывается)"""
+        with self._condition:
+            if self._full:
+                self._superseded += 1
+            self._value = value
+            self._full = True
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        """Последнее значение; ожидание до timeout (None - нет значения)"""
+        with self._condition:
+            if not self._full and not self._condition.wait_for(lambda: self._full, timeout):
+                return None
+            return self._take()
+
+    def get_nowait(self) -> Optional[T]:
+        """Последнее значение без ожидания"""
+        with self._condition:
+            return self._take() if self._full else None
+
+    def _take(self) -> T:
+        value, self._value = self._value, None
+        self._full = False
+        self._delivered += 1
+        return value
+
+    @property
+    def superseded(self) -> int:
+        """Значения, замененные до прочтения"""
+        return self._superseded
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Прочитанные и замененные значения"""
+        return {'delivered': self._delivered, 'superseded': self._superseded}
@@ -0,0 +1,52 @@
+"""Метрики качества детекции"""
+
+from typing import List, Tuple
+
+Box = Tuple[int, int, int, int]
+
+
+def box_iou(a: Box, b: Box) -> float:
+    """IoU двух прямоугольников (x, y, w, h)"""
+    x_left = max(a[0], b[0])
+    y_top = max(a[1], b[1])
+    x_right = min(a[0] + a[2], b[0] + b[2])
+    y_bottom = min(a[1] + a[3], b[1] + b[3])
+    if x_right <= x_left or y_bottom <= y_top:
+        return 0.0
+
+    intersection = (x_right - x_left) * (y_bottom - y_top)
+    union = a[2] * a[3] + b[2] * b[3] - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def match_counts(predicted: List[Box], truth: List[Box],
+                 iou_threshold: float = 0.3) -> Tuple[int, int, int]:
+    """Жадное сопоставление: (true positives, false positives, false negatives)"""
+    used = set()
+    true_positives = 0
+    for box in predicted:
+        best, best_iou = None, iou_threshold
+        for i, gt in enumerate(truth):
+            if i in used:
+                continue
+            iou = box_iou(box, gt)
+            if iou >= best_iou:
+                best, best_iou = i, iou
+        if best is not None:
+            used.add(best)
+            true_positives += 1
+
+    return (true_positives, len(predicted) - true_positives,
+            len(truth) - true_positives)
+
+
+def f1_score(true_positives: int, false_positives: int,
+             false_negatives: int) -> Tuple[float, float, float]:
+    """Точность, полнота и F1 по счетчикам сопоставления"""
+    predicted = true_positives + false_positives
+    actual = true_positives + false_negatives
+    precision = true_positives / predicted if predicted else 0.0
+    recall = true_positives / actual if actual else 0.0
+    f1 = (2 * precision * recall / (precision + recall)
+          if precision + recall else 0.0)
+    return precision, recall, f1
@@ -0,0 +1,26 @@
+"""Операции с прямоугольниками (x1, y1, x2, y2)"""
+
+from typing import List, Tuple
+
+Rect = Tuple[int, int, int, int]
+
+
+def merge_overlapping(rects: List[Rect]) -> List[Rect]:
+    """Объединение перекрывающихся прямоугольников до непересекающихся"""
+    merged = list(rects)
+    changed = True
+    while changed:
+        changed = False
+        result: List[Rect] = []
+        for rect in merged:
+            for i, other in enumerate(result):
+                if (rect[0] < other[2] and other[0] < rect[2] and
+                        rect[1] < other[3] and other[1] < rect[3]):
+                    result[i] = (min(rect[0], other[0]), min(rect[1], other[1]),
+                                 max(rect[2], other[2]), max(rect[3], other[3]))
+                    changed = True
+                    break
+            else:
+                result.append(rect)
+        merged = result
+    return merged
@@ -0,0 +1,51 @@
+"""Кольцевой буфер временного ряда"""
+
+import numpy as np
+from typing import Tuple
+
+
+class RingSeries:
+    """Кольцевой буфер последних ``capacity`` значений ряда
+
+    Добавление не выделяет память. Для отображения длинной истории ряд
+    прореживается до заданного числа интервалов с минимумом и максимумом
+    каждого, поэтому короткие всплески не теряются.
+    """
+
+    def __init__(self, capacity: int):
+        self._data = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def append(self, value: float) -> None:
+        """Добавление значения (самое старое вытесняется)"""
+        self._data[self._next] = value
+        self._next = (self._next + 1) % len(self._data)
+        self._count = min(self._count + 1, len(self._data))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def latest(self) -> float:
+        """Последнее добавленное значение"""
+        return float(self._data[(self._next - 1) % len(self._data)])
+
+    def values(self) -> np.ndarray:
+        """Значения от старых к новым"""
+        if self._count < len(self._data):
+            return self._data[:self._count]
+        return np.concatenate((self._data[self._next:], self._data[:self._next]))
+
+    def decimate(self, buckets: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Начала интервалов (индексы значений), минимумы и максимумы
+
+        Если значений не больше ``buckets``, каждое значение - свой интервал.
+        """
+        values = self.values()
+        if len(values) <= buckets:
+            starts = np.arange(len(values))
+            return starts, values, values
+
+        starts = np.linspace(0, len(values), buckets, endpoint=False).astype(np.int64)
+        return (starts, np.minimum.reduceat(values, starts),
+                np.maximum.reduceat(values, starts))